@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from neuralcache.cr.index import CRIndex, assemble_cr_index
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare serial and process-pool per-bucket topic clustering in CR builds.",
+    )
+    parser.add_argument("--docs", type=int, default=500_000, help="Number of synthetic docs.")
+    parser.add_argument("--d1", type=int, default=256, help="Topic-level (q1) dimension.")
+    parser.add_argument("--d2", type=int, default=64, help="Coarse-level (q2) dimension.")
+    parser.add_argument(
+        "--k2", type=int, nargs="+", default=[16, 64], help="Coarse bucket counts to benchmark."
+    )
+    parser.add_argument("--k1", type=int, default=12, help="Topic buckets per coarse bucket.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for the parallel run.",
+    )
+    return parser.parse_args()
+
+
+def _synthetic(docs: int, d1: int, d2: int) -> tuple[np.ndarray, np.ndarray, dict]:
+    rng = np.random.default_rng(0)
+    centers = rng.normal(scale=3.0, size=(256, d1)).astype(np.float32)
+    q1 = centers[rng.integers(0, centers.shape[0], size=docs)]
+    q1 += rng.normal(size=q1.shape).astype(np.float32)
+    components = np.linalg.qr(rng.normal(size=(d1, d2)))[0].T.astype(np.float32)
+    q2 = q1 @ components.T
+    projections = {
+        "proj1_components": np.eye(d1, dtype=np.float32),
+        "proj1_mean": np.zeros(d1, dtype=np.float32),
+        "proj2_components": components,
+        "proj2_mean": np.zeros(d2, dtype=np.float32),
+    }
+    return q1, q2, projections
+
+
+def _same(a: CRIndex, b: CRIndex) -> bool:
+    return a.topic_buckets_per_coarse == b.topic_buckets_per_coarse and all(
+        np.array_equal(x, y)
+        for x, y in zip(a.topic_centroids_per_coarse, b.topic_centroids_per_coarse, strict=True)
+    )
+
+
+def main() -> None:
+    args = _parse_args()
+    q1, q2, projections = _synthetic(args.docs, args.d1, args.d2)
+    print(f"n={args.docs} d1={args.d1} d2={args.d2} k1={args.k1} workers={args.workers}")
+    for k2 in args.k2:
+        timings = {}
+        results = {}
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            results[workers] = assemble_cr_index(
+                q1, q2, k2=k2, k1_per_bucket=args.k1, seed=42, workers=workers, **projections
+            )
+            timings[workers] = time.perf_counter() - start
+        speedup = timings[1] / max(timings[args.workers], 1e-9)
+        print(
+            f"k2={k2:<4} serial {timings[1]:7.2f}s  parallel {timings[args.workers]:7.2f}s  "
+            f"speedup {speedup:4.1f}x  identical={_same(results[1], results[args.workers])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
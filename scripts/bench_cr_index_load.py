@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from neuralcache.cr.index import CRIndex, CRIndexMeta, load_cr_index, save_cr_index
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare load time and RSS of the legacy pickled CR index and the v2 layout.",
+    )
+    parser.add_argument("--docs", type=int, default=1_000_000, help="Indexed document count.")
+    parser.add_argument("--k2", type=int, default=64, help="Coarse bucket count.")
+    parser.add_argument("--k1", type=int, default=32, help="Topic buckets per coarse bucket.")
+    parser.add_argument("--d0", type=int, default=768, help="Base embedding dimension.")
+    parser.add_argument("--d1", type=int, default=256, help="First PCA dimension.")
+    parser.add_argument("--d2", type=int, default=64, help="Second PCA dimension.")
+    parser.add_argument("--load", nargs=2, metavar=("NPZ", "META"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def _synthetic_index(args: argparse.Namespace) -> CRIndex:
+    rng = np.random.default_rng(0)
+    coarse = rng.integers(0, args.k2, size=args.docs)
+    topic = rng.integers(0, args.k1, size=args.docs)
+    coarse_buckets = [np.flatnonzero(coarse == c).tolist() for c in range(args.k2)]
+    topic_buckets = [
+        [[i for i in bucket if topic[i] == t] for t in range(args.k1)] for bucket in coarse_buckets
+    ]
+    return CRIndex(
+        meta=CRIndexMeta(
+            d0=args.d0, d1=args.d1, d2=args.d2, k1=args.k1, k2=args.k2, doc_count=args.docs
+        ),
+        proj1_components=rng.normal(size=(args.d1, args.d0)).astype(np.float32),
+        proj1_mean=np.zeros(args.d0, dtype=np.float32),
+        proj2_components=rng.normal(size=(args.d2, args.d1)).astype(np.float32),
+        proj2_mean=np.zeros(args.d1, dtype=np.float32),
+        coarse_centroids=rng.normal(size=(args.k2, args.d2)).astype(np.float32),
+        coarse_buckets=coarse_buckets,
+        topic_centroids_per_coarse=[
+            rng.normal(size=(args.k1, args.d1)).astype(np.float32) for _ in range(args.k2)
+        ],
+        topic_buckets_per_coarse=topic_buckets,
+    )
+
+
+def legacy_save_cr_index(idx: CRIndex, path_npz: str, path_meta_json: str) -> None:
+    """The pre-v2 writer, kept here as the benchmark baseline."""
+    np.savez_compressed(
+        path_npz,
+        proj1_components=idx.proj1_components,
+        proj1_mean=idx.proj1_mean,
+        proj2_components=idx.proj2_components,
+        proj2_mean=idx.proj2_mean,
+        coarse_centroids=idx.coarse_centroids,
+        coarse_buckets=np.array(idx.coarse_buckets, dtype=object),
+        topic_centroids_per_coarse=np.array(idx.topic_centroids_per_coarse, dtype=object),
+        topic_buckets_per_coarse=np.array(idx.topic_buckets_per_coarse, dtype=object),
+    )
+    meta = {k: v for k, v in vars(idx.meta).items() if k != "format_version"}
+    Path(path_meta_json).write_text(json.dumps(meta), encoding="utf-8")
+
+
+def _rss_mb() -> float:
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        resident_pages = int(statm.read_text().split()[1])
+        return resident_pages * resource.getpagesize() / 2**20
+    # Fallback: peak RSS (a lower bound on the delta where /proc is unavailable).
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _load(npz: str, meta: str) -> dict[str, float]:
+    before = _rss_mb()
+    start = time.perf_counter()
+    idx = load_cr_index(npz, meta)
+    elapsed = time.perf_counter() - start
+    # Touch one topic bucket, as a query would.
+    _ = np.asarray(idx.topic_buckets_per_coarse[0][0]).sum()
+    return {"load_s": elapsed, "rss_delta_mb": _rss_mb() - before}
+
+
+def _load_in_subprocess(npz: Path, meta: Path) -> dict[str, float]:
+    cmd = [sys.executable, __file__, "--load", str(npz), str(meta)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.load:
+        print(json.dumps(_load(*args.load)))
+        return
+
+    idx = _synthetic_index(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        legacy = (root / "legacy.npz", root / "legacy.meta.json")
+        v2 = (root / "v2.npz", root / "v2.meta.json")
+        legacy_save_cr_index(idx, str(legacy[0]), str(legacy[1]))
+        save_cr_index(idx, str(v2[0]), str(v2[1]))
+        print(f"docs={args.docs} k2={args.k2} k1={args.k1} d0={args.d0}")
+        for label, (npz, meta) in (("legacy", legacy), ("v2", v2)):
+            result = _load_in_subprocess(npz, meta)
+            size_mb = npz.stat().st_size / 2**20
+            print(
+                f"{label:<7} file {size_mb:8.1f} MiB  load {result['load_s'] * 1000:9.1f} ms  "
+                f"RSS +{result['rss_delta_mb']:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
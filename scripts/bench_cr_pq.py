@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from neuralcache.cr.index import build_cr_index
+from neuralcache.cr.search import _cosine, hierarchical_candidates
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recall and latency of PQ leaf scoring against the float CR search path.",
+    )
+    parser.add_argument("--docs", type=int, default=200_000, help="Indexed document count.")
+    parser.add_argument("--dim", type=int, default=384, help="Base embedding dimension.")
+    parser.add_argument(
+        "--pq-m", type=int, nargs="+", default=[48, 96], help="PQ sub-space counts to compare."
+    )
+    parser.add_argument(
+        "--rescore", type=int, nargs="+", default=[2, 4, 8], help="Shortlist multiples."
+    )
+    parser.add_argument("--k2", type=int, default=32, help="Coarse buckets.")
+    parser.add_argument("--k1", type=int, default=16, help="Topics per coarse bucket.")
+    parser.add_argument("--max-candidates", type=int, default=256, help="Candidates per query.")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per configuration.")
+    parser.add_argument("--top", type=int, default=10, help="k for recall@k vs brute force.")
+    return parser.parse_args()
+
+
+def _run(fn: Callable[[np.ndarray], list[int]], queries: np.ndarray) -> tuple[np.ndarray, list]:
+    fn(queries[0])  # build the lazily cached search layout
+    samples, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000.0, results
+
+
+def main() -> None:
+    args = _parse_args()
+    rng = np.random.default_rng(0)
+    centers = rng.normal(scale=2.0, size=(512, args.dim))
+    corpus = centers[rng.integers(0, centers.shape[0], size=args.docs)]
+    corpus = (corpus + rng.normal(size=corpus.shape)).astype(np.float32)
+    queries = corpus[rng.choice(args.docs, size=args.queries, replace=False)]
+    truth = [
+        set(np.argsort(-_cosine(q[None, :], corpus).ravel())[: args.top].tolist()) for q in queries
+    ]
+    print(f"docs={args.docs} dim={args.dim} queries={args.queries} float bytes/doc={4 * args.dim}")
+
+    def _report(label: str, latencies: np.ndarray, results: list, baseline: list) -> None:
+        recall = np.mean([len(t & set(r)) / len(t) for t, r in zip(truth, results, strict=True)])
+        agree = np.mean(
+            [len(set(r) & set(b)) / max(len(b), 1) for r, b in zip(results, baseline, strict=True)]
+        )
+        print(
+            f"{label:<22} p50 {np.percentile(latencies, 50):6.2f}ms "
+            f"p99 {np.percentile(latencies, 99):6.2f}ms recall@{args.top} {recall:.3f} "
+            f"overlap-with-float {agree:.3f}"
+        )
+
+    for m in args.pq_m:
+        start = time.perf_counter()
+        cr = build_cr_index(corpus, k2=args.k2, k1_per_bucket=args.k1, seed=0, pq_m=m)
+        print(
+            f"pq_m={m}: build {time.perf_counter() - start:.1f}s, "
+            f"{cr.pq_codes.shape[1]} code bytes/doc, {4 * args.dim // cr.pq_codes.shape[1]}x "
+            "smaller than float q0 (still kept for the exact re-score)"
+        )
+        float_lat, float_res = _run(
+            lambda q, cr=cr: hierarchical_candidates(
+                q, corpus, cr, max_candidates=args.max_candidates
+            ),
+            queries,
+        )
+        _report("  float", float_lat, float_res, float_res)
+        for factor in args.rescore:
+            lat, res = _run(
+                lambda q, cr=cr, factor=factor: hierarchical_candidates(
+                    q, corpus, cr, max_candidates=args.max_candidates, pq_rescore_factor=factor
+                ),
+                queries,
+            )
+            _report(f"  pq rescore x{factor}", lat, res, float_res)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from neuralcache.cr.index import CRIndex, build_cr_index
+from neuralcache.cr.search import _cosine, hierarchical_candidates
+from neuralcache.cr.utils import pca_transform
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare per-query latency of the vectorized and legacy CR candidate search.",
+    )
+    parser.add_argument("--docs", type=int, default=100_000, help="Indexed document count.")
+    parser.add_argument("--dim", type=int, default=384, help="Base embedding dimension.")
+    parser.add_argument(
+        "--layouts",
+        nargs="+",
+        default=["16x12", "64x32"],
+        help="Bucket layouts as <coarse>x<topics per coarse>.",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Queries per layout.")
+    return parser.parse_args()
+
+
+def legacy_hierarchical_candidates(
+    q0_query: np.ndarray,
+    doc_embeddings_q0: np.ndarray,
+    cr: CRIndex,
+    top_coarse: int = 3,
+    top_topics_per_coarse: int = 2,
+    max_candidates: int = 256,
+) -> list[int]:
+    """The per-bucket loop implementation, kept here as the benchmark baseline."""
+    q1 = pca_transform(q0_query[None, :], cr.proj1_components, cr.proj1_mean)
+    q2 = pca_transform(q1, cr.proj2_components, cr.proj2_mean)
+    s2 = _cosine(q2, cr.coarse_centroids).ravel()
+    coarse_boost = np.full_like(s2, fill_value=-1.0)
+    for idx, bucket in enumerate(cr.coarse_buckets):
+        if not bucket:
+            continue
+        mean_vec = doc_embeddings_q0[np.asarray(bucket)].mean(axis=0, keepdims=True)
+        coarse_boost[idx] = float(_cosine(q0_query[None, :], mean_vec).ravel()[0])
+    coarse_ids = np.argsort(-(0.5 * s2 + 0.5 * coarse_boost))[:top_coarse]
+    candidate_ids: list[int] = []
+    cap = max(1, max_candidates // max(1, top_coarse * top_topics_per_coarse))
+    for cid in coarse_ids:
+        topic_centroids = cr.topic_centroids_per_coarse[cid]
+        if topic_centroids.shape[0] == 0:
+            continue
+        s1 = _cosine(q1, topic_centroids).ravel()
+        topic_boost = np.full_like(s1, fill_value=-1.0)
+        for tid, bucket in enumerate(cr.topic_buckets_per_coarse[cid]):
+            if not bucket:
+                continue
+            mean_vec = doc_embeddings_q0[np.asarray(bucket)].mean(axis=0, keepdims=True)
+            topic_boost[tid] = float(_cosine(q0_query[None, :], mean_vec).ravel()[0])
+        for tid in np.argsort(-(0.5 * s1 + 0.5 * topic_boost))[:top_topics_per_coarse]:
+            doc_bucket = cr.topic_buckets_per_coarse[cid][tid]
+            if not doc_bucket:
+                continue
+            doc_indices = np.asarray(doc_bucket)
+            scores = _cosine(q0_query[None, :], doc_embeddings_q0[doc_indices]).ravel()
+            keep = np.argsort(-scores)[: min(cap, doc_indices.size)]
+            candidate_ids.extend(doc_indices[keep].tolist())
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    if len(candidate_ids) > max_candidates:
+        s0 = _cosine(q0_query[None, :], doc_embeddings_q0[np.array(candidate_ids)]).ravel()
+        candidate_ids = [candidate_ids[i] for i in np.argsort(-s0)[:max_candidates].tolist()]
+    return candidate_ids
+
+
+def _latencies(fn: Callable[[np.ndarray], list[int]], queries: np.ndarray) -> np.ndarray:
+    fn(queries[0])  # warm caches (and the lazily built search layout)
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000.0
+
+
+def main() -> None:
+    args = _parse_args()
+    rng = np.random.default_rng(0)
+    centers = rng.normal(scale=2.0, size=(256, args.dim))
+    corpus = centers[rng.integers(0, centers.shape[0], size=args.docs)]
+    corpus = (corpus + rng.normal(size=corpus.shape)).astype(np.float32)
+    queries = corpus[rng.choice(args.docs, size=args.queries, replace=False)]
+    print(f"docs={args.docs} dim={args.dim} queries={args.queries}")
+
+    for layout in args.layouts:
+        k2, k1 = (int(part) for part in layout.lower().split("x"))
+        cr = build_cr_index(corpus, k2=k2, k1_per_bucket=k1, seed=0)
+        new = _latencies(lambda q, cr=cr: hierarchical_candidates(q, corpus, cr), queries)
+        old = _latencies(lambda q, cr=cr: legacy_hierarchical_candidates(q, corpus, cr), queries)
+        print(
+            f"{layout:<6} vectorized p50 {np.percentile(new, 50):7.2f}ms "
+            f"p99 {np.percentile(new, 99):7.2f}ms | legacy p50 {np.percentile(old, 50):7.2f}ms "
+            f"p99 {np.percentile(old, 99):7.2f}ms | speedup "
+            f"{np.percentile(old, 50) / max(np.percentile(new, 50), 1e-9):5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
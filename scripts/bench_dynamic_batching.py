@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from neuralcache.config import Settings
+from neuralcache.rerank import Reranker, ScoreJob
+from neuralcache.types import Document
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Small /rerank calls scored one by one vs. through Reranker.score_many.",
+    )
+    parser.add_argument("--requests", type=int, default=256, help="Requests to score.")
+    parser.add_argument("--docs", type=int, default=16, help="Documents per request.")
+    parser.add_argument("--pool", type=int, default=200, help="Distinct documents drawn from.")
+    parser.add_argument("--batch", type=int, default=16, help="Requests per score_many pass.")
+    parser.add_argument(
+        "--storage", choices=("sqlite", "memory"), default="sqlite", help="Pheromone backend."
+    )
+    return parser.parse_args()
+
+
+def _reranker(storage: str, storage_dir: str) -> Reranker:
+    return Reranker(
+        settings=Settings(
+            storage_backend=storage,
+            storage_persistence_enabled=storage != "memory",
+            storage_dir=storage_dir,
+            epsilon_greedy=0.0,
+        )
+    )
+
+
+def _jobs(args: argparse.Namespace) -> list[ScoreJob]:
+    rng = np.random.default_rng(0)
+    pool = [
+        Document(id=f"doc-{i}", text=f"document {i} about topic {i % 17}") for i in range(args.pool)
+    ]
+    return [
+        ScoreJob(
+            docs=[pool[i] for i in rng.choice(args.pool, size=args.docs, replace=False)],
+            query_text=f"question about topic {n % 17}",
+        )
+        for n in range(args.requests)
+    ]
+
+
+def main() -> None:
+    args = _parse_args()
+    jobs = _jobs(args)
+    print(f"requests={args.requests} docs={args.docs} batch={args.batch} storage={args.storage}")
+    with tempfile.TemporaryDirectory() as tmp:
+        rk = _reranker(args.storage, tmp)
+        start = time.perf_counter()
+        for job in jobs:
+            rk.score(rk.encode_query(job.query_text or ""), job.docs, query_text=job.query_text)
+        single = time.perf_counter() - start
+        rk.close()
+    with tempfile.TemporaryDirectory() as tmp:
+        rk = _reranker(args.storage, tmp)
+        start = time.perf_counter()
+        for offset in range(0, len(jobs), args.batch):
+            rk.score_many(jobs[offset : offset + args.batch])
+        batched = time.perf_counter() - start
+        rk.close()
+    for label, elapsed in (("one call per request", single), ("score_many", batched)):
+        print(
+            f"{label:<21} {elapsed * 1000:8.1f}ms total {args.requests / elapsed:8.0f} req/s "
+            f"speedup {single / elapsed:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from neuralcache.encoder import create_encoder
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure cold vs warm-start encoding latency with the on-disk embedding cache.",
+    )
+    parser.add_argument("--backend", default="hash", help="Embedding backend to benchmark.")
+    parser.add_argument("--model", default=None, help="Optional embedding model name.")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension (hash backend).")
+    parser.add_argument("--docs", type=int, default=5000, help="Number of synthetic texts.")
+    parser.add_argument("--batch", type=int, default=64, help="Texts per encode_batch call.")
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Cache directory (defaults to a fresh temporary directory).",
+    )
+    parser.add_argument("--phase", choices=["all", "run"], default="all", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def _texts(n: int) -> list[str]:
+    return [f"document {i} about topic {i % 97} with detail {i * 7919 % 1013}" for i in range(n)]
+
+
+def _run(args: argparse.Namespace) -> dict[str, float]:
+    start = time.perf_counter()
+    encoder = create_encoder(args.backend, dim=args.dim, model=args.model, cache_dir=args.cache_dir)
+    open_s = time.perf_counter() - start
+    texts = _texts(args.docs)
+    start = time.perf_counter()
+    for offset in range(0, len(texts), args.batch):
+        encoder.encode_batch(texts[offset : offset + args.batch])
+    elapsed = time.perf_counter() - start
+    cache = getattr(encoder, "cache", None)
+    stats = cache.stats() if cache is not None else {}
+    return {
+        "open_s": open_s,
+        "encode_s": elapsed,
+        "docs_per_s": len(texts) / max(elapsed, 1e-9),
+        "hit_rate": float(stats.get("hit_rate", 0.0)),
+    }
+
+
+def _run_in_subprocess(args: argparse.Namespace) -> dict[str, float]:
+    cmd = [
+        sys.executable,
+        __file__,
+        "--phase",
+        "run",
+        "--backend",
+        args.backend,
+        "--dim",
+        str(args.dim),
+        "--docs",
+        str(args.docs),
+        "--batch",
+        str(args.batch),
+        "--cache-dir",
+        args.cache_dir,
+    ]
+    if args.model:
+        cmd += ["--model", args.model]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.phase == "run":
+        print(json.dumps(_run(args)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.cache_dir = args.cache_dir or str(Path(tmp) / "embedding-cache")
+        # Each phase runs in a fresh interpreter to mimic a server restart.
+        cold = _run_in_subprocess(args)
+        warm = _run_in_subprocess(args)
+    speedup = cold["encode_s"] / max(warm["encode_s"], 1e-9)
+    print(
+        f"cold: {cold['encode_s']:.3f}s ({cold['docs_per_s']:.0f} docs/s, "
+        f"hit rate {cold['hit_rate']:.2%})"
+    )
+    print(
+        f"warm: {warm['encode_s']:.3f}s ({warm['docs_per_s']:.0f} docs/s, "
+        f"hit rate {warm['hit_rate']:.2%}, open {warm['open_s'] * 1000:.1f}ms)"
+    )
+    print(f"speedup after restart: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
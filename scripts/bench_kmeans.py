@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+
+from neuralcache.cr.utils import kmeans
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare the chunked k-means used for CR builds with the legacy broadcast Lloyd."
+        ),
+    )
+    parser.add_argument("--docs", type=int, default=200_000, help="Number of synthetic rows.")
+    parser.add_argument("--dim", type=int, default=64, help="Row dimension.")
+    parser.add_argument("--k", type=int, default=16, help="Cluster count.")
+    parser.add_argument("--iters", type=int, default=30, help="Maximum iterations.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Also benchmark mini-batch updates with this batch size.",
+    )
+    parser.add_argument(
+        "--skip-legacy",
+        action="store_true",
+        help="Skip the legacy implementation (it allocates an (n, k, d) array per iteration).",
+    )
+    return parser.parse_args()
+
+
+def legacy_kmeans_lloyd(x: np.ndarray, k: int, iters: int = 25, seed: int = 42) -> np.ndarray:
+    """The pre-chunking implementation, kept here as the benchmark baseline."""
+    rng = np.random.default_rng(seed)
+    idx = rng.choice(x.shape[0], size=k, replace=False)
+    centroids = x[idx].copy()
+    labels = np.zeros(x.shape[0], dtype=np.int32)
+    for _ in range(iters):
+        distances = ((x[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        for centroid_idx in range(k):
+            mask = labels == centroid_idx
+            if mask.any():
+                centroids[centroid_idx] = x[mask].mean(axis=0)
+    return labels
+
+
+def _inertia(x: np.ndarray, labels: np.ndarray) -> float:
+    total = 0.0
+    for cid in np.unique(labels):
+        members = x[labels == cid]
+        total += float(((members - members.mean(axis=0)) ** 2).sum())
+    return total
+
+
+def _measure(label: str, fn: Callable[[], np.ndarray], x: np.ndarray) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    labels = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<12} {elapsed:8.2f}s  peak alloc {peak / 2**20:9.1f} MiB  "
+        f"inertia {_inertia(x, labels):.4g}"
+    )
+
+
+def main() -> None:
+    args = _parse_args()
+    rng = np.random.default_rng(0)
+    centers = rng.normal(scale=4.0, size=(args.k, args.dim))
+    assignment = rng.integers(0, args.k, size=args.docs)
+    x = (centers[assignment] + rng.normal(size=(args.docs, args.dim))).astype(np.float32)
+    print(f"n={args.docs} d={args.dim} k={args.k} iters<={args.iters}")
+
+    _measure("chunked", lambda: kmeans(x, args.k, iters=args.iters, seed=1).labels, x)
+    if args.batch_size:
+        _measure(
+            "mini-batch",
+            lambda: kmeans(x, args.k, iters=args.iters, seed=1, batch_size=args.batch_size).labels,
+            x,
+        )
+    if not args.skip_legacy:
+        _measure("legacy", lambda: legacy_kmeans_lloyd(x, args.k, iters=args.iters, seed=1), x)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+os.environ.setdefault("NEURALCACHE_STORAGE_PERSISTENCE_ENABLED", "false")
+
+from neuralcache.api import server  # noqa: E402
+from neuralcache.rerank import Reranker  # noqa: E402
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Namespace registry lookup throughput under thread contention.",
+    )
+    parser.add_argument("--threads", type=int, default=32, help="Concurrent request threads.")
+    parser.add_argument("--namespaces", type=int, default=1000, help="Resident namespaces.")
+    parser.add_argument("--lookups", type=int, default=20_000, help="Lookups per thread.")
+    return parser.parse_args()
+
+
+class _LegacyRegistry:
+    """The previous hot path: uncompiled regex plus an RLock around OrderedDict recency."""
+
+    def __init__(self, rerankers: dict[str, Reranker]) -> None:
+        self._lock = threading.RLock()
+        self._rerankers: OrderedDict[str, Reranker] = OrderedDict(rerankers)
+
+    def get(self, namespace: str) -> Reranker:
+        ns = namespace.strip()
+        if not re.match(server.settings.namespace_pattern, ns):
+            raise ValueError("Invalid namespace")
+        with self._lock:
+            rk = self._rerankers[ns]
+            self._rerankers.move_to_end(ns, last=True)
+            return rk
+
+
+def _leased(namespace: str) -> Reranker:
+    rk = server.get_reranker_for_namespace(namespace, lease=True)
+    rk.release_lease()
+    return rk
+
+
+def _run(fn: Callable[[str], Reranker], names: list[str], threads: int, lookups: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset: int) -> None:
+        barrier.wait()
+        for i in range(lookups):
+            fn(names[(offset * 7919 + i * 31) % len(names)])
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return threads * lookups / (time.perf_counter() - start)
+
+
+def main() -> None:
+    args = _parse_args()
+    names = [f"tenant-{i}" for i in range(args.namespaces)]
+    for name in names:
+        server.get_reranker_for_namespace(name)
+    legacy = _LegacyRegistry(server._rerankers)
+    print(f"threads={args.threads} namespaces={args.namespaces} lookups/thread={args.lookups}")
+    for label, fn in (
+        ("legacy locked", legacy.get),
+        ("lock-free", server.get_reranker_for_namespace),
+        ("lock-free + lease", _leased),
+    ):
+        rate = _run(fn, names, args.threads, args.lookups)
+        print(f"{label:<18} {rate / 1000.0:8.1f}k lookups/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from neuralcache.api.serialization import render_response
+from neuralcache.types import RerankDebug, RerankResponse, ScoredDocument
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Cost of rendering a /rerank response body: legacy pydantic path vs orjson.",
+    )
+    parser.add_argument("--results", type=int, default=100, help="Scored documents per response.")
+    parser.add_argument("--dim", type=int, default=768, help="Echoed embedding dimension.")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed renders per path.")
+    return parser.parse_args()
+
+
+def _legacy(results: list[ScoredDocument], debug: RerankDebug) -> bytes:
+    """The previous handler body: dump, re-validate, wrap, dump again, stdlib json."""
+    payload = [doc.model_dump() for doc in results]
+    model = RerankResponse(results=[ScoredDocument(**doc) for doc in payload], debug=debug)
+    return JSONResponse(model.model_dump()).body
+
+
+def _time(fn: Callable[[], bytes], repeats: int) -> tuple[np.ndarray, int]:
+    size = len(fn())
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000.0, size
+
+
+def main() -> None:
+    args = _parse_args()
+    rng = np.random.default_rng(0)
+    results = [
+        ScoredDocument(
+            id=f"doc-{i}",
+            text=f"document body number {i} " * 20,
+            metadata={"source": "bench", "rank": i},
+            embedding=rng.normal(size=args.dim).astype(np.float32).tolist(),
+            score=float(rng.random()),
+            components={"dense": 0.5, "narrative": 0.1, "pheromone": 0.0},
+        )
+        for i in range(args.results)
+    ]
+    debug = RerankDebug(gating={"mode": "auto", "uncertainty": 0.4}, epsilon_used=0.0)
+    print(f"results={args.results} dim={args.dim} repeats={args.repeats}")
+    baseline = None
+    for label, fn in (
+        ("legacy pydantic+json", lambda: _legacy(results, debug)),
+        ("orjson single pass", lambda: render_response(results, debug)),
+    ):
+        ms, size = _time(fn, args.repeats)
+        p50 = float(np.percentile(ms, 50))
+        baseline = baseline or p50
+        print(
+            f"{label:<22} p50 {p50:7.2f}ms p99 {np.percentile(ms, 99):7.2f}ms "
+            f"body {size / 1024:7.1f} KiB speedup {baseline / p50:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
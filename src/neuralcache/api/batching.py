@@ -0,0 +1,82 @@
+"""Dynamic batching of concurrent single ``/rerank`` calls.
+
+Under high request rates every small ``/rerank`` pays its own query encoding,
+pheromone round trip and numpy dispatch. :class:`RerankBatcher` collects the
+calls that reach the same namespace within ``window_ms`` (or until
+``max_size`` are waiting) and scores them with one
+:meth:`Reranker.score_many` pass.
+
+The first caller of a window leads: it waits for the window to close, scores
+the whole batch on its own thread and hands each follower its results. No
+scheduler thread is involved, so an idle server costs nothing; callers must
+run off the event loop (the API uses the threadpool).
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+
+from ..metrics import record_dynamic_batch
+from ..rerank import Reranker, ScoreJob
+from ..types import ScoredDocument
+
+
+class _Window:
+    __slots__ = ("jobs", "futures", "full")
+
+    def __init__(self) -> None:
+        self.jobs: list[ScoreJob] = []
+        self.futures: list[Future[list[ScoredDocument]]] = []
+        self.full = threading.Event()
+
+
+class RerankBatcher:
+    def __init__(self, window_ms: float, max_size: int = 16) -> None:
+        self.window_ms = float(window_ms)
+        self.max_size = max(1, int(max_size))
+        self._open: dict[Reranker, _Window] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, rk: Reranker, job: ScoreJob) -> list[ScoredDocument]:
+        """Score ``job`` on ``rk`` as part of the current window; blocks until done."""
+        future: Future[list[ScoredDocument]] = Future()
+        with self._lock:
+            window = self._open.get(rk)
+            leader = window is None
+            if window is None:
+                window = self._open[rk] = _Window()
+            window.jobs.append(job)
+            window.futures.append(future)
+            if len(window.jobs) >= self.max_size:
+                # Closed to newcomers; the leader wakes up and runs it now.
+                del self._open[rk]
+                window.full.set()
+        if leader:
+            window.full.wait(self.window_ms / 1000.0)
+            with self._lock:
+                if self._open.get(rk) is window:
+                    del self._open[rk]
+            self._run(rk, window)
+        return future.result()
+
+    def _run(self, rk: Reranker, window: _Window) -> None:
+        record_dynamic_batch(len(window.jobs), self.max_size)
+        try:
+            # A bad request fails only its own future; nothing is scored twice.
+            results = rk.score_many(window.jobs, return_exceptions=True)
+            for future, scored in zip(window.futures, results, strict=True):
+                if isinstance(scored, Exception):
+                    future.set_exception(scored)
+                else:
+                    future.set_result(scored)
+        except Exception as exc:
+            for future in window.futures:
+                future.set_exception(exc)
+        finally:
+            for future in window.futures:
+                if not future.done():
+                    future.set_exception(RuntimeError("dynamic batch was abandoned"))
+
+
+__all__ = ["RerankBatcher"]
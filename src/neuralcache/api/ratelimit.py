@@ -0,0 +1,249 @@
+"""Token-bucket rate limiting for the API.
+
+Each key (API token, namespace, both, or one global bucket) owns a bucket of
+``capacity`` tokens refilled continuously at ``refill_per_s``. A request costs
+one token, so a check is a constant-time read-modify-write of two floats per
+key. Bucket state lives in a :class:`TokenBucketBackend`: the in-process
+:class:`MemoryTokenBuckets` default, or :class:`SQLiteTokenBuckets` so several
+workers on one host draw from the same buckets. Anything implementing ``take``
+(Redis, memcached, ...) can be plugged in through :func:`set_backend`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Protocol
+
+from ..config import Settings
+
+_STRIPES = 64
+# How often a SQLite store deletes buckets that have refilled completely.
+_SWEEP_INTERVAL_S = 60.0
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after_s: float
+    reset_s: float
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_s)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after_s)))
+        return headers
+
+
+class TokenBucketBackend(Protocol):
+    def take(
+        self, key: str, capacity: float, refill_per_s: float, now: float
+    ) -> tuple[bool, float]:
+        """Spend one token from ``key`` if available; return ``(allowed, tokens_left)``."""
+        ...
+
+
+def _refill(tokens: float, last: float, capacity: float, refill_per_s: float, now: float) -> float:
+    return min(capacity, tokens + max(0.0, now - last) * refill_per_s)
+
+
+class MemoryTokenBuckets:
+    """Per-process buckets behind striped locks, LRU-capped at ``max_keys``.
+
+    A bucket dropped by the cap comes back full, which only ever errs towards
+    admitting traffic from keys that have been idle the longest.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._per_stripe = max(1, max_keys // _STRIPES)
+        self._locks = [threading.Lock() for _ in range(_STRIPES)]
+        self._buckets: list[OrderedDict[str, tuple[float, float]]] = [
+            OrderedDict() for _ in range(_STRIPES)
+        ]
+
+    def take(
+        self, key: str, capacity: float, refill_per_s: float, now: float
+    ) -> tuple[bool, float]:
+        stripe = hash(key) % _STRIPES
+        buckets = self._buckets[stripe]
+        with self._locks[stripe]:
+            tokens, last = buckets.pop(key, (capacity, now))
+            tokens = _refill(tokens, last, capacity, refill_per_s, now)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            buckets[key] = (tokens, now)
+            if len(buckets) > self._per_stripe:
+                buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class SQLiteTokenBuckets:
+    """Buckets in a SQLite file, shared by every worker that opens the same path.
+
+    A bucket idle for ``capacity / refill_per_s`` seconds is full, which is the
+    same as having no row at all, so such rows are swept periodically and the
+    table only holds recently active keys.
+    """
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, ts REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_ts ON buckets (ts)")
+        self._next_sweep = 0.0
+
+    def take(
+        self, key: str, capacity: float, refill_per_s: float, now: float
+    ) -> tuple[bool, float]:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front so two workers cannot both
+            # read the same token count and each spend it.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, ts FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, last = row if row is not None else (capacity, now)
+                tokens = _refill(float(tokens), float(last), capacity, refill_per_s, now)
+                allowed = tokens >= 1.0
+                if allowed:
+                    tokens -= 1.0
+                self._conn.execute(
+                    "INSERT INTO buckets (key, tokens, ts) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, ts = excluded.ts",
+                    (key, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            sweep = refill_per_s > 0 and now >= self._next_sweep
+            if sweep:
+                self._next_sweep = now + _SWEEP_INTERVAL_S
+        if sweep:
+            self.sweep(now - capacity / refill_per_s)
+        return allowed, tokens
+
+    def sweep(self, idle_before: float) -> int:
+        """Delete buckets last touched before ``idle_before``; returns rows removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM buckets WHERE ts < ?", (idle_before,))
+            return int(cursor.rowcount)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_custom_backend: TokenBucketBackend | None = None
+_configured: tuple[tuple[str, str], TokenBucketBackend] | None = None
+_backend_lock = threading.Lock()
+
+
+def set_backend(backend: TokenBucketBackend | None) -> None:
+    """Install a custom bucket store (``None`` reverts to the configured one)."""
+    global _custom_backend
+    _custom_backend = backend
+
+
+def _get_backend(settings: Settings) -> TokenBucketBackend:
+    global _configured
+    if _custom_backend is not None:
+        return _custom_backend
+    path = ""
+    if settings.rate_limit_backend == "sqlite":
+        path = settings.rate_limit_sqlite_path or str(Path(settings.storage_dir) / "ratelimit.db")
+    key = (settings.rate_limit_backend, path)
+    current = _configured
+    if current is not None and current[0] == key:
+        return current[1]
+    with _backend_lock:
+        if _configured is None or _configured[0] != key:
+            backend: TokenBucketBackend = SQLiteTokenBuckets(path) if path else MemoryTokenBuckets()
+            _configured = (key, backend)
+        return _configured[1]
+
+
+def _fingerprint(token: str) -> str:
+    # Bucket keys may be persisted; never store the API token itself.
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=8)
+def _namespace_regex(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern)
+
+
+def bucket_key(settings: Settings, api_key: str | None, namespace: str | None) -> str:
+    scope = settings.rate_limit_scope
+    if scope == "global":
+        return "global"
+    parts = []
+    if scope in ("api_key", "api_key_namespace"):
+        parts.append("key:" + (_fingerprint(api_key) if api_key else "anonymous"))
+    if scope in ("namespace", "api_key_namespace"):
+        # The limiter runs before the namespace is validated; names the endpoint
+        # would reject share the default bucket so raw header values cannot
+        # mint unbounded bucket keys.
+        ns = (namespace or "").strip()
+        if not ns or not _namespace_regex(settings.namespace_pattern).match(ns):
+            ns = settings.default_namespace
+        parts.append("ns:" + ns)
+    return "|".join(parts)
+
+
+def check_rate_limit(
+    settings: Settings, key: str, *, now: float | None = None
+) -> RateLimitDecision | None:
+    """Spend a token for ``key``; ``None`` when rate limiting is disabled."""
+    limit = settings.rate_limit_per_minute
+    if not limit or limit <= 0:
+        return None
+    capacity = float(settings.rate_limit_burst or limit)
+    refill_per_s = limit / 60.0
+    allowed, tokens = _get_backend(settings).take(
+        key, capacity, refill_per_s, time.time() if now is None else now
+    )
+    return RateLimitDecision(
+        allowed=allowed,
+        limit=int(capacity),
+        remaining=int(tokens),
+        retry_after_s=(1.0 - tokens) / refill_per_s if not allowed else 0.0,
+        reset_s=(capacity - tokens) / refill_per_s,
+    )
+
+
+__all__ = [
+    "MemoryTokenBuckets",
+    "RateLimitDecision",
+    "SQLiteTokenBuckets",
+    "TokenBucketBackend",
+    "bucket_key",
+    "check_rate_limit",
+    "set_backend",
+]
@@ -0,0 +1,145 @@
+"""Short-lived cache of rendered ``/rerank`` responses.
+
+Orchestrator retries and duplicate fan-out send byte-identical requests within
+seconds. :func:`request_fingerprint` reduces a request to a digest of
+everything that influences its response: query, document ids and content
+hashes, overrides, projection, namespace and the reranker's state epoch (so
+feedback invalidates earlier entries). :class:`ResponseCache` maps that digest
+to the encoded body for ``ttl_s`` seconds and coalesces concurrent misses:
+the first caller computes, identical callers arriving meanwhile wait for its
+result instead of scoring again.
+
+A hit skips scoring entirely, including pheromone exposure recording and the
+feedback store, so a retried request does not count as a second impression.
+Bodies degraded to meet a deadline are shared with joiners but not stored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Literal
+
+import numpy as np
+import orjson
+
+from ..types import RerankRequest
+
+CacheOutcome = Literal["hit", "miss", "join"]
+
+# Hashed separately (and cheaply) below rather than through model_dump. A
+# deadline does not change the full answer, and retries usually carry less
+# budget than the original, so it is left out of the key.
+_UNDUMPED_FIELDS = {"documents", "query_embedding", "deadline_ms"}
+
+
+def _update_vector(digest: hashlib.blake2b, values: list[float] | None) -> None:
+    if values is None:
+        digest.update(b"\x00")
+        return
+    digest.update(b"\x01")
+    digest.update(np.asarray(values, dtype=np.float32).tobytes())
+
+
+def request_fingerprint(
+    req: RerankRequest,
+    *,
+    namespace: str,
+    epoch: tuple[int, ...],
+    use_cr: bool | None,
+) -> str:
+    """Digest of every input that shapes the response to ``req``."""
+    digest = hashlib.blake2b(digest_size=20)
+    head = {
+        "namespace": namespace,
+        "epoch": list(epoch),
+        "use_cr": use_cr,
+        "request": req.model_dump(exclude=_UNDUMPED_FIELDS),
+    }
+    digest.update(orjson.dumps(head, option=orjson.OPT_SORT_KEYS))
+    _update_vector(digest, req.query_embedding)
+    for doc in req.documents:
+        digest.update(len(doc.id).to_bytes(4, "little"))
+        digest.update(doc.id.encode())
+        digest.update(hashlib.blake2b(doc.text.encode(), digest_size=16).digest())
+        digest.update(orjson.dumps(doc.metadata, option=orjson.OPT_SORT_KEYS))
+        _update_vector(digest, doc.embedding)
+    return digest.hexdigest()
+
+
+class _Flight:
+    __slots__ = ("done", "body", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.body: bytes | None = None
+        self.error: BaseException | None = None
+
+
+class ResponseCache:
+    """TTL + LRU map of fingerprint to response body, with single-flight misses."""
+
+    def __init__(self, ttl_s: float, max_entries: int = 1024) -> None:
+        self.ttl_s = float(ttl_s)
+        self.max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._inflight: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], tuple[bytes, bool]], *, now: float | None = None
+    ) -> tuple[bytes, CacheOutcome]:
+        """Return the cached body for ``key``, computing it at most once concurrently.
+
+        ``compute`` returns ``(body, storable)``. Callers that join an in-flight
+        computation get its body, or re-raise its exception. Only successful,
+        storable bodies are kept.
+        """
+        stamp = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > stamp:
+                    self._entries.move_to_end(key)
+                    return entry[1], "hit"
+                del self._entries[key]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        assert flight is not None
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            assert flight.body is not None
+            return flight.body, "join"
+        storable = False
+        try:
+            flight.body, storable = compute()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if storable and flight.body is not None:
+                    self._entries[key] = (stamp + self.ttl_s, flight.body)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            flight.done.set()
+        return flight.body, "miss"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+__all__ = ["CacheOutcome", "ResponseCache", "request_fingerprint"]
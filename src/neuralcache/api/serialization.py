@@ -0,0 +1,120 @@
+"""Single-pass JSON rendering of rerank responses.
+
+Scored results are already validated :class:`ScoredDocument` instances, so they
+are turned into plain dicts by attribute access and encoded to bytes with
+orjson in one call. The previous path dumped every result, re-validated it,
+wrapped it in a response model, dumped that again and ran the stdlib encoder.
+Without a projection the keys and values match ``RerankResponse.model_dump()``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Collection, Sequence
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+from ..types import RerankDebug, ScoredDocument
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Key order of projected results follows the full shape.
+_PROJECTED_ORDER = ("text", "metadata", "embedding")
+
+
+class ORJSONBytesResponse(Response):
+    """A JSON response whose body has already been encoded."""
+
+    media_type = "application/json"
+
+
+def scored_payload(doc: ScoredDocument, fields: Collection[str] | None = None) -> dict[str, Any]:
+    """Wire dict for one result; ``fields`` (see ``RerankRequest.fields``) drops the rest."""
+    if fields is None:
+        return {
+            "id": doc.id,
+            "text": doc.text,
+            "metadata": doc.metadata,
+            "embedding": doc.embedding,
+            "score": doc.score,
+            "components": doc.components,
+            "collapsed_ids": doc.collapsed_ids,
+        }
+    payload: dict[str, Any] = {"id": doc.id}
+    for name in _PROJECTED_ORDER:
+        if name in fields:
+            payload[name] = getattr(doc, name)
+    payload["score"] = doc.score
+    if "components" in fields:
+        payload["components"] = doc.components
+    payload["collapsed_ids"] = doc.collapsed_ids
+    return payload
+
+
+def response_payload(
+    results: Sequence[ScoredDocument],
+    debug: RerankDebug | None,
+    fields: Collection[str] | None = None,
+) -> dict[str, Any]:
+    return {
+        "results": [scored_payload(doc, fields) for doc in results],
+        "debug": debug.model_dump() if debug is not None else None,
+        "meta": {},
+    }
+
+
+def render_response(
+    results: Sequence[ScoredDocument],
+    debug: RerankDebug | None,
+    fields: Collection[str] | None = None,
+) -> bytes:
+    """Encode one ``RerankResponse``-shaped body."""
+    return orjson.dumps(response_payload(results, debug, fields), option=_OPTIONS)
+
+
+def render_documents(
+    results: Sequence[ScoredDocument], fields: Collection[str] | None = None
+) -> bytes:
+    """Encode a bare list of scored documents."""
+    return orjson.dumps([scored_payload(doc, fields) for doc in results], option=_OPTIONS)
+
+
+def render_batch(
+    items: Sequence[tuple[Sequence[ScoredDocument], RerankDebug | None, Collection[str] | None]],
+) -> bytes:
+    """Encode a ``list[BatchRerankResponseItem]``-shaped body from ``(results, debug, fields)``."""
+    return orjson.dumps(
+        [response_payload(results, debug, fields) for results, debug, fields in items],
+        option=_OPTIONS,
+    )
+
+
+def render_stream_item(
+    index: int,
+    results: Sequence[ScoredDocument],
+    debug: RerankDebug | None,
+    fields: Collection[str] | None = None,
+) -> bytes:
+    """One NDJSON line: a batch item's response plus its position in the batch."""
+    payload = {"index": index, **response_payload(results, debug, fields)}
+    return orjson.dumps(payload, option=_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+
+def render_stream_error(index: int, code: str, message: Any) -> bytes:
+    """One NDJSON line reporting a failed batch item in the error-envelope shape."""
+    payload = {"index": index, "error": {"code": code, "message": str(message), "detail": None}}
+    return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+
+
+__all__ = [
+    "NDJSON_MEDIA_TYPE",
+    "ORJSONBytesResponse",
+    "render_batch",
+    "render_documents",
+    "render_response",
+    "render_stream_error",
+    "render_stream_item",
+    "response_payload",
+    "scored_payload",
+]
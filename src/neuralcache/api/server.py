@@ -1,40 +1,78 @@
 from __future__ import annotations
 
+import itertools
+import re
 import threading
 import time
-from collections import OrderedDict, deque
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Any
 
 import numpy as np
 from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response, status, Request
 from contextlib import asynccontextmanager
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
 
 from ..config import Settings
-from ..metrics import latest_metrics, metrics_enabled, observe_rerank, record_feedback
-from ..rerank import Reranker
+from ..cr.corpus import CorpusUnavailableError
+from ..cr.registry import get_cr_index_manager
+from ..deadline import Deadline
+from ..metrics import (
+    latest_metrics,
+    metrics_enabled,
+    observe_rerank,
+    record_feedback,
+    record_namespace_eviction,
+    record_namespace_footprint,
+    record_namespace_load,
+    record_response_cache,
+)
+from ..rerank import Reranker, ScoreJob
+from .batching import RerankBatcher
+from .ratelimit import bucket_key, check_rate_limit
+from .response_cache import ResponseCache, request_fingerprint
+from .serialization import (
+    NDJSON_MEDIA_TYPE,
+    ORJSONBytesResponse,
+    render_batch,
+    render_response,
+    render_stream_error,
+    render_stream_item,
+)
 from ..types import (
     BatchRerankResponseItem,
-    Document,
     ErrorInfo,
     ErrorResponse,
     Feedback,
     RerankDebug,
     RerankRequest,
     RerankResponse,
+    ResultField,
     ScoredDocument,
 )
 
 settings = Settings()
 
-# Namespace registry for multi-tenant isolation
+# Namespace registry for multi-tenant isolation. Lookups are lock-free dict reads;
+# the lock is only taken to create or evict. Recency is approximate: each hit
+# stamps a tick from a shared clock and eviction picks the smallest tick.
 _namespace_lock = threading.RLock()
-_rerankers: "OrderedDict[str, Reranker]" = OrderedDict()
+_rerankers: dict[str, Reranker] = {}
+_last_used: dict[str, int] = {}
+_access_clock = itertools.count()
+# Names evicted since their last load, so a re-creation is counted as a reload.
+# Insertion-ordered and capped so namespace churn cannot grow it without bound.
+_evicted_namespaces: OrderedDict[str, None] = OrderedDict()
+_EVICTED_NAMESPACES_MAX = 4096
 
 # Legacy default reranker for backward compatibility (root/default namespace)
 reranker = Reranker(settings=settings)
 _rerankers[settings.default_namespace] = reranker
+_last_used[settings.default_namespace] = next(_access_clock)
 
 _sweeper_stop = threading.Event()
 _sweeper_thread: threading.Thread | None = None
@@ -45,32 +83,106 @@ _retention_metrics: dict[str, float | int | None] = {
 }
 
 
-def _validate_namespace(ns: str) -> str:
-    import re
+@lru_cache(maxsize=8)
+def _namespace_regex(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern)
 
-    pattern = settings.namespace_pattern
-    if not re.match(pattern, ns):
+
+def _validate_namespace(ns: str) -> str:
+    if not _namespace_regex(settings.namespace_pattern).match(ns):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid namespace")
     return ns
 
 
-def get_reranker_for_namespace(namespace: str | None) -> Reranker:
-    """Return (and possibly create) the reranker for a namespace.
-
-    Implements LRU eviction when settings.max_namespaces is set. The default namespace
-    is never evicted. Recency is updated on each access (including creation).
-    """
+def _resolve_namespace(namespace: str | None) -> str:
     # Treat None or empty string as default without validation
     ns = (namespace or "").strip()
     if not ns:
-        ns = settings.default_namespace
-    else:
-        ns = _validate_namespace(ns)
+        return settings.default_namespace
+    return _validate_namespace(ns)
+
+
+def _evict_locked(ns: str, reason: str, evicted: list[Reranker]) -> None:
+    """Drop ``ns`` from the registry; the caller closes ``evicted`` outside the lock."""
+    rk = _rerankers.pop(ns, None)
+    _last_used.pop(ns, None)
+    if rk is None:
+        return
+    _evicted_namespaces[ns] = None
+    _evicted_namespaces.move_to_end(ns)
+    while len(_evicted_namespaces) > _EVICTED_NAMESPACES_MAX:
+        _evicted_namespaces.popitem(last=False)
+    evicted.append(rk)
+    record_namespace_eviction(reason)
+
+
+def _enforce_memory_budget_locked(keep: str, evicted: list[Reranker]) -> None:
+    sizes = {ns: rk.estimated_bytes() for ns, rk in _rerankers.items()}
+    total = sum(sizes.values())
+    budget_mb = settings.namespace_memory_budget_mb
+    if budget_mb:
+        budget = int(budget_mb * 1024 * 1024)
+        for victim in _lru_order_locked():
+            if total <= budget:
+                break
+            if victim == keep:
+                continue
+            _evict_locked(victim, "memory", evicted)
+            total -= sizes[victim]
+    record_namespace_footprint(len(_rerankers), total)
+
+
+def _lru_order_locked() -> list[str]:
+    """Non-default namespaces, least recently used first."""
+    names = [ns for ns in _rerankers if ns != settings.default_namespace]
+    return sorted(names, key=lambda ns: _last_used.get(ns, -1))
+
+
+def _close_evicted(evicted: list[Reranker]) -> None:
+    # Flushing JSON state and closing SQLite is I/O; keep it off the registry lock.
+    # Rerankers still serving a request close when their lease is released.
+    for rk in evicted:
+        rk.close()
+
+
+def enforce_namespace_memory_budget(keep: str | None = None) -> None:
+    """Evict idle namespaces until the estimated footprint fits the configured budget."""
+    evicted: list[Reranker] = []
+    with _namespace_lock:
+        _enforce_memory_budget_locked(keep or settings.default_namespace, evicted)
+    _close_evicted(evicted)
+
+
+def get_reranker_for_namespace(namespace: str | None, *, lease: bool = False) -> Reranker:
+    """Return (and possibly create) the reranker for a namespace.
+
+    Implements LRU eviction when settings.max_namespaces is set, and evicts least
+    recently used namespaces while the estimated footprint exceeds
+    settings.namespace_memory_budget_mb. The default namespace is never evicted.
+    Recency is updated on each access (including creation). Evicted namespaces are
+    flushed and closed, and reload lazily from persisted state on their next request.
+    With ``lease=True`` the caller must call ``release_lease()`` when done.
+    """
+    ns = _resolve_namespace(namespace)
+    # Hot path: no lock. A reranker evicted between the read and the lease refuses
+    # the lease (it is already closing), and the slow path below sorts it out.
+    rk = _rerankers.get(ns)
+    if rk is not None and (not lease or rk.acquire_lease()):
+        _last_used[ns] = next(_access_clock)
+        if _rerankers.get(ns) is not rk:
+            # Evicted after the read: drop the stamp unless ns was already rebuilt.
+            with _namespace_lock:
+                if ns not in _rerankers:
+                    _last_used.pop(ns, None)
+        return rk
+
+    evicted: list[Reranker] = []
     with _namespace_lock:
         rk = _rerankers.get(ns)
         if rk is not None:
-            # Update recency
-            _rerankers.move_to_end(ns, last=True)
+            _last_used[ns] = next(_access_clock)
+            if lease:
+                rk.acquire_lease()
             return rk
 
         # Need to create. Enforce eviction if configured.
@@ -78,11 +190,10 @@ def get_reranker_for_namespace(namespace: str | None) -> Reranker:
         if max_ns > 0 and len(_rerankers) >= max_ns:
             # Evict according to policy (currently only LRU)
             if settings.namespace_eviction_policy == "lru":
-                for victim in list(_rerankers.keys()):
-                    if victim == settings.default_namespace:
-                        continue  # never evict default
-                    _rerankers.pop(victim, None)
-                    break  # evict one
+                # Evict down to the cap (it may have been lowered at runtime); never the default
+                excess = len(_rerankers) - max_ns + 1
+                for victim in _lru_order_locked()[:excess]:
+                    _evict_locked(victim, "count", evicted)
             # If only default exists and we still exceed, we'll just proceed (default retained)
 
         # Prepare settings for this namespace. Clone base settings but optionally
@@ -98,8 +209,30 @@ def get_reranker_for_namespace(namespace: str | None) -> Reranker:
                 data["storage_backend"] = "json"
             ns_settings = Settings(**data)
         rk = Reranker(settings=ns_settings)
-        _rerankers[ns] = rk  # newest -> end
-        return rk
+        _rerankers[ns] = rk
+        _last_used[ns] = next(_access_clock)
+        reloaded = ns in _evicted_namespaces
+        _evicted_namespaces.pop(ns, None)
+        record_namespace_load(reloaded)
+        _enforce_memory_budget_locked(ns, evicted)
+        if lease:
+            rk.acquire_lease()
+    _close_evicted(evicted)
+    return rk
+
+
+def _namespace_reranker(
+    namespace: str | None = Header(default=None, alias=settings.namespace_header),
+) -> Iterator[Reranker]:
+    """Request-scoped reranker whose teardown waits for the request if it is evicted."""
+    rk = get_reranker_for_namespace(namespace, lease=True)
+    try:
+        yield rk
+    finally:
+        rk.release_lease()
+
+
+_NAMESPACE_RERANKER = Depends(_namespace_reranker)
 
 
 def _run_startup_purge() -> None:
@@ -147,6 +280,9 @@ app = FastAPI(title=settings.api_title, version=settings.api_version, lifespan=_
 @app.middleware("http")
 async def add_version_header(request: Request, call_next):  # type: ignore[override]
     response = await call_next(request)
+    decision = getattr(request.state, "rate_limit", None)
+    if decision is not None:
+        response.headers.update(decision.headers())
     # Canonical header
     response.headers["X-NeuralCache-API-Version"] = settings.api_version
     # Back-compat alias (documented as deprecated once versioning policy matures)
@@ -154,12 +290,6 @@ async def add_version_header(request: Request, call_next):  # type: ignore[overr
     return response
 
 
-_feedback_cache: OrderedDict[str, list[ScoredDocument]] = OrderedDict()
-_feedback_lock = threading.Lock()
-_rate_lock = threading.Lock()
-_request_times: deque[float] = deque()
-
-
 def _retention_sweep_loop() -> None:
     interval = max(0.0, settings.storage_retention_sweep_interval_s)
     if interval <= 0:
@@ -180,7 +310,7 @@ def _retention_sweep_loop() -> None:
             pass
 
 
-def _build_gating_overrides(req: RerankRequest) -> dict[str, object] | None:
+def _build_overrides(req: RerankRequest) -> dict[str, object] | None:
     overrides: dict[str, object] = {}
     if req.gating_mode is not None:
         overrides["gating_mode"] = req.gating_mode
@@ -192,6 +322,10 @@ def _build_gating_overrides(req: RerankRequest) -> dict[str, object] | None:
         overrides["gating_max_candidates"] = int(req.gating_max_candidates)
     if req.gating_entropy_temp is not None:
         overrides["gating_entropy_temp"] = float(req.gating_entropy_temp)
+    if req.near_duplicate_threshold is not None:
+        overrides["near_duplicate_threshold"] = float(req.near_duplicate_threshold)
+    if req.cascade is not None:
+        overrides["cascade"] = bool(req.cascade)
     return overrides or None
 
 
@@ -200,6 +334,19 @@ def _extract_gating_debug(payload: dict[str, Any]) -> dict[str, Any] | None:
     return gating_debug if isinstance(gating_debug, dict) else None
 
 
+def _build_debug(payload: dict[str, Any]) -> RerankDebug:
+    return RerankDebug(
+        gating=_extract_gating_debug(payload),
+        deterministic=payload.get("deterministic"),
+        epsilon_used=payload.get("epsilon_used"),
+        mmr_lambda_used=payload.get("mmr_lambda_used"),
+        near_duplicates=payload.get("near_duplicates"),
+        cascade=payload.get("cascade"),
+        corpus=payload.get("corpus"),
+        deadline=payload.get("deadline"),
+    )
+
+
 def _require_api_key(
     x_api_key: str | None = Header(default=None, alias="x-api-key"),
     authorization: str | None = Header(default=None),
@@ -216,21 +363,28 @@ def _require_api_key(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API token")
 
 
-def _rate_limit() -> None:
-    limit = settings.rate_limit_per_minute
-    if not limit or limit <= 0:
+def _rate_limit(
+    request: Request,
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+    namespace: str | None = Header(default=None, alias=settings.namespace_header),
+) -> None:
+    if not settings.rate_limit_per_minute or settings.rate_limit_per_minute <= 0:
         return
-    now = time.time()
-    with _rate_lock:
-        window_start = now - 60.0
-        while _request_times and _request_times[0] < window_start:
-            _request_times.popleft()
-        if len(_request_times) >= limit:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded",
-            )
-        _request_times.append(now)
+    api_key = x_api_key.strip() if x_api_key else None
+    if not api_key and authorization and authorization.lower().startswith("bearer "):
+        api_key = authorization.split(" ", 1)[1].strip()
+    decision = check_rate_limit(settings, bucket_key(settings, api_key, namespace))
+    if decision is None:
+        return
+    # Picked up by the response middleware so successful responses carry the headers too.
+    request.state.rate_limit = decision
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers=decision.headers(),
+        )
 
 
 def _validate_request(req: RerankRequest) -> None:
@@ -252,28 +406,92 @@ def _validate_request(req: RerankRequest) -> None:
             )
 
 
-def _remember_scored(docs: list[ScoredDocument]) -> None:
-    if settings.feedback_cache_size <= 0:
-        return
-    with _feedback_lock:
-        for doc in docs:
-            _feedback_cache[doc.id] = docs
-        while len(_feedback_cache) > settings.feedback_cache_size:
-            _feedback_cache.popitem(last=False)
-
-
-def _documents_for_ids(ids: list[str]) -> dict[str, Document]:
-    result: dict[str, Document] = {}
-    with _feedback_lock:
-        for doc_id in ids:
-            scored = _feedback_cache.get(doc_id)
-            if not scored:
-                continue
-            for item in scored:
-                if item.id == doc_id:
-                    result[doc_id] = Document.model_validate(item.model_dump())
-                    break
-    return result
+def _score_request(
+    rk: Reranker,
+    req: RerankRequest,
+    q: np.ndarray,
+    *,
+    use_cr: bool | None,
+    overrides: dict[str, object] | None,
+    debug: dict[str, Any],
+    text_memo: dict[str, np.ndarray] | None = None,
+    deadline: Deadline | None = None,
+) -> list[ScoredDocument]:
+    if not req.corpus:
+        return rk.score(
+            q,
+            list(req.documents),
+            mmr_lambda=req.mmr_lambda,
+            query_text=req.query,
+            overrides=overrides,
+            debug=debug,
+            text_memo=text_memo,
+            use_cr=use_cr,
+            remember_top_k=req.top_k,
+            fields=req.fields,
+            deadline=deadline,
+        )
+    try:
+        return rk.score_corpus(
+            q,
+            req.query,
+            mmr_lambda=req.mmr_lambda,
+            filters=req.filters,
+            overrides=overrides,
+            debug=debug,
+            text_memo=text_memo,
+            remember_top_k=req.top_k,
+            fields=req.fields,
+            deadline=deadline,
+        )
+    except CorpusUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+
+_CACHE_HEADER = "X-NeuralCache-Cache"
+_response_cache: ResponseCache | None = None
+
+
+def _get_response_cache() -> ResponseCache | None:
+    """The process-wide response cache, or ``None`` when ``response_cache_ttl_s`` is unset."""
+    global _response_cache
+    ttl = settings.response_cache_ttl_s
+    if not ttl:
+        return None
+    cache = _response_cache
+    if cache is None or (cache.ttl_s, cache.max_entries) != (
+        ttl,
+        settings.response_cache_max_entries,
+    ):
+        cache = _response_cache = ResponseCache(ttl, settings.response_cache_max_entries)
+    return cache
+
+
+_batcher: RerankBatcher | None = None
+
+
+def _get_batcher() -> RerankBatcher | None:
+    """The dynamic batcher, or ``None`` when ``rerank_batch_window_ms`` is unset."""
+    global _batcher
+    window_ms = settings.rerank_batch_window_ms
+    if not window_ms:
+        return None
+    batcher = _batcher
+    if batcher is None or (batcher.window_ms, batcher.max_size) != (
+        window_ms,
+        settings.rerank_batch_max_size,
+    ):
+        batcher = _batcher = RerankBatcher(window_ms, settings.rerank_batch_max_size)
+    return batcher
+
+
+def _state_epoch(rk: Reranker, req: RerankRequest, use_cr: bool | None) -> tuple[int, int]:
+    """Reranker state epoch plus the served CR index version when candidates depend on it."""
+    index_version = 0
+    if req.corpus or (rk.settings.cr.on if use_cr is None else use_cr):
+        loaded = rk.cr_manager().get_loaded()
+        index_version = loaded.version if loaded is not None else 0
+    return rk.state_epoch, index_version
 
 
 @app.get("/healthz")
@@ -288,41 +506,73 @@ async def rerank(
     rate_ok: None = Depends(_rate_limit),
     use_cr: bool | None = Query(default=None, description="Override CR toggle"),
     namespace: str | None = Header(default=None, alias=settings.namespace_header),
-) -> JSONResponse:
-    rk = get_reranker_for_namespace(namespace)
-    previous_cr = rk.settings.cr.on
-    if use_cr is not None:
-        rk.settings.cr.on = use_cr
+    deadline_ms: float | None = Header(default=None, alias=settings.deadline_header, gt=0),
+    rk: Reranker = _NAMESPACE_RERANKER,
+) -> Response:
     _validate_request(req)
     start = time.perf_counter()
     status_label = "success"
-    try:
-        overrides = _build_gating_overrides(req)
+    doc_count = len(req.documents)
+    deadline = Deadline.earliest(req.deadline_ms, deadline_ms, start=start)
+    # Corpus requests retrieve their own candidates and are never batched.
+    batcher = None if req.corpus else _get_batcher()
+
+    def compute() -> tuple[bytes, bool]:
+        nonlocal doc_count
+        overrides = _build_overrides(req)
         debug_payload: dict[str, Any] = {}
+        q = None
         if req.query_embedding is not None:
             q = np.array(req.query_embedding, dtype=np.float32)
+        if batcher is not None:
+            job = ScoreJob(
+                docs=list(req.documents),
+                query_embedding=q,
+                query_text=req.query,
+                mmr_lambda=req.mmr_lambda,
+                overrides=overrides,
+                debug=debug_payload,
+                use_cr=use_cr,
+                remember_top_k=req.top_k,
+                fields=req.fields,
+                deadline=deadline,
+            )
+            scored = batcher.submit(rk, job)
         else:
-            q = rk.encode_query(req.query)
-        scored = rk.score(
-            q,
-            list(req.documents),
-            mmr_lambda=req.mmr_lambda,
-            query_text=req.query,
-            overrides=overrides,
-            debug=debug_payload,
-        )
+            scored = _score_request(
+                rk,
+                req,
+                rk.encode_query(req.query) if q is None else q,
+                use_cr=use_cr,
+                overrides=overrides,
+                debug=debug_payload,
+                deadline=deadline,
+            )
+        if req.corpus:
+            doc_count = len(scored)
         limited = scored[: min(req.top_k, len(scored))]
-        _remember_scored(limited)
-        payload = [doc.model_dump() for doc in limited]
-        debug_model = RerankDebug(
-            gating=_extract_gating_debug(debug_payload),
-            deterministic=debug_payload.get("deterministic"),
-            epsilon_used=debug_payload.get("epsilon_used"),
-            mmr_lambda_used=debug_payload.get("mmr_lambda_used"),
-        )
-        return JSONResponse(
-            RerankResponse(results=[ScoredDocument(**doc) for doc in payload], debug=debug_model).model_dump()
+        body = render_response(limited, _build_debug(debug_payload), req.fields)
+        # Degraded results are not worth replaying to requests with more time.
+        return body, deadline is None or not deadline.degradations
+
+    try:
+        cache = _get_response_cache()
+        if cache is None and batcher is None:
+            return ORJSONBytesResponse(compute()[0])
+        if cache is None:
+            # Waiting for batch-mates must not block the event loop.
+            body, _ = await run_in_threadpool(compute)
+            return ORJSONBytesResponse(body)
+        key = request_fingerprint(
+            req,
+            namespace=namespace or settings.default_namespace,
+            epoch=_state_epoch(rk, req, use_cr),
+            use_cr=use_cr,
         )
+        # Off the event loop so identical requests can join the in-flight one.
+        body, outcome = await run_in_threadpool(cache.get_or_compute, key, compute)
+        record_response_cache(outcome)
+        return ORJSONBytesResponse(body, headers={_CACHE_HEADER: outcome})
     except HTTPException:
         status_label = "error"
         raise
@@ -334,11 +584,108 @@ async def rerank(
             endpoint="/rerank",
             status=status_label,
             duration=time.perf_counter() - start,
-            doc_count=len(req.documents),
+            doc_count=doc_count,
+            namespace=namespace or settings.default_namespace,
+            include_namespace=settings.metrics_namespace_label,
+        )
+
+
+def _score_batch_item(
+    rk: Reranker,
+    req: RerankRequest,
+    *,
+    use_cr: bool | None,
+    text_memo: dict[str, np.ndarray],
+    query_memo: dict[str, np.ndarray],
+    deadline: Deadline | None = None,
+) -> tuple[list[ScoredDocument], RerankDebug, int]:
+    """Score one batch item; returns ``(top_k results, debug, documents considered)``."""
+    overrides = _build_overrides(req)
+    debug_payload: dict[str, Any] = {}
+    if req.query_embedding is not None:
+        q = np.array(req.query_embedding, dtype=np.float32)
+    else:
+        if req.query not in query_memo:
+            query_memo[req.query] = rk.encode_query(req.query)
+        q = query_memo[req.query]
+    scored = _score_request(
+        rk,
+        req,
+        q,
+        use_cr=use_cr,
+        overrides=overrides,
+        debug=debug_payload,
+        text_memo=text_memo,
+        deadline=deadline,
+    )
+    doc_count = len(scored) if req.corpus else len(req.documents)
+    return scored[: min(req.top_k, len(scored))], _build_debug(debug_payload), doc_count
+
+
+def _stream_batch(
+    rk: Reranker,
+    batch: list[RerankRequest],
+    *,
+    use_cr: bool | None,
+    namespace: str | None,
+    deadline_ms: float | None,
+    arrived: float,
+) -> Iterator[bytes]:
+    """Yield one NDJSON line per batch item as soon as it is scored.
+
+    Lines carry the item's ``index``; with ``batch_stream_workers > 1`` items are
+    scored concurrently and emitted in completion order. A failing item yields an
+    error line instead of ending the stream.
+    """
+    start = time.perf_counter()
+    status_label = "success"
+    total_docs = 0
+    text_memo: dict[str, np.ndarray] = {}
+    query_memo: dict[str, np.ndarray] = {}
+
+    def run(index: int) -> tuple[int, bytes, int]:
+        req = batch[index]
+        try:
+            limited, debug, doc_count = _score_batch_item(
+                rk,
+                req,
+                use_cr=use_cr,
+                text_memo=text_memo,
+                query_memo=query_memo,
+                deadline=Deadline.earliest(req.deadline_ms, deadline_ms, start=arrived),
+            )
+        except HTTPException as exc:
+            return index, render_stream_error(index, _error_code(exc.status_code), exc.detail), 0
+        return index, render_stream_item(index, limited, debug, req.fields), doc_count
+
+    workers = min(settings.batch_stream_workers, len(batch))
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if executor is None:
+            outcomes = (run(index) for index in range(len(batch)))
+        else:
+            outcomes = (
+                future.result()
+                for future in as_completed(executor.submit(run, i) for i in range(len(batch)))
+            )
+        for _, line, doc_count in outcomes:
+            total_docs += doc_count
+            yield line
+    except Exception:
+        status_label = "error"
+        raise
+    finally:
+        if executor is not None:
+            # Also reached when the client disconnects mid-stream.
+            executor.shutdown(wait=False, cancel_futures=True)
+        observe_rerank(
+            endpoint="/rerank/batch",
+            status=status_label,
+            duration=time.perf_counter() - start,
+            doc_count=total_docs,
             namespace=namespace or settings.default_namespace,
             include_namespace=settings.metrics_namespace_label,
         )
-        rk.settings.cr.on = previous_cr
 
 
 @app.post("/rerank/batch", response_model=list[BatchRerankResponseItem])
@@ -348,53 +695,53 @@ async def rerank_batch(
     rate_ok: None = Depends(_rate_limit),
     use_cr: bool | None = Query(default=None, description="Override CR toggle"),
     namespace: str | None = Header(default=None, alias=settings.namespace_header),
-) -> JSONResponse:
-    rk = get_reranker_for_namespace(namespace)
-    previous_cr = rk.settings.cr.on
-    if use_cr is not None:
-        rk.settings.cr.on = use_cr
+    accept: str | None = Header(default=None),
+    deadline_ms: float | None = Header(default=None, alias=settings.deadline_header, gt=0),
+    rk: Reranker = _NAMESPACE_RERANKER,
+) -> Response:
+    # One budget for the whole call; a tighter per-item deadline_ms also applies.
+    arrived = time.perf_counter()
     if len(batch) > settings.max_batch_size:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Batch size exceeds configured maximum",
         )
-    results: list[dict[str, object]] = []
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        # Reject malformed batches before the 200 status line is committed.
+        for req in batch:
+            _validate_request(req)
+        return StreamingResponse(
+            _stream_batch(
+                rk,
+                batch,
+                use_cr=use_cr,
+                namespace=namespace,
+                deadline_ms=deadline_ms,
+                arrived=arrived,
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    results: list[tuple[list[ScoredDocument], RerankDebug, list[ResultField] | None]] = []
     start = time.perf_counter()
     status_label = "success"
     total_docs = 0
+    # Shared across batch items so repeated texts/queries are encoded once per call.
+    text_memo: dict[str, np.ndarray] = {}
+    query_memo: dict[str, np.ndarray] = {}
     try:
         for req in batch:
             _validate_request(req)
-            total_docs += len(req.documents)
-            overrides = _build_gating_overrides(req)
-            debug_payload: dict[str, Any] = {}
-            if req.query_embedding is not None:
-                q = np.array(req.query_embedding, dtype=np.float32)
-            else:
-                q = rk.encode_query(req.query)
-            scored = rk.score(
-                q,
-                list(req.documents),
-                mmr_lambda=req.mmr_lambda,
-                query_text=req.query,
-                overrides=overrides,
-                debug=debug_payload,
-            )
-            limited = scored[: min(req.top_k, len(scored))]
-            _remember_scored(limited)
-            payload = [doc.model_dump() for doc in limited]
-            debug_model = RerankDebug(
-                gating=_extract_gating_debug(debug_payload),
-                deterministic=debug_payload.get("deterministic"),
-                epsilon_used=debug_payload.get("epsilon_used"),
-                mmr_lambda_used=debug_payload.get("mmr_lambda_used"),
-            )
-            results.append(
-                BatchRerankResponseItem(
-                    results=[ScoredDocument(**doc) for doc in payload], debug=debug_model
-                ).model_dump()
+            limited, debug, doc_count = _score_batch_item(
+                rk,
+                req,
+                use_cr=use_cr,
+                text_memo=text_memo,
+                query_memo=query_memo,
+                deadline=Deadline.earliest(req.deadline_ms, deadline_ms, start=arrived),
             )
-        return JSONResponse(results)
+            total_docs += doc_count
+            results.append((limited, debug, req.fields))
+        return ORJSONBytesResponse(render_batch(results))
     except HTTPException:
         status_label = "error"
         raise
@@ -410,7 +757,6 @@ async def rerank_batch(
             namespace=namespace or settings.default_namespace,
             include_namespace=settings.metrics_namespace_label,
         )
-        rk.settings.cr.on = previous_cr
 
 
 class FeedbackRequest(Feedback):
@@ -424,24 +770,28 @@ async def feedback(
     api_ok: None = Depends(_require_api_key),
     rate_ok: None = Depends(_rate_limit),
     namespace: str | None = Header(default=None, alias=settings.namespace_header),
+    rk: Reranker = _NAMESPACE_RERANKER,
 ) -> dict[str, str]:
     if not fb.selected_ids:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="selected_ids required")
-    doc_map = _documents_for_ids(fb.selected_ids)
-    if len(doc_map) != len(fb.selected_ids):
+    # Only this namespace's served results are eligible, so ids never leak across tenants.
+    embeddings = rk.feedback_store.lookup(fb.selected_ids)
+    if len(embeddings) != len(fb.selected_ids):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="One or more selected_ids are unknown or expired",
         )
-    rk = get_reranker_for_namespace(namespace)
     rk.update_feedback(
         fb.selected_ids,
-        doc_map=doc_map,
+        doc_map=None,
+        selected_embeddings=embeddings,
         success=fb.success,
         best_doc_embedding=fb.best_doc_embedding,
         best_doc_text=fb.best_doc_text,
     )
     record_feedback(fb.success >= settings.narrative_success_gate)
+    # Reinforcement grows the pheromone table, so re-check the budget here too.
+    enforce_namespace_memory_budget(keep=_resolve_namespace(namespace))
     return {"status": "ok"}
 
 
@@ -472,21 +822,56 @@ async def retention_metrics(api_ok: None = Depends(_require_api_key)) -> dict[st
     }
 
 
+@app.post("/admin/cr/reload")
+def reload_cr_index(api_ok: None = Depends(_require_api_key)) -> dict[str, object]:
+    # Sync handler: the load runs in the threadpool while requests keep using the old index.
+    manager = get_cr_index_manager(
+        settings.cr.index_npz_path,
+        settings.cr.index_meta_path,
+        check_interval_s=settings.cr.reload_check_interval_s,
+        corpus_dir=settings.cr.corpus_dir,
+    )
+    try:
+        loaded = manager.reload()
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"CR index reload failed: {exc}",
+        ) from exc
+    if loaded is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="CR index not found")
+    return {
+        "status": "ok",
+        "version": loaded.version,
+        "doc_count": int(loaded.index.meta.doc_count),
+        "corpus_doc_count": len(loaded.corpus) if loaded.corpus is not None else None,
+        "load_ms": round(loaded.load_seconds * 1000.0, 3),
+    }
+
+
+# Map status_code to stable error code strings
+_ERROR_CODES = {
+    status.HTTP_400_BAD_REQUEST: "BAD_REQUEST",
+    status.HTTP_401_UNAUTHORIZED: "UNAUTHORIZED",
+    status.HTTP_404_NOT_FOUND: "NOT_FOUND",
+    status.HTTP_413_CONTENT_TOO_LARGE: "ENTITY_TOO_LARGE",
+    status.HTTP_422_UNPROCESSABLE_CONTENT: "VALIDATION_ERROR",
+    status.HTTP_429_TOO_MANY_REQUESTS: "RATE_LIMITED",
+    status.HTTP_500_INTERNAL_SERVER_ERROR: "INTERNAL_ERROR",
+}
+
+
+def _error_code(status_code: int) -> str:
+    return _ERROR_CODES.get(status_code, "ERROR")
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:  # type: ignore[override]
-    # Map status_code to stable error code strings
-    code_map = {
-        status.HTTP_400_BAD_REQUEST: "BAD_REQUEST",
-        status.HTTP_401_UNAUTHORIZED: "UNAUTHORIZED",
-        status.HTTP_404_NOT_FOUND: "NOT_FOUND",
-        status.HTTP_413_CONTENT_TOO_LARGE: "ENTITY_TOO_LARGE",
-        status.HTTP_422_UNPROCESSABLE_CONTENT: "VALIDATION_ERROR",
-        status.HTTP_429_TOO_MANY_REQUESTS: "RATE_LIMITED",
-        status.HTTP_500_INTERNAL_SERVER_ERROR: "INTERNAL_ERROR",
-    }
-    code = code_map.get(exc.status_code, "ERROR")
+    code = _error_code(exc.status_code)
     body = ErrorResponse(error=ErrorInfo(code=code, message=str(exc.detail), detail=None))
-    return JSONResponse(status_code=exc.status_code, content=body.model_dump())
+    return JSONResponse(
+        status_code=exc.status_code, content=body.model_dump(), headers=exc.headers
+    )
 
 
 @app.exception_handler(RequestValidationError)
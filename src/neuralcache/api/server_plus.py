@@ -4,13 +4,15 @@ import time
 
 import numpy as np
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
 from ..config import Settings
+from ..cr.corpus import CorpusUnavailableError
 from ..metrics import latest_metrics, metrics_enabled, observe_rerank
 from ..rerank import Reranker
 from ..types import RerankRequest, ScoredDocument
+from .serialization import ORJSONBytesResponse, render_documents
 from .server import app as legacy_app
 
 settings = Settings()
@@ -30,20 +32,27 @@ def _resolve_query_embedding(req: RerankRequest) -> np.ndarray:
 
 
 def _score_documents(req: RerankRequest, use_cr: bool | None = None) -> list[ScoredDocument]:
-    docs = list(req.documents)
     query_embedding = _resolve_query_embedding(req)
-    previous = reranker.settings.cr.on
-    if use_cr is not None:
-        reranker.settings.cr.on = use_cr
-    try:
+    if req.corpus:
+        try:
+            scored = reranker.score_corpus(
+                query_embedding,
+                req.query,
+                mmr_lambda=req.mmr_lambda,
+                filters=req.filters,
+                fields=req.fields,
+            )
+        except CorpusUnavailableError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+    else:
         scored = reranker.score(
             query_embedding,
-            docs,
+            list(req.documents),
             mmr_lambda=req.mmr_lambda,
             query_text=req.query,
+            use_cr=use_cr,
+            fields=req.fields,
         )
-    finally:
-        reranker.settings.cr.on = previous
     return scored[: min(req.top_k, len(scored))]
 
 
@@ -55,14 +64,13 @@ def _observe(endpoint: str, status: str, duration: float, doc_count: int) -> Non
 def rerank_endpoint(
     req: RerankRequest,
     use_cr: bool | None = Query(default=None, description="Override CR toggle"),
-) -> JSONResponse:
+) -> Response:
     start = time.perf_counter()
     status = "success"
     scope_docs: list[ScoredDocument] = []
     try:
         scope_docs = _score_documents(req, use_cr=use_cr)
-        payload = [doc.model_dump() for doc in scope_docs]
-        return JSONResponse(payload)
+        return ORJSONBytesResponse(render_documents(scope_docs, req.fields))
     except Exception as exc:  # pragma: no cover - FastAPI handles traceback
         status = "error"
         raise exc
@@ -75,7 +83,7 @@ def rerank_endpoint(
 def rerank_batch_endpoint(
     batch: BatchRerankRequest,
     use_cr: bool | None = Query(default=None, description="Override CR toggle"),
-) -> JSONResponse:
+) -> Response:
     start = time.perf_counter()
     status = "success"
     scored_batches: list[list[ScoredDocument]] = []
@@ -83,8 +91,14 @@ def rerank_batch_endpoint(
         for request in batch.requests:
             scored = _score_documents(request, use_cr=use_cr)
             scored_batches.append(scored)
-        payload = [[doc.model_dump() for doc in scored] for scored in scored_batches]
-        return JSONResponse(payload)
+        return ORJSONBytesResponse(
+            b"["
+            + b",".join(
+                render_documents(scored, request.fields)
+                for scored, request in zip(scored_batches, batch.requests, strict=False)
+            )
+            + b"]"
+        )
     except Exception as exc:  # pragma: no cover
         status = "error"
         raise exc
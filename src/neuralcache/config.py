@@ -13,8 +13,29 @@ class CRSettings(BaseModel):
     top_coarse: int = 3
     top_topics_per_coarse: int = 2
     max_candidates: int = 256
+    pq_rescore_factor: int = Field(
+        default=8,
+        ge=0,
+        description="Shortlist multiple re-scored exactly when the index has PQ codes (0: off)",
+    )
+    pq_exact_rescore: bool = Field(
+        default=True,
+        description="Re-score PQ shortlists from the float q0 store; False ranks corpus-mode "
+        "leaves from the codes alone and never reads q0",
+    )
+    build_workers: int = Field(
+        default=1, ge=1, description="Processes used for per-bucket clustering in index builds"
+    )
     index_npz_path: str = "cr_index.npz"
     index_meta_path: str = "cr_index.meta.json"
+    corpus_dir: str | None = Field(
+        default=None,
+        description="Corpus store written by the index build; enables corpus-mode requests",
+    )
+    reload_check_interval_s: float | None = Field(
+        default=2.0,
+        description="How often to stat the index files for a new version (None: admin reload only)",
+    )
 
 
 class Settings(BaseSettings):
@@ -25,6 +46,12 @@ class Settings(BaseSettings):
     weight_diversity: float = 0.2  # used in MMR
     epsilon_greedy: float = 0.05
     mmr_lambda_default: float = 0.5
+    near_duplicate_threshold: float | None = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="If set, candidates with cosine >= threshold are collapsed before MMR",
+    )
     deterministic: bool = False
     deterministic_seed: int = 1337
 
@@ -36,6 +63,15 @@ class Settings(BaseSettings):
     # Embeddings
     embedding_backend: str = "hash"
     embedding_model: str | None = None
+    embedding_cache_dir: str | None = Field(
+        default=None,
+        description="If set, encoder outputs are persisted here and shared across restarts",
+    )
+    embedding_cache_shard_mb: int = 64
+    cascade_enabled: bool = Field(
+        default=False,
+        description="Gate on hashing-encoder scores and only model-encode the surviving documents",
+    )
 
     # Pheromone
     pheromone_decay_half_life_s: float = 1800.0  # 30min half-life
@@ -48,9 +84,58 @@ class Settings(BaseSettings):
     max_documents: int = 128
     max_text_length: int = 8192
     max_batch_size: int = 16
-    feedback_cache_size: int = 1024
+    batch_stream_workers: int = Field(
+        default=1,
+        ge=1,
+        description="Threads scoring NDJSON-streamed batch items; >1 emits in completion order",
+    )
+    feedback_cache_size: int = 1024  # served results remembered per namespace for /feedback
+    feedback_cache_max_mb: float | None = Field(
+        default=8.0,
+        gt=0,
+        description="Byte cap on each namespace's feedback store (may lower feedback_cache_size)",
+    )
+    feedback_ttl_s: float | None = Field(
+        default=3600.0,
+        description="Seconds a served result stays eligible for /feedback (None or <=0: no expiry)",
+    )
+    response_cache_ttl_s: float | None = Field(
+        default=None,
+        gt=0,
+        description="Seconds identical /rerank requests reuse a response (None: cache off)",
+    )
+    response_cache_max_entries: int = Field(default=1024, ge=1)
+    rerank_batch_window_ms: float | None = Field(
+        default=None,
+        gt=0,
+        description="Window in which concurrent /rerank calls per namespace are scored together",
+    )
+    rerank_batch_max_size: int = Field(
+        default=16, ge=1, description="Requests that close a dynamic batch window early"
+    )
+    deadline_header: str = Field(
+        default="X-NeuralCache-Deadline-Ms",
+        description="HTTP header carrying a per-request latency budget in milliseconds",
+    )
     api_tokens: list[str] = Field(default_factory=list)
     rate_limit_per_minute: int | None = None
+    rate_limit_burst: int | None = Field(
+        default=None,
+        ge=1,
+        description="Token-bucket capacity; defaults to rate_limit_per_minute",
+    )
+    rate_limit_scope: Literal["global", "api_key", "namespace", "api_key_namespace"] = Field(
+        default="global",
+        description="What each token bucket is keyed by",
+    )
+    rate_limit_backend: Literal["memory", "sqlite"] = Field(
+        default="memory",
+        description="Bucket store; 'sqlite' shares buckets between workers on one host",
+    )
+    rate_limit_sqlite_path: str | None = Field(
+        default=None,
+        description="SQLite bucket file (defaults to <storage_dir>/ratelimit.db)",
+    )
     metrics_enabled: bool = True
 
     # Storage
@@ -101,6 +186,14 @@ class Settings(BaseSettings):
         default="lru",
         description="Eviction policy for namespaces when max_namespaces is reached. Only 'lru' currently supported."
     )
+    namespace_memory_budget_mb: float | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "If set, least recently used non-default namespaces are evicted (flushed and "
+            "closed) while their estimated total footprint exceeds this many MiB"
+        ),
+    )
 
     # Namespaced persistence
     namespaced_persistence: bool = Field(
@@ -0,0 +1,181 @@
+"""Recall/latency benchmark of CR search against exact cosine search.
+
+:func:`run_grid` builds one index per ``(d1, d2, k2, k1)`` combination and
+sweeps the query-time parameters (``top_coarse``, ``top_topics_per_coarse``)
+over it. Recall@k is the fraction of the exact top-k documents that appear in
+the CR candidate set, which is what bounds the reranker downstream. Queries
+are held out of the indexed corpus.
+"""
+
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+import tempfile
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+import numpy as np
+
+from neuralcache.cr.index import CRIndex, build_cr_index, save_cr_index
+from neuralcache.cr.search import hierarchical_candidates
+
+GRID_KEYS = ("d1", "d2", "k2", "k1", "top_coarse", "top_topics_per_coarse")
+
+
+@dataclass
+class BenchResult:
+    d1: int
+    d2: int
+    k2: int
+    k1: int
+    top_coarse: int
+    top_topics_per_coarse: int
+    max_candidates: int
+    k: int
+    recall_at_k: float
+    mean_candidates: float
+    p50_ms: float
+    p99_ms: float
+    exact_p50_ms: float
+    index_bytes: int
+    build_s: float
+
+
+def synthetic_corpus(n_docs: int, dim: int, *, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """Gaussian blobs: enough structure for routing to matter, cheap to generate."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=2.0, size=(clusters, dim))
+    corpus = centers[rng.integers(0, clusters, size=n_docs)]
+    return (corpus + rng.normal(size=corpus.shape)).astype(np.float32)
+
+
+def split_queries(
+    corpus: np.ndarray, n_queries: int, *, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Hold ``n_queries`` random rows out of ``corpus``; returns ``(indexed, queries)``."""
+    rng = np.random.default_rng(seed)
+    held = np.zeros(corpus.shape[0], dtype=bool)
+    held[rng.choice(corpus.shape[0], size=min(n_queries, corpus.shape[0] - 1), replace=False)] = (
+        True
+    )
+    return np.asarray(corpus[~held]), np.asarray(corpus[held])
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    return x / (np.linalg.norm(x, axis=-1, keepdims=True) + 1e-9)
+
+
+def exact_top_k(
+    queries: np.ndarray, corpus: np.ndarray, k: int, chunk_rows: int = 65536
+) -> tuple[np.ndarray, float]:
+    """Brute-force cosine top-``k`` ids per query and the median per-query latency."""
+    q = _unit(np.asarray(queries, dtype=np.float32))
+    best = np.zeros((q.shape[0], k), dtype=np.int64)
+    latencies = []
+    for row, query in enumerate(q):
+        start = time.perf_counter()
+        scores = np.concatenate(
+            [
+                _unit(np.asarray(corpus[s : s + chunk_rows], dtype=np.float32)) @ query
+                for s in range(0, corpus.shape[0], chunk_rows)
+            ]
+        )
+        top = np.argpartition(-scores, k - 1)[:k]
+        best[row] = top[np.argsort(-scores[top])]
+        latencies.append(time.perf_counter() - start)
+    return best, float(np.median(latencies) * 1000.0)
+
+
+def _index_bytes(index: CRIndex) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        npz, meta = Path(tmp) / "i.npz", Path(tmp) / "i.json"
+        save_cr_index(index, str(npz), str(meta))
+        return npz.stat().st_size + meta.stat().st_size
+
+
+def run_grid(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    grid: dict[str, Sequence[int]],
+    *,
+    k: int = 10,
+    max_candidates: int = 256,
+    seed: int = 42,
+    on_result: Callable[[BenchResult], None] | None = None,
+) -> list[BenchResult]:
+    """Benchmark every combination in ``grid`` (keys from :data:`GRID_KEYS`)."""
+    missing = [key for key in GRID_KEYS if key not in grid]
+    if missing:
+        raise ValueError(f"Grid is missing {', '.join(missing)}")
+    truth, exact_ms = exact_top_k(queries, corpus, k)
+    truth_sets = [set(row.tolist()) for row in truth]
+    results: list[BenchResult] = []
+    for d1, d2, k2, k1 in itertools.product(grid["d1"], grid["d2"], grid["k2"], grid["k1"]):
+        if d2 > d1:
+            continue
+        start = time.perf_counter()
+        index = build_cr_index(corpus, d1=d1, d2=d2, k2=k2, k1_per_bucket=k1, seed=seed)
+        build_s = time.perf_counter() - start
+        size = _index_bytes(index)
+        for top_coarse, top_topics in itertools.product(
+            grid["top_coarse"], grid["top_topics_per_coarse"]
+        ):
+            hierarchical_candidates(queries[0], corpus, index, top_coarse, top_topics)  # warm-up
+            latencies, recalls, counts = [], [], []
+            for query, expected in zip(queries, truth_sets, strict=True):
+                t0 = time.perf_counter()
+                found = hierarchical_candidates(
+                    query, corpus, index, top_coarse, top_topics, max_candidates
+                )
+                latencies.append(time.perf_counter() - t0)
+                recalls.append(len(expected.intersection(found)) / k)
+                counts.append(len(found))
+            ms = np.asarray(latencies) * 1000.0
+            result = BenchResult(
+                d1=d1,
+                d2=d2,
+                k2=k2,
+                k1=k1,
+                top_coarse=top_coarse,
+                top_topics_per_coarse=top_topics,
+                max_candidates=max_candidates,
+                k=k,
+                recall_at_k=float(np.mean(recalls)),
+                mean_candidates=float(np.mean(counts)),
+                p50_ms=float(np.percentile(ms, 50)),
+                p99_ms=float(np.percentile(ms, 99)),
+                exact_p50_ms=exact_ms,
+                index_bytes=size,
+                build_s=build_s,
+            )
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
+def write_results(results: Sequence[BenchResult], path: str | Path) -> None:
+    """Write results as CSV (``.csv`` suffix) or JSON (anything else)."""
+    out = Path(path)
+    if out.suffix.lower() == ".csv":
+        with out.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=[f.name for f in fields(BenchResult)])
+            writer.writeheader()
+            writer.writerows(asdict(result) for result in results)
+        return
+    out.write_text(json.dumps([asdict(result) for result in results], indent=2), encoding="utf-8")
+
+
+__all__ = [
+    "GRID_KEYS",
+    "BenchResult",
+    "exact_top_k",
+    "run_grid",
+    "split_queries",
+    "synthetic_corpus",
+    "write_results",
+]
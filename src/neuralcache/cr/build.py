@@ -0,0 +1,303 @@
+"""Streaming, out-of-core CR index builder.
+
+The corpus is read from JSONL in fixed-size chunks, encoded (optionally in a
+process pool) and spilled into a memory-mapped ``.npy`` inside a work
+directory. PCA is fitted from that file with the streaming covariance
+accumulator, the projections are spilled the same way, and k-means runs over
+the memory-mapped projections. Progress is checkpointed after every chunk so
+an interrupted build resumes where it stopped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from neuralcache.cr.index import CRIndex, assemble_cr_index
+from neuralcache.cr.utils import pca_fit_streaming
+from neuralcache.embedding import encode_texts
+
+try:  # pragma: no cover - platform dependent
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+CHECKPOINT_NAME = "checkpoint.json"
+EMBEDDINGS_NAME = "embeddings_q0.npy"
+Q1_NAME = "q1.npy"
+Q2_NAME = "q2.npy"
+PROJECTIONS_NAME = "projections.npz"
+
+
+@dataclass
+class StreamingBuildStats:
+    doc_count: int
+    seconds: float
+    resumed_rows: int
+    peak_rss_mb: float | None
+
+    @property
+    def docs_per_s(self) -> float:
+        return self.doc_count / max(self.seconds, 1e-9)
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MiB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    # ru_maxrss is reported in bytes on macOS and KiB elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def count_records(path: Path) -> int:
+    with path.open("r", encoding="utf-8") as handle:
+        return sum(1 for line in handle if line.strip())
+
+
+def iter_jsonl_chunks(path: Path, chunk_size: int, skip: int = 0) -> Iterator[list[dict[str, Any]]]:
+    """Yield lists of up to ``chunk_size`` records, skipping the first ``skip``."""
+    chunk: list[dict[str, Any]] = []
+    seen = 0
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            seen += 1
+            if seen <= skip:
+                continue
+            chunk.append(json.loads(line))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _encode_chunk(texts: list[str], dim: int) -> np.ndarray:
+    return encode_texts(texts, dim=dim).astype(np.float32)
+
+
+def _source_fingerprint(path: Path, dim: int) -> dict[str, Any]:
+    stat = path.stat()
+    return {
+        "source": str(path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "dim": dim,
+    }
+
+
+def _write_checkpoint(work_dir: Path, state: dict[str, Any]) -> None:
+    tmp = work_dir / (CHECKPOINT_NAME + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    tmp.replace(work_dir / CHECKPOINT_NAME)
+
+
+def _load_checkpoint(work_dir: Path, fingerprint: dict[str, Any]) -> dict[str, Any] | None:
+    try:
+        state = json.loads((work_dir / CHECKPOINT_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    if state.get("fingerprint") != fingerprint:
+        return None
+    return state
+
+
+def _open_npy(path: Path, shape: tuple[int, int], resume: bool) -> np.memmap:
+    if resume and path.exists():
+        mapped = np.load(path, mmap_mode="r+")
+        if mapped.shape == shape:
+            return mapped
+    return np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+
+
+def _encode_to_memmap(
+    docs_path: Path,
+    out: np.memmap,
+    *,
+    dim: int,
+    chunk_size: int,
+    workers: int,
+    start_row: int,
+    on_progress: Any,
+) -> None:
+    chunks = (
+        [str(rec.get("text", "")) for rec in chunk]
+        for chunk in iter_jsonl_chunks(docs_path, chunk_size, skip=start_row)
+    )
+    row = start_row
+
+    def _commit(vectors: np.ndarray) -> None:
+        nonlocal row
+        out[row : row + vectors.shape[0]] = vectors
+        row += vectors.shape[0]
+        out.flush()
+        on_progress(row)
+
+    if workers <= 1:
+        for texts in chunks:
+            _commit(_encode_chunk(texts, dim))
+        return
+
+    # Keep a bounded number of chunks in flight and commit them in order so the
+    # checkpoint always describes a contiguous prefix of the corpus.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future[np.ndarray]] = deque()
+        for texts in chunks:
+            pending.append(pool.submit(_encode_chunk, texts, dim))
+            if len(pending) >= workers * 2:
+                _commit(pending.popleft().result())
+        while pending:
+            _commit(pending.popleft().result())
+
+
+def _project_to_memmap(
+    src: np.ndarray,
+    components: np.ndarray,
+    mean: np.ndarray,
+    out_path: Path,
+    chunk_rows: int,
+) -> np.ndarray:
+    comps = components.astype(np.float32)
+    mu = mean.astype(np.float32)
+    out = np.lib.format.open_memmap(
+        out_path, mode="w+", dtype=np.float32, shape=(src.shape[0], comps.shape[0])
+    )
+    for start in range(0, src.shape[0], chunk_rows):
+        block = np.asarray(src[start : start + chunk_rows], dtype=np.float32)
+        out[start : start + block.shape[0]] = (block - mu[None, :]) @ comps.T
+    out.flush()
+    return out
+
+
+def build_cr_index_streaming(
+    docs_jsonl: str | os.PathLike[str],
+    work_dir: str | os.PathLike[str],
+    *,
+    dim: int = 384,
+    d1: int = 256,
+    d2: int = 64,
+    k2: int = 16,
+    k1_per_bucket: int = 12,
+    seed: int = 42,
+    chunk_size: int = 4096,
+    workers: int = 1,
+    resume: bool = True,
+    kmeans_batch_size: int | None = None,
+    pq_m: int | None = None,
+) -> tuple[CRIndex, StreamingBuildStats]:
+    """Build a CR index without holding the corpus or its embeddings in memory."""
+    docs_path = Path(docs_jsonl)
+    work = Path(work_dir)
+    work.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+
+    fingerprint = _source_fingerprint(docs_path, dim)
+    state = (_load_checkpoint(work, fingerprint) if resume else None) or {
+        "fingerprint": fingerprint,
+        "stage": "encode",
+        "encoded_rows": 0,
+    }
+    # The embeddings depend only on the source; the spilled projections also on
+    # these, so a rerun that changes them redoes PCA from the kept embeddings.
+    # Clustering is never checkpointed and always uses the current arguments.
+    projection = {"d1": min(d1, dim), "d2": d2, "chunk_size": chunk_size}
+    if state["stage"] == "cluster" and state.get("projection") != projection:
+        state["stage"] = "project"
+    resumed_rows = int(state["encoded_rows"])
+    if "doc_count" not in state:
+        state["doc_count"] = count_records(docs_path)
+        _write_checkpoint(work, state)
+    doc_count = int(state["doc_count"])
+    if doc_count == 0:
+        raise ValueError("Docs JSONL contained no usable records")
+
+    if state["stage"] == "encode":
+        embeddings = _open_npy(work / EMBEDDINGS_NAME, (doc_count, dim), resume=resumed_rows > 0)
+
+        def _progress(rows: int) -> None:
+            state["encoded_rows"] = rows
+            _write_checkpoint(work, state)
+
+        _encode_to_memmap(
+            docs_path,
+            embeddings,
+            dim=dim,
+            chunk_size=chunk_size,
+            workers=workers,
+            start_row=resumed_rows,
+            on_progress=_progress,
+        )
+        del embeddings
+        state["stage"] = "project"
+        _write_checkpoint(work, state)
+
+    if state["stage"] == "project":
+        embeddings = np.load(work / EMBEDDINGS_NAME, mmap_mode="r")
+        proj1_components, proj1_mean = pca_fit_streaming(
+            (embeddings[s : s + chunk_size] for s in range(0, doc_count, chunk_size)),
+            out_dim=min(d1, dim),
+        )
+        q1 = _project_to_memmap(
+            embeddings, proj1_components, proj1_mean, work / Q1_NAME, chunk_size
+        )
+        proj2_components, proj2_mean = pca_fit_streaming(
+            (q1[s : s + chunk_size] for s in range(0, doc_count, chunk_size)),
+            out_dim=min(d2, q1.shape[1]),
+        )
+        _project_to_memmap(q1, proj2_components, proj2_mean, work / Q2_NAME, chunk_size)
+        np.savez(
+            work / PROJECTIONS_NAME,
+            proj1_components=proj1_components,
+            proj1_mean=proj1_mean,
+            proj2_components=proj2_components,
+            proj2_mean=proj2_mean,
+        )
+        del embeddings, q1
+        state["stage"] = "cluster"
+        state["projection"] = projection
+        _write_checkpoint(work, state)
+
+    projections = np.load(work / PROJECTIONS_NAME)
+    index = assemble_cr_index(
+        np.load(work / Q1_NAME, mmap_mode="r"),
+        np.load(work / Q2_NAME, mmap_mode="r"),
+        proj1_components=projections["proj1_components"],
+        proj1_mean=projections["proj1_mean"],
+        proj2_components=projections["proj2_components"],
+        proj2_mean=projections["proj2_mean"],
+        k2=k2,
+        k1_per_bucket=k1_per_bucket,
+        seed=seed,
+        kmeans_batch_size=kmeans_batch_size,
+        workers=workers,
+        embeddings_q0=np.load(work / EMBEDDINGS_NAME, mmap_mode="r"),
+        pq_m=pq_m,
+    )
+    stats = StreamingBuildStats(
+        doc_count=doc_count,
+        seconds=time.perf_counter() - started,
+        resumed_rows=resumed_rows,
+        peak_rss_mb=peak_rss_mb(),
+    )
+    return index, stats
+
+
+__all__ = [
+    "StreamingBuildStats",
+    "build_cr_index_streaming",
+    "count_records",
+    "iter_jsonl_chunks",
+    "peak_rss_mb",
+]
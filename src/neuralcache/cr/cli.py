@@ -1,11 +1,26 @@
 from __future__ import annotations
 
 import argparse
+import itertools
 import json
 from pathlib import Path
 
-from neuralcache.cr.index import build_cr_index, save_cr_index
+import numpy as np
+
+from neuralcache.config import Settings
+from neuralcache.cr.bench import (
+    BenchResult,
+    run_grid,
+    split_queries,
+    synthetic_corpus,
+    write_results,
+)
+from neuralcache.cr.build import EMBEDDINGS_NAME, build_cr_index_streaming, iter_jsonl_chunks
+from neuralcache.cr.corpus import append_corpus_store, load_corpus_store, write_corpus_store
+from neuralcache.cr.index import build_cr_index, load_cr_index, save_cr_index
+from neuralcache.cr.update import add_documents, drift_report, remove_documents
 from neuralcache.embedding import encode_texts
+from neuralcache.encoder import create_encoder
 
 
 def _load_jsonl(path: Path) -> list[dict[str, object]]:
@@ -26,14 +41,110 @@ def build_cr_main(argv: list[str] | None = None) -> None:
     parser.add_argument("--d2", type=int, default=64, help="Second PCA dimension")
     parser.add_argument("--k2", type=int, default=16, help="Coarse bucket count")
     parser.add_argument("--k1", type=int, default=12, help="Topic buckets per coarse bucket")
+    parser.add_argument(
+        "--pca",
+        choices=["full", "randomized", "incremental"],
+        default=None,
+        help="PCA solver: exact SVD (default), randomized SVD, or streaming covariance "
+        "(fixed memory; the only solver --stream supports)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Seed for PCA and clustering")
+    parser.add_argument(
+        "--chunk-size", type=int, default=65536, help="Rows per chunk for streaming fits"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Build out-of-core: spill embeddings to disk and checkpoint progress",
+    )
+    parser.add_argument(
+        "--work-dir", default=None, help="Scratch directory for --stream (default: <npz>.work)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for per-bucket clustering (and encoding with --stream); "
+        "defaults to cr.build_workers",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignore any checkpoint in the work directory and start over",
+    )
+    parser.add_argument(
+        "--pq-m",
+        type=int,
+        default=0,
+        help="Product-quantize q0 into this many one-byte codes per doc (must divide --dim)",
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        default=None,
+        help="Also write a memory-mapped corpus store (ids, texts, metadata, q0) for corpus mode",
+    )
+    parser.add_argument(
+        "--no-model-embeddings",
+        action="store_true",
+        help="Do not store embeddings from the configured NEURALCACHE_EMBEDDING_BACKEND in the "
+        "corpus store (the server then encodes retrieved candidates per request)",
+    )
     parser.add_argument("--npz", default="cr_index.npz", help="Output NPZ path")
     parser.add_argument("--meta", default="cr_index.meta.json", help="Output metadata JSON path")
     args = parser.parse_args(argv)
 
+    settings = Settings()
+    workers = args.workers if args.workers is not None else settings.cr.build_workers
+    encoder = None
+    if args.corpus_dir and not args.no_model_embeddings:
+        encoder = create_encoder(
+            settings.embedding_backend,
+            dim=settings.narrative_dim,
+            model=settings.embedding_model,
+        )
+    if args.pq_m and args.dim % args.pq_m:
+        raise SystemExit(f"--pq-m {args.pq_m} must divide --dim {args.dim}")
     docs_path = Path(args.docs_jsonl)
     if not docs_path.exists():
         raise SystemExit(f"Docs file not found: {docs_path}")
 
+    if args.stream:
+        if args.pca not in (None, "incremental"):
+            raise SystemExit(
+                f"--pca {args.pca} needs the corpus in memory; --stream only supports incremental"
+            )
+        work_dir = Path(args.work_dir) if args.work_dir else Path(f"{args.npz}.work")
+        try:
+            index, stats = build_cr_index_streaming(
+                docs_path,
+                work_dir,
+                dim=args.dim,
+                d1=args.d1,
+                d2=args.d2,
+                k2=args.k2,
+                k1_per_bucket=args.k1,
+                seed=args.seed,
+                chunk_size=args.chunk_size,
+                workers=workers,
+                resume=not args.no_resume,
+                pq_m=args.pq_m or None,
+            )
+        except ValueError as exc:
+            raise SystemExit(str(exc)) from exc
+        save_cr_index(index, args.npz, args.meta)
+        if args.corpus_dir:
+            records = itertools.chain.from_iterable(iter_jsonl_chunks(docs_path, args.chunk_size))
+            q0 = np.load(work_dir / EMBEDDINGS_NAME, mmap_mode="r")
+            write_corpus_store(args.corpus_dir, records, q0, encoder=encoder)
+            print(f"Wrote corpus store for {stats.doc_count} docs \u2192 {args.corpus_dir}")
+        rss = f"{stats.peak_rss_mb:.0f} MiB" if stats.peak_rss_mb is not None else "n/a"
+        resumed = f", resumed at row {stats.resumed_rows}" if stats.resumed_rows else ""
+        print(
+            f"Built CR index for {stats.doc_count} docs \u2192 {args.npz}, {args.meta} "
+            f"({stats.docs_per_s:.0f} docs/s, peak RSS {rss}{resumed})"
+        )
+        return
+
     docs = _load_jsonl(docs_path)
     if not docs:
         raise SystemExit("Docs JSONL contained no usable records")
@@ -46,9 +157,197 @@ def build_cr_main(argv: list[str] | None = None) -> None:
         d2=args.d2,
         k2=args.k2,
         k1_per_bucket=args.k1,
+        seed=args.seed,
+        pca_method=args.pca or "full",
+        chunk_rows=args.chunk_size,
+        workers=workers,
+        pq_m=args.pq_m or None,
     )
     save_cr_index(index, args.npz, args.meta)
     print(f"Built CR index for {len(texts)} docs \u2192 {args.npz}, {args.meta}")
+    if args.corpus_dir:
+        write_corpus_store(args.corpus_dir, docs, embeddings, encoder=encoder)
+        print(f"Wrote corpus store for {len(texts)} docs \u2192 {args.corpus_dir}")
+
+
+def update_cr_main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Add or remove documents in an existing Cognitive Renormalization index"
+    )
+    parser.add_argument("--add", default=None, help="JSONL of new docs (fields 'id' and 'text')")
+    parser.add_argument(
+        "--remove", type=int, nargs="*", default=[], help="Doc ids (index positions) to remove"
+    )
+    parser.add_argument(
+        "--remove-file", default=None, help="File with one doc id (index position) per line"
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        default=None,
+        help="Corpus store built with the index; --add documents are appended to it so "
+        "corpus mode can serve them",
+    )
+    parser.add_argument("--npz", default="cr_index.npz", help="Index NPZ path (updated in place)")
+    parser.add_argument("--meta", default="cr_index.meta.json", help="Index metadata JSON path")
+    parser.add_argument(
+        "--distortion-threshold",
+        type=float,
+        default=1.5,
+        help="Flag a rebuild when added docs sit this much further from centroids than at build",
+    )
+    parser.add_argument(
+        "--churn-threshold",
+        type=float,
+        default=0.25,
+        help="Flag a rebuild when this fraction of the corpus was added/removed since build",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        index = load_cr_index(args.npz, args.meta)
+    except FileNotFoundError as exc:
+        raise SystemExit(f"CR index not found: {exc.filename}") from exc
+    store = None
+    if args.corpus_dir:
+        try:
+            store = load_corpus_store(args.corpus_dir)
+        except FileNotFoundError as exc:
+            raise SystemExit(f"Corpus store not found: {exc.filename}") from exc
+        if len(store) != index.meta.doc_count:
+            raise SystemExit(
+                f"Corpus store has {len(store)} docs but the index has {index.meta.doc_count}; "
+                "rebuild both with neuralcache-build-cr --corpus-dir"
+            )
+
+    removals = list(args.remove)
+    if args.remove_file:
+        removals += [
+            int(line) for line in Path(args.remove_file).read_text().splitlines() if line.strip()
+        ]
+    try:
+        removed = remove_documents(index, removals)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+
+    added_ids: list[int] = []
+    if args.add:
+        docs = _load_jsonl(Path(args.add))
+        texts = [str(doc.get("text", "")) for doc in docs]
+        if texts:
+            embeddings = encode_texts(texts, dim=index.meta.d0)
+            if store is not None:
+                encoder = None
+                if store.encoder_identity is not None:
+                    settings = Settings()
+                    encoder = create_encoder(
+                        settings.embedding_backend,
+                        dim=settings.narrative_dim,
+                        model=settings.embedding_model,
+                    )
+                try:
+                    append_corpus_store(args.corpus_dir, docs, embeddings, encoder=encoder)
+                except ValueError as exc:
+                    raise SystemExit(str(exc)) from exc
+            added_ids = add_documents(index, embeddings).tolist()
+
+    save_cr_index(index, args.npz, args.meta)
+    report = drift_report(
+        index,
+        distortion_threshold=args.distortion_threshold,
+        churn_threshold=args.churn_threshold,
+    )
+
+    def _fmt(ratio: float | None) -> str:
+        return "n/a" if ratio is None else f"{ratio:.2f}x"
+
+    span = f" (ids {added_ids[0]}-{added_ids[-1]})" if added_ids else ""
+    print(f"Added {len(added_ids)} docs{span}, removed {removed} \u2192 {args.npz}, {args.meta}")
+    print(
+        f"Drift: coarse {_fmt(report.coarse_distortion)}, topic {_fmt(report.topic_distortion)}, "
+        f"churn {report.churn:.1%}"
+        + (" \u2014 rebuild recommended" if report.needs_rebuild else "")
+    )
+
+
+def bench_cr_main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure CR recall@k, latency, index size and build time against exact search"
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--docs-jsonl", default=None, help="JSONL with a 'text' field to encode")
+    source.add_argument("--npy", default=None, help="Precomputed q0 embeddings (.npy, mmap ok)")
+    parser.add_argument(
+        "--synthetic", type=int, default=20000, help="Synthetic corpus size when no input is given"
+    )
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Held-out query count")
+    parser.add_argument("--k", type=int, default=10, help="k for recall@k")
+    parser.add_argument("--max-candidates", type=int, default=256, help="CR candidate cap")
+    parser.add_argument("--d1", type=int, nargs="+", default=[256], help="First PCA dims")
+    parser.add_argument("--d2", type=int, nargs="+", default=[64], help="Second PCA dims")
+    parser.add_argument("--k2", type=int, nargs="+", default=[16], help="Coarse bucket counts")
+    parser.add_argument("--k1", type=int, nargs="+", default=[12], help="Topics per coarse")
+    parser.add_argument("--top-coarse", type=int, nargs="+", default=[3], help="Coarse probes")
+    parser.add_argument(
+        "--top-topics", type=int, nargs="+", default=[2], help="Topic probes per coarse bucket"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Build and sampling seed")
+    parser.add_argument(
+        "--out",
+        action="append",
+        default=[],
+        help="Write results to this path (.json or .csv); may be repeated",
+    )
+    args = parser.parse_args(argv)
+
+    if args.docs_jsonl:
+        records = _load_jsonl(Path(args.docs_jsonl))
+        corpus = encode_texts([str(doc.get("text", "")) for doc in records], dim=args.dim)
+    elif args.npy:
+        corpus = np.load(args.npy, mmap_mode="r")
+    else:
+        corpus = synthetic_corpus(args.synthetic, args.dim, seed=args.seed)
+    if corpus.shape[0] <= args.queries:
+        raise SystemExit(f"Need more than {args.queries} documents, got {corpus.shape[0]}")
+    indexed, queries = split_queries(corpus, args.queries, seed=args.seed)
+
+    header = (
+        f"{'d1':>4} {'d2':>4} {'k2':>4} {'k1':>4} {'tc':>3} {'tt':>3} "
+        f"{'recall@' + str(args.k):>9} {'cands':>6} {'p50 ms':>7} {'p99 ms':>7} "
+        f"{'size MiB':>8} {'build s':>7}"
+    )
+    print(f"{indexed.shape[0]} docs x {indexed.shape[1]} dims, {queries.shape[0]} queries")
+    print(header)
+
+    def _print(r: BenchResult) -> None:
+        print(
+            f"{r.d1:>4} {r.d2:>4} {r.k2:>4} {r.k1:>4} {r.top_coarse:>3} "
+            f"{r.top_topics_per_coarse:>3} {r.recall_at_k:>9.3f} {r.mean_candidates:>6.0f} "
+            f"{r.p50_ms:>7.2f} {r.p99_ms:>7.2f} {r.index_bytes / 2**20:>8.2f} {r.build_s:>7.1f}"
+        )
+
+    grid = {
+        "d1": args.d1,
+        "d2": args.d2,
+        "k2": args.k2,
+        "k1": args.k1,
+        "top_coarse": args.top_coarse,
+        "top_topics_per_coarse": args.top_topics,
+    }
+    results = run_grid(
+        indexed,
+        queries,
+        grid,
+        k=args.k,
+        max_candidates=args.max_candidates,
+        seed=args.seed,
+        on_result=_print,
+    )
+    if results:
+        print(f"exact search p50 {results[0].exact_p50_ms:.2f} ms/query")
+    for path in args.out:
+        write_results(results, path)
+        print(f"Wrote {len(results)} results \u2192 {path}")
 
 
-__all__ = ["build_cr_main"]
+__all__ = ["bench_cr_main", "build_cr_main", "update_cr_main"]
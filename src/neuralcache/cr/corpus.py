@@ -0,0 +1,344 @@
+"""Memory-mapped document store that backs server-side corpus mode.
+
+An index build can persist the corpus next to the CR index: doc ids, texts and
+metadata as UTF-8 blobs with int64 offset tables, plus the q0 embeddings the
+index was built from and, optionally, the serving encoder's embeddings so
+retrieved candidates are not encoded again per request. Everything is opened
+with ``mmap`` so a million-document store costs a few file handles until rows
+are actually touched, and a rerank request can carry just a query while
+candidates come from the index.
+
+Layout of a store directory::
+
+    corpus.json            format version, doc count, q0 dimension, encoder identity
+    q0.npy                 float32 (doc_count, dim)
+    q.npy                  float32 (doc_count, encoder dim), only with an encoder
+    ids.bin / ids.offsets.npy
+    texts.bin / texts.offsets.npy
+    metadata.bin / metadata.offsets.npy   (orjson per doc, empty for {})
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+import numpy as np
+import orjson
+
+from neuralcache.types import Document
+
+if TYPE_CHECKING:  # pragma: no cover
+    from neuralcache.encoder import SupportsEncode
+
+CORPUS_META_NAME = "corpus.json"
+Q0_NAME = "q0.npy"
+MODEL_EMBEDDINGS_NAME = "q.npy"
+_FIELDS = ("ids", "texts", "metadata")
+CORPUS_FORMAT_VERSION = 1
+
+
+class CorpusUnavailableError(LookupError):
+    """Raised when corpus mode is requested but no corpus store is being served."""
+
+
+def write_corpus_store(
+    root: str | os.PathLike[str],
+    records: Iterable[Mapping[str, Any]],
+    embeddings_q0: np.ndarray,
+    *,
+    encoder: SupportsEncode | None = None,
+    batch_size: int = 256,
+) -> int:
+    """Write ``records`` (``id``/``text``/``metadata`` dicts) and their q0 rows.
+
+    ``records`` is consumed as a stream and ``embeddings_q0`` may be a memmap,
+    so stores larger than memory can be written. With ``encoder`` (the one the
+    server scores with) the texts are also encoded in ``batch_size`` chunks
+    into a memory-mapped ``q.npy`` tagged with the encoder's identity.
+    ``corpus.json`` is replaced last; readers that key reloads on it never see
+    a half-written store. Returns the number of documents written.
+    """
+    out = Path(root)
+    out.mkdir(parents=True, exist_ok=True)
+    q0 = np.asarray(embeddings_q0)
+    if q0.ndim != 2:
+        raise ValueError("embeddings_q0 must be a 2-D array")
+
+    offsets: dict[str, list[int]] = {field: [0] for field in _FIELDS}
+    handles = {field: (out / f"{field}.bin.tmp").open("wb") for field in _FIELDS}
+    model_tmp = out / f"{MODEL_EMBEDDINGS_NAME}.tmp.npy"
+    model: np.memmap | None = None
+    pending: list[str] = []
+    count = 0
+
+    def _encode_pending() -> None:
+        nonlocal model
+        assert encoder is not None
+        vectors = np.atleast_2d(np.asarray(encoder.encode_batch(pending), dtype=np.float32))
+        if model is None:
+            model = np.lib.format.open_memmap(
+                model_tmp, mode="w+", dtype=np.float32, shape=(q0.shape[0], vectors.shape[1])
+            )
+        model[count - len(pending) : count] = vectors
+        pending.clear()
+
+    try:
+        for record in records:
+            _write_record(record, count, handles, offsets)
+            count += 1
+            if encoder is not None:
+                if count > q0.shape[0]:
+                    raise ValueError(f"Got more records than {q0.shape[0]} embedding rows")
+                pending.append(str(record.get("text", "")))
+                if len(pending) >= batch_size:
+                    _encode_pending()
+        if pending:
+            _encode_pending()
+    finally:
+        for handle in handles.values():
+            handle.close()
+    if count != q0.shape[0]:
+        raise ValueError(f"Got {count} records for {q0.shape[0]} embedding rows")
+    identity = None
+    if model is not None and encoder is not None:
+        model.flush()
+        del model
+        model_tmp.replace(out / MODEL_EMBEDDINGS_NAME)
+        identity = _encoder_identity(encoder)
+
+    np.save(out / f"{Q0_NAME}.tmp.npy", q0.astype(np.float32, copy=False))
+    (out / f"{Q0_NAME}.tmp.npy").replace(out / Q0_NAME)
+    for field in _FIELDS:
+        (out / f"{field}.bin.tmp").replace(out / f"{field}.bin")
+    _finish_store(out, offsets, count, int(q0.shape[1]), identity)
+    return count
+
+
+def append_corpus_store(
+    root: str | os.PathLike[str],
+    records: Iterable[Mapping[str, Any]],
+    embeddings_q0: np.ndarray,
+    *,
+    encoder: SupportsEncode | None = None,
+    batch_size: int = 256,
+) -> int:
+    """Append ``records`` and their q0 rows to an existing store; returns the new count.
+
+    Rows keep their positions, so the store stays aligned with a CR index that
+    had the same documents added (see :func:`neuralcache.cr.update.add_documents`).
+    A store holding serving-encoder embeddings needs ``encoder`` with the same
+    identity to extend them. Blobs are appended in place, past the offsets any
+    open reader uses; offsets and embedding matrices are rewritten under
+    temporary names and ``corpus.json`` is replaced last.
+    """
+    store = CorpusStore(root)
+    out = store.root
+    new_q0 = np.asarray(embeddings_q0, dtype=np.float32)
+    if new_q0.ndim != 2 or new_q0.shape[1] != store.dim:
+        raise ValueError(f"embeddings_q0 must be a 2-D array with {store.dim} columns")
+    identity = store.encoder_identity
+    if identity is not None:
+        given = None if encoder is None else _encoder_identity(encoder)
+        if given != identity:
+            raise ValueError(f"Corpus store holds embeddings from {identity}; got encoder {given}")
+    start, total = store.doc_count, store.doc_count + new_q0.shape[0]
+
+    offsets = {field: [int(store._offsets[field][-1])] for field in _FIELDS}
+    texts: list[str] = []
+    count = 0
+    handles = {field: (out / f"{field}.bin").open("ab") for field in _FIELDS}
+    try:
+        for record in records:
+            _write_record(record, start + count, handles, offsets)
+            texts.append(str(record.get("text", "")))
+            count += 1
+    finally:
+        for handle in handles.values():
+            handle.close()
+    if count != new_q0.shape[0]:
+        raise ValueError(f"Got {count} records for {new_q0.shape[0]} embedding rows")
+
+    q0_tmp = out / f"{Q0_NAME}.tmp.npy"
+    q0 = np.lib.format.open_memmap(q0_tmp, mode="w+", dtype=np.float32, shape=(total, store.dim))
+    _copy_rows(store.q0, q0, batch_size)
+    q0[start:] = new_q0
+    q0.flush()
+    del q0
+    if store.embeddings is not None:
+        assert encoder is not None
+        model_tmp = out / f"{MODEL_EMBEDDINGS_NAME}.tmp.npy"
+        model = np.lib.format.open_memmap(
+            model_tmp, mode="w+", dtype=np.float32, shape=(total, store.embeddings.shape[1])
+        )
+        _copy_rows(store.embeddings, model, batch_size)
+        for begin in range(0, count, batch_size):
+            chunk = texts[begin : begin + batch_size]
+            vectors = np.asarray(encoder.encode_batch(chunk), dtype=np.float32)
+            model[start + begin : start + begin + len(chunk)] = np.atleast_2d(vectors)
+        model.flush()
+        del model
+        model_tmp.replace(out / MODEL_EMBEDDINGS_NAME)
+    q0_tmp.replace(out / Q0_NAME)
+
+    merged = {
+        field: np.concatenate([np.asarray(store._offsets[field]), offsets[field][1:]])
+        for field in _FIELDS
+    }
+    _finish_store(out, merged, total, store.dim, identity)
+    return total
+
+
+def _encoder_identity(encoder: SupportsEncode) -> str:
+    return str(getattr(encoder, "identity", type(encoder).__name__))
+
+
+def _write_record(
+    record: Mapping[str, Any],
+    row: int,
+    handles: Mapping[str, BinaryIO],
+    offsets: dict[str, list[int]],
+) -> None:
+    metadata = record.get("metadata") or {}
+    values = {
+        "ids": str(record.get("id", row)).encode("utf-8"),
+        "texts": str(record.get("text", "")).encode("utf-8"),
+        "metadata": orjson.dumps(metadata) if metadata else b"",
+    }
+    for field, blob in values.items():
+        handles[field].write(blob)
+        offsets[field].append(offsets[field][-1] + len(blob))
+
+
+def _copy_rows(src: np.ndarray, dst: np.ndarray, batch_size: int) -> None:
+    step = max(1, batch_size) * 64
+    for begin in range(0, src.shape[0], step):
+        stop = min(begin + step, src.shape[0])
+        dst[begin:stop] = src[begin:stop]
+
+
+def _finish_store(
+    out: Path,
+    offsets: Mapping[str, Sequence[int] | np.ndarray],
+    count: int,
+    dim: int,
+    identity: str | None,
+) -> None:
+    for field in _FIELDS:
+        np.save(out / f"{field}.offsets.tmp.npy", np.asarray(offsets[field], dtype=np.int64))
+        (out / f"{field}.offsets.tmp.npy").replace(out / f"{field}.offsets.npy")
+    meta = {
+        "format_version": CORPUS_FORMAT_VERSION,
+        "doc_count": count,
+        "dim": dim,
+        "encoder": identity,
+    }
+    (out / f"{CORPUS_META_NAME}.tmp").write_bytes(orjson.dumps(meta))
+    (out / f"{CORPUS_META_NAME}.tmp").replace(out / CORPUS_META_NAME)
+
+
+def _open_blob(path: Path) -> np.ndarray:
+    # np.memmap refuses empty files (e.g. a corpus without any metadata).
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+class CorpusStore:
+    """Read-only, memory-mapped view of a store written by :func:`write_corpus_store`."""
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+        meta = orjson.loads((self.root / CORPUS_META_NAME).read_bytes())
+        self.doc_count = int(meta["doc_count"])
+        self.dim = int(meta["dim"])
+        # Matrices may already hold rows of an append whose corpus.json is not
+        # written yet; only the first ``doc_count`` rows belong to this store.
+        self.q0: np.ndarray = np.load(self.root / Q0_NAME, mmap_mode="r")[: self.doc_count]
+        # Identity of the encoder that produced ``embeddings``; candidates only
+        # carry them when it matches the scoring encoder (see ``documents``).
+        self.encoder_identity: str | None = meta.get("encoder")
+        self.embeddings: np.ndarray | None = None
+        if self.encoder_identity is not None:
+            self.embeddings = np.load(self.root / MODEL_EMBEDDINGS_NAME, mmap_mode="r")[
+                : self.doc_count
+            ]
+        self._blobs = {field: _open_blob(self.root / f"{field}.bin") for field in _FIELDS}
+        self._offsets = {
+            field: np.load(self.root / f"{field}.offsets.npy", mmap_mode="r") for field in _FIELDS
+        }
+        if self.q0.shape != (self.doc_count, self.dim) or (
+            self.embeddings is not None and self.embeddings.shape[0] != self.doc_count
+        ):
+            raise ValueError(f"Corpus store at {self.root} is inconsistent with its metadata")
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def has_embeddings_for(self, encoder_identity: str | None) -> bool:
+        return self.embeddings is not None and encoder_identity == self.encoder_identity
+
+    def _read(self, field: str, row: int) -> bytes:
+        offsets = self._offsets[field]
+        return self._blobs[field][int(offsets[row]) : int(offsets[row + 1])].tobytes()
+
+    def doc_id(self, row: int) -> str:
+        return self._read("ids", row).decode("utf-8")
+
+    def text(self, row: int) -> str:
+        return self._read("texts", row).decode("utf-8")
+
+    def metadata(self, row: int) -> dict[str, Any]:
+        raw = self._read("metadata", row)
+        return orjson.loads(raw) if raw else {}
+
+    def documents(
+        self, rows: Sequence[int], *, encoder_identity: str | None = None
+    ) -> list[Document]:
+        """Documents for ``rows``, carrying stored embeddings from ``encoder_identity``.
+
+        Embeddings are attached only when the store holds them for that encoder;
+        otherwise the scorer encodes the texts itself.
+        """
+        stored = self.embeddings if self.has_embeddings_for(encoder_identity) else None
+        return [
+            Document(
+                id=self.doc_id(row),
+                text=self.text(row),
+                metadata=self.metadata(row),
+                embedding=stored[row].tolist() if stored is not None else None,
+            )
+            for row in rows
+        ]
+
+
+def load_corpus_store(root: str | os.PathLike[str]) -> CorpusStore:
+    return CorpusStore(root)
+
+
+def matches_filters(metadata: Mapping[str, Any], filters: Mapping[str, Any]) -> bool:
+    """Exact-match metadata filter; a list value matches any of its members."""
+    for key, expected in filters.items():
+        if key not in metadata:
+            return False
+        value = metadata[key]
+        if isinstance(expected, list):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+__all__ = [
+    "CORPUS_META_NAME",
+    "MODEL_EMBEDDINGS_NAME",
+    "CorpusStore",
+    "CorpusUnavailableError",
+    "append_corpus_store",
+    "load_corpus_store",
+    "matches_filters",
+    "write_corpus_store",
+]
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import io
 import json
+import os
 import pathlib
-from dataclasses import asdict, dataclass
+import struct
+import zipfile
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any
 
 import numpy as np
 
-from neuralcache.cr.utils import kmeans_lloyd, pca_fit, pca_transform
+from neuralcache.cr.pq import pq_encode, train_pq
+from neuralcache.cr.utils import PCAMethod, kmeans, pca_fit, pca_transform
 
 
 @dataclass
@@ -17,6 +26,66 @@ class CRIndexMeta:
     k1: int
     k2: int
     doc_count: int
+    format_version: int = 2
+    # Mean squared distance of each doc to its assigned centroid at build time;
+    # the baseline for the drift report after incremental updates.
+    coarse_sqdist_mean: float | None = None
+    topic_sqdist_mean: float | None = None
+    build_doc_count: int | None = None
+    added_count: int = 0
+    removed_count: int = 0
+    added_coarse_sqdist_sum: float = 0.0
+    added_topic_sqdist_sum: float = 0.0
+    # Sub-spaces of the product-quantized leaf codes (None: no PQ stage).
+    pq_m: int | None = None
+
+
+class BucketList(Sequence[np.ndarray]):
+    """Read-only CSR view of buckets: bucket ``i`` is ``indices[offsets[i]:offsets[i + 1]]``.
+
+    ``offsets`` may be a window into a larger offsets array (it need not start
+    at zero), which lets every coarse bucket's topic buckets share one
+    ``indices`` array. Ids added after load (see ``cr.update``) live in a small
+    per-bucket overlay that is folded into the CSR arrays on the next save.
+    """
+
+    __slots__ = ("offsets", "indices", "_extra")
+
+    def __init__(self, offsets: np.ndarray, indices: np.ndarray) -> None:
+        self.offsets = offsets
+        self.indices = indices
+        self._extra: dict[int, list[int]] = {}
+
+    def __len__(self) -> int:
+        return max(int(self.offsets.shape[0]) - 1, 0)
+
+    def __getitem__(self, i: int) -> np.ndarray:  # type: ignore[override]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("bucket index out of range")
+        base = self.indices[int(self.offsets[i]) : int(self.offsets[i + 1])]
+        extra = self._extra.get(i)
+        if extra:
+            return np.concatenate([base, np.asarray(extra, dtype=base.dtype)])
+        return base
+
+    def extend(self, i: int, doc_ids: Sequence[int]) -> None:
+        if not 0 <= i < len(self):
+            raise IndexError("bucket index out of range")
+        self._extra.setdefault(i, []).extend(int(d) for d in doc_ids)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def tolist(self) -> list[list[int]]:
+        return [bucket.tolist() for bucket in self]
+
+
+Buckets = list[list[int]] | BucketList
+# Anything ``np.asarray`` turns into one bucket's int ids.
+BucketLike = Sequence[int] | np.ndarray
 
 
 @dataclass
@@ -27,9 +96,67 @@ class CRIndex:
     proj2_components: np.ndarray
     proj2_mean: np.ndarray
     coarse_centroids: np.ndarray
-    coarse_buckets: list[list[int]]
+    coarse_buckets: Buckets
     topic_centroids_per_coarse: list[np.ndarray]
-    topic_buckets_per_coarse: list[list[list[int]]]
+    topic_buckets_per_coarse: list[Buckets]
+    # Removed doc ids; filtered at query time and dropped from buckets on save.
+    tombstones: set[int] = field(default_factory=set)
+    # Mean q0 embedding per coarse bucket and per topic bucket (topics stacked in
+    # coarse order). Written at build time; ``None`` for indexes that predate them.
+    coarse_means: np.ndarray | None = None
+    topic_means: np.ndarray | None = None
+    # Optional product-quantized q0 (see neuralcache.cr.pq): codebooks of shape
+    # (m, clusters, d0 // m) and one uint8 code row per doc id.
+    pq_codebooks: np.ndarray | None = None
+    pq_codes: np.ndarray | None = None
+    _search_cache: dict[str, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def invalidate_caches(self) -> None:
+        """Drop derived search state after the buckets or centroids change."""
+        self._search_cache.clear()
+
+
+def compute_bucket_means(
+    embeddings_q0: np.ndarray,
+    coarse_buckets: Sequence[BucketLike],
+    topic_buckets_per_coarse: Sequence[Sequence[BucketLike]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Mean q0 vector of every coarse bucket and every (stacked) topic bucket.
+
+    Each document row is gathered once: topic means come from their members
+    and a coarse mean is the size-weighted mean of its topics. Members past
+    the last row of ``embeddings_q0`` (added after it was written) are skipped.
+    """
+    n_rows, dim0 = embeddings_q0.shape
+    coarse_means = np.zeros((len(coarse_buckets), dim0), dtype=np.float32)
+    topic_means: list[np.ndarray] = []
+
+    def _rows(bucket: BucketLike) -> np.ndarray:
+        ids = np.asarray(bucket, dtype=np.int64)
+        return ids[ids < n_rows]
+
+    for coarse_id, topics in enumerate(topic_buckets_per_coarse):
+        sums = np.zeros(dim0, dtype=np.float64)
+        count = 0
+        for bucket in topics:
+            mean = np.zeros(dim0, dtype=np.float32)
+            ids = _rows(bucket)
+            if ids.size:
+                rows = np.asarray(embeddings_q0[ids])
+                total = rows.sum(axis=0, dtype=np.float64)
+                mean = (total / ids.size).astype(np.float32)
+                sums += total
+                count += ids.size
+            topic_means.append(mean)
+        members = _rows(coarse_buckets[coarse_id])
+        if count:
+            coarse_means[coarse_id] = sums / count
+        elif members.size:
+            coarse_means[coarse_id] = np.asarray(embeddings_q0[members]).mean(axis=0)
+    stacked = np.stack(topic_means) if topic_means else np.zeros((0, dim0), dtype=np.float32)
+    return coarse_means, stacked
 
 
 def build_cr_index(
@@ -39,39 +166,130 @@ def build_cr_index(
     k2: int = 16,
     k1_per_bucket: int = 12,
     seed: int = 42,
+    pca_method: PCAMethod = "full",
+    chunk_rows: int = 65536,
+    workers: int = 1,
+    pq_m: int | None = None,
 ) -> CRIndex:
     doc_count, dim0 = embeddings_q0.shape
-    proj1_components, proj1_mean = pca_fit(embeddings_q0, out_dim=min(d1, dim0))
+    proj1_components, proj1_mean = pca_fit(
+        embeddings_q0, out_dim=min(d1, dim0), method=pca_method, seed=seed, chunk_rows=chunk_rows
+    )
     q1 = pca_transform(embeddings_q0, proj1_components, proj1_mean)
     dim1_eff = q1.shape[1]
 
-    proj2_components, proj2_mean = pca_fit(q1, out_dim=min(d2, dim1_eff))
+    proj2_components, proj2_mean = pca_fit(
+        q1, out_dim=min(d2, dim1_eff), method=pca_method, seed=seed, chunk_rows=chunk_rows
+    )
     q2 = pca_transform(q1, proj2_components, proj2_mean)
+    return assemble_cr_index(
+        q1,
+        q2,
+        proj1_components=proj1_components,
+        proj1_mean=proj1_mean,
+        proj2_components=proj2_components,
+        proj2_mean=proj2_mean,
+        k2=k2,
+        k1_per_bucket=k1_per_bucket,
+        seed=seed,
+        workers=workers,
+        embeddings_q0=embeddings_q0,
+        pq_m=pq_m,
+    )
+
+
+def _cluster_topic_bucket(
+    q1_bucket: np.ndarray, k: int, seed: int
+) -> tuple[np.ndarray, np.ndarray, float]:
+    result = kmeans(q1_bucket, k=k, iters=25, seed=seed)
+    return result.centroids, result.labels, result.inertia
+
+
+def _iter_topic_clusterings(
+    q1: np.ndarray, jobs: list[tuple[np.ndarray, int, int]], workers: int
+) -> Iterator[tuple[np.ndarray, np.ndarray, float]]:
+    """Yield ``(centroids, labels, inertia)`` per job, in job order.
+
+    With ``workers > 1`` the jobs run in a process pool. At most ``2 * workers``
+    bucket slices are in flight so a memory-mapped ``q1`` is never fully loaded.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for doc_bucket, k, seed in jobs:
+            yield _cluster_topic_bucket(np.asarray(q1[doc_bucket]), k, seed)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        pending: deque[Future[tuple[np.ndarray, np.ndarray, float]]] = deque()
+        for doc_bucket, k, seed in jobs:
+            pending.append(pool.submit(_cluster_topic_bucket, np.asarray(q1[doc_bucket]), k, seed))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def assemble_cr_index(
+    q1: np.ndarray,
+    q2: np.ndarray,
+    *,
+    proj1_components: np.ndarray,
+    proj1_mean: np.ndarray,
+    proj2_components: np.ndarray,
+    proj2_mean: np.ndarray,
+    k2: int = 16,
+    k1_per_bucket: int = 12,
+    seed: int = 42,
+    kmeans_batch_size: int | None = None,
+    workers: int = 1,
+    embeddings_q0: np.ndarray | None = None,
+    pq_m: int | None = None,
+) -> CRIndex:
+    """Cluster already-projected embeddings into the two-level CR hierarchy.
+
+    ``q1``/``q2`` may be memory-mapped; only the coarse buckets being clustered
+    are read into memory. Per-bucket topic clustering runs on ``workers``
+    processes; sub-seeds are drawn up front so the result matches a serial build.
+    When ``embeddings_q0`` is given, per-bucket mean vectors are stored for
+    query-time scoring, and with ``pq_m`` the q0 vectors are also product
+    quantized into ``pq_m`` one-byte codes per doc.
+    """
+    if pq_m and embeddings_q0 is None:
+        raise ValueError("pq_m requires embeddings_q0")
+    doc_count = q2.shape[0]
+    dim0 = proj1_components.shape[1]
+    dim1_eff = q1.shape[1]
     dim2_eff = q2.shape[1]
 
     k2_eff = min(k2, max(2, int(np.sqrt(doc_count))))
-    km_level2 = kmeans_lloyd(q2, k=k2_eff, iters=30, seed=seed)
+    km_level2 = kmeans(q2, k=k2_eff, iters=30, seed=seed, batch_size=kmeans_batch_size)
     coarse_buckets = [
         np.where(km_level2.labels == coarse_idx)[0].tolist()
         for coarse_idx in range(km_level2.centroids.shape[0])
     ]
 
+    # Draw every sub-seed serially, in bucket order, before any work is farmed out.
+    rng = np.random.default_rng(seed)
+    jobs: list[tuple[np.ndarray, int, int]] = []
+    for doc_bucket in coarse_buckets:
+        if len(doc_bucket) == 0:
+            continue
+        k1_bucket = min(k1_per_bucket, max(2, int(np.sqrt(len(doc_bucket)))))
+        jobs.append((np.asarray(doc_bucket), k1_bucket, int(rng.integers(0, 1_000_000))))
+    clusterings = _iter_topic_clusterings(q1, jobs, workers)
+
     topic_centroids: list[np.ndarray] = []
     topic_buckets: list[list[list[int]]] = []
-    rng = np.random.default_rng(seed)
+    topic_inertia = 0.0
     for doc_bucket in coarse_buckets:
         if len(doc_bucket) == 0:
             topic_centroids.append(np.zeros((0, dim1_eff), dtype=np.float32))
             topic_buckets.append([])
             continue
-        q1_bucket = q1[doc_bucket]
-        k1_bucket = min(k1_per_bucket, max(2, int(np.sqrt(len(doc_bucket)))))
-        sub_seed = int(rng.integers(0, 1_000_000))
-        km_level1 = kmeans_lloyd(q1_bucket, k=k1_bucket, iters=25, seed=sub_seed)
-        topic_centroids.append(km_level1.centroids)
+        centroids, labels, inertia = next(clusterings)
+        topic_inertia += inertia
+        topic_centroids.append(centroids)
         sub_buckets: list[list[int]] = []
-        for topic_idx in range(km_level1.centroids.shape[0]):
-            mask = km_level1.labels == topic_idx
+        for topic_idx in range(centroids.shape[0]):
+            mask = labels == topic_idx
             sub_buckets.append([int(doc_bucket[i]) for i in np.where(mask)[0]])
         topic_buckets.append(sub_buckets)
 
@@ -82,7 +300,19 @@ def build_cr_index(
         k1=k1_per_bucket,
         k2=km_level2.centroids.shape[0],
         doc_count=doc_count,
+        coarse_sqdist_mean=km_level2.inertia / doc_count,
+        topic_sqdist_mean=topic_inertia / doc_count,
+        build_doc_count=doc_count,
+        pq_m=pq_m or None,
     )
+    coarse_means = topic_means = pq_codebooks = pq_codes = None
+    if embeddings_q0 is not None:
+        coarse_means, topic_means = compute_bucket_means(
+            embeddings_q0, coarse_buckets, topic_buckets
+        )
+        if pq_m:
+            pq_codebooks = train_pq(embeddings_q0, pq_m, seed=seed)
+            pq_codes = pq_encode(embeddings_q0, pq_codebooks)
     return CRIndex(
         meta=meta,
         proj1_components=proj1_components.astype(np.float32),
@@ -92,29 +322,205 @@ def build_cr_index(
         coarse_centroids=km_level2.centroids.astype(np.float32),
         coarse_buckets=coarse_buckets,
         topic_centroids_per_coarse=[c.astype(np.float32) for c in topic_centroids],
-        topic_buckets_per_coarse=topic_buckets,
+        topic_buckets_per_coarse=list(topic_buckets),
+        coarse_means=coarse_means,
+        topic_means=topic_means,
+        pq_codebooks=pq_codebooks,
+        pq_codes=pq_codes,
+    )
+
+
+def _csr(
+    buckets: Sequence[BucketLike], drop: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    rows = [np.asarray(b, dtype=np.int32) for b in buckets]
+    if drop is not None and drop.size:
+        rows = [row[~np.isin(row, drop)] for row in rows]
+    lengths = np.fromiter((row.shape[0] for row in rows), dtype=np.int64, count=len(rows))
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if offsets[-1] > np.iinfo(np.int32).max:
+        raise ValueError("CR index v2 supports at most 2**31 - 1 bucket entries")
+    indices = np.concatenate(rows) if offsets[-1] else np.zeros(0, dtype=np.int32)
+    return offsets.astype(np.int32), indices
+
+
+def _index_arrays(idx: CRIndex) -> dict[str, np.ndarray]:
+    drop = np.fromiter(idx.tombstones, dtype=np.int32) if idx.tombstones else None
+    coarse_offsets, coarse_indices = _csr(idx.coarse_buckets, drop)
+    topic_counts = [len(buckets) for buckets in idx.topic_buckets_per_coarse]
+    topic_offsets = np.zeros(len(topic_counts) + 1, dtype=np.int32)
+    np.cumsum(topic_counts, out=topic_offsets[1:])
+    flat_topics = [bucket for buckets in idx.topic_buckets_per_coarse for bucket in buckets]
+    topic_bucket_offsets, topic_bucket_indices = _csr(flat_topics, drop)
+    dim1 = idx.proj1_components.shape[0]
+    topic_centroids = (
+        np.concatenate([np.asarray(c, dtype=np.float32) for c in idx.topic_centroids_per_coarse])
+        if idx.topic_centroids_per_coarse
+        else np.zeros((0, dim1), dtype=np.float32)
     )
+    arrays = {
+        "proj1_components": np.asarray(idx.proj1_components, dtype=np.float32),
+        "proj1_mean": np.asarray(idx.proj1_mean, dtype=np.float32),
+        "proj2_components": np.asarray(idx.proj2_components, dtype=np.float32),
+        "proj2_mean": np.asarray(idx.proj2_mean, dtype=np.float32),
+        "coarse_centroids": np.asarray(idx.coarse_centroids, dtype=np.float32),
+        "coarse_offsets": coarse_offsets,
+        "coarse_indices": coarse_indices,
+        "topic_offsets": topic_offsets,
+        "topic_centroids": topic_centroids,
+        "topic_bucket_offsets": topic_bucket_offsets,
+        "topic_bucket_indices": topic_bucket_indices,
+    }
+    if idx.coarse_means is not None and idx.topic_means is not None:
+        arrays["coarse_means"] = np.asarray(idx.coarse_means, dtype=np.float32)
+        arrays["topic_means"] = np.asarray(idx.topic_means, dtype=np.float32)
+    if idx.pq_codebooks is not None and idx.pq_codes is not None:
+        arrays["pq_codebooks"] = np.asarray(idx.pq_codebooks, dtype=np.float32)
+        arrays["pq_codes"] = np.asarray(idx.pq_codes, dtype=np.uint8)
+    return arrays
+
+
+_ZIP_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_ALIGN = 64
+_PAD_EXTRA_ID = 0xA1A1
+
+
+def write_npz_stored(path: str | os.PathLike[str], arrays: dict[str, np.ndarray]) -> None:
+    """Write ``arrays`` as an uncompressed NPZ whose members can be memory-mapped.
+
+    Each member's array data is padded to a 64-byte boundary within the file
+    (via a zip extra field) so memory-mapped views are aligned. The file is
+    written next to ``path`` and renamed into place atomically.
+    """
+    target = pathlib.Path(path)
+    tmp = target.with_name(target.name + ".tmp")
+    # The archive is written through our own handle so its position (the next
+    # member's local header offset) can be read without touching ZipFile.fp.
+    with (
+        tmp.open("wb") as handle,
+        zipfile.ZipFile(handle, mode="w", compression=zipfile.ZIP_STORED) as zf,
+    ):
+        for key, value in arrays.items():
+            array = np.ascontiguousarray(value)
+            name = f"{key}.npy"
+            header = _npy_header(array)
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_STORED
+            info.file_size = len(header) + array.nbytes
+            zip64 = info.file_size * 1.05 > zipfile.ZIP64_LIMIT
+            base = handle.tell() + _ZIP_LOCAL_HEADER.size + len(name.encode()) + 4
+            base += 20 if zip64 else 0
+            pad = -(base + len(header)) % _ALIGN
+            info.extra = struct.pack("<HH", _PAD_EXTRA_ID, pad) + b"\0" * pad
+            with zf.open(info, mode="w", force_zip64=zip64) as member:
+                member.write(header)
+                member.write(array.data)
+    tmp.replace(target)
+
+
+def _npy_header(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_2_0(buffer, np.lib.format.header_data_from_array_1_0(array))
+    return buffer.getvalue()
+
+
+def open_npz_mmap(path: str | os.PathLike[str]) -> dict[str, np.ndarray] | None:
+    """Memory-map every member of an uncompressed NPZ.
+
+    Returns ``None`` when the archive cannot be mapped (compressed members or
+    object arrays), so callers can fall back to ``np.load``.
+    """
+    with zipfile.ZipFile(path) as zf:
+        infos = zf.infolist()
+    arrays: dict[str, np.ndarray] = {}
+    with pathlib.Path(path).open("rb") as fh:
+        for info in infos:
+            if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith(".npy"):
+                return None
+            fh.seek(info.header_offset)
+            fields = _ZIP_LOCAL_HEADER.unpack(fh.read(_ZIP_LOCAL_HEADER.size))
+            fh.seek(info.header_offset + _ZIP_LOCAL_HEADER.size + fields[-2] + fields[-1])
+            version = np.lib.format.read_magic(fh)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(fh)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(fh)
+            if dtype.hasobject:
+                return None
+            key = info.filename[: -len(".npy")]
+            if int(np.prod(shape)) == 0:
+                arrays[key] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[key] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=fh.tell(),
+                shape=shape,
+                order="F" if fortran else "C",
+            )
+    return arrays
 
 
 def save_cr_index(idx: CRIndex, path_npz: str, path_meta_json: str) -> None:
-    np.savez_compressed(
-        path_npz,
-        proj1_components=idx.proj1_components,
-        proj1_mean=idx.proj1_mean,
-        proj2_components=idx.proj2_components,
-        proj2_mean=idx.proj2_mean,
-        coarse_centroids=idx.coarse_centroids,
-        coarse_buckets=np.array(idx.coarse_buckets, dtype=object),
-        topic_centroids_per_coarse=np.array(idx.topic_centroids_per_coarse, dtype=object),
-        topic_buckets_per_coarse=np.array(idx.topic_buckets_per_coarse, dtype=object),
+    write_npz_stored(path_npz, _index_arrays(idx))
+    meta = asdict(idx.meta)
+    meta["format_version"] = 2
+    # Meta is renamed into place after the arrays so a watcher never sees new
+    # metadata pointing at an old array file.
+    meta_path = pathlib.Path(path_meta_json)
+    tmp = meta_path.with_name(meta_path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    tmp.replace(meta_path)
+
+
+def _index_from_arrays(meta: CRIndexMeta, z: dict[str, np.ndarray]) -> CRIndex:
+    topic_offsets = np.asarray(z["topic_offsets"], dtype=np.int64)
+    topic_centroids = z["topic_centroids"]
+    topic_bucket_offsets = z["topic_bucket_offsets"]
+    topic_bucket_indices = z["topic_bucket_indices"]
+    spans = list(zip(topic_offsets[:-1].tolist(), topic_offsets[1:].tolist(), strict=True))
+    return CRIndex(
+        meta=meta,
+        proj1_components=z["proj1_components"],
+        proj1_mean=z["proj1_mean"],
+        proj2_components=z["proj2_components"],
+        proj2_mean=z["proj2_mean"],
+        coarse_centroids=z["coarse_centroids"],
+        coarse_buckets=BucketList(z["coarse_offsets"], z["coarse_indices"]),
+        topic_centroids_per_coarse=[topic_centroids[a:b] for a, b in spans],
+        topic_buckets_per_coarse=[
+            BucketList(topic_bucket_offsets[a : b + 1], topic_bucket_indices) for a, b in spans
+        ],
+        coarse_means=z.get("coarse_means"),
+        topic_means=z.get("topic_means"),
+        pq_codebooks=z.get("pq_codebooks"),
+        pq_codes=z.get("pq_codes"),
     )
-    with pathlib.Path(path_meta_json).open("w", encoding="utf-8") as f:
-        json.dump(asdict(idx.meta), f, indent=2)
 
 
-def load_cr_index(path_npz: str, path_meta_json: str) -> CRIndex:
+def load_cr_index(path_npz: str, path_meta_json: str, *, mmap: bool = True) -> CRIndex:
+    """Load a CR index written by :func:`save_cr_index`.
+
+    v2 indexes are memory-mapped (``mmap=False`` reads them into memory); the
+    legacy pickled layout is still understood.
+    """
     with pathlib.Path(path_meta_json).open("r", encoding="utf-8") as f:
-        meta = CRIndexMeta(**json.load(f))
+        raw_meta = json.load(f)
+    raw_meta.setdefault("format_version", 1)
+    meta = CRIndexMeta(**raw_meta)
+    if meta.format_version >= 2:
+        arrays = open_npz_mmap(path_npz) if mmap else None
+        if arrays is None:
+            with np.load(path_npz) as z:
+                arrays = {key: z[key] for key in z.files}
+        return _index_from_arrays(meta, arrays)
+    return _load_legacy_cr_index(meta, path_npz)
+
+
+def _load_legacy_cr_index(meta: CRIndexMeta, path_npz: str) -> CRIndex:
     z = np.load(path_npz, allow_pickle=True)
 
     def _pick(key: str, legacy_key: str) -> np.ndarray:
@@ -0,0 +1,96 @@
+"""Product quantization of q0 vectors for the CR leaf level.
+
+Each unit-normalized q0 vector is split into ``m`` equal sub-vectors and every
+sub-vector is replaced by the id of its nearest of (up to) 256 centroids, so a
+document costs ``m`` bytes instead of ``4 * d0``. At query time one lookup
+table of query/centroid inner products per sub-space turns scoring a document
+into ``m`` table reads (asymmetric distance computation); because both sides
+are normalized the sum approximates the cosine the float path computes.
+
+By default the codes only pre-rank leaves and a shortlist is re-scored
+exactly from the full-precision q0 matrix, which the corpus store keeps
+memory-mapped. With ``cr.pq_exact_rescore`` off, corpus-mode search ranks from
+the codes alone and never reads q0, so the resident per-document cost is the
+``m`` code bytes; q0 then stays on disk only as an optional re-rank source.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from neuralcache.cr.utils import assign_to_centroids, kmeans
+
+PQ_MAX_CLUSTERS = 256
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    return x / (np.linalg.norm(x, axis=-1, keepdims=True) + 1e-9)
+
+
+def _check_m(dim: int, m: int) -> int:
+    if m <= 0 or dim % m:
+        raise ValueError(f"PQ sub-space count {m} must divide the embedding dim {dim}")
+    return dim // m
+
+
+def train_pq(
+    embeddings_q0: np.ndarray,
+    m: int,
+    *,
+    seed: int = 42,
+    iters: int = 15,
+    sample_size: int = 16384,
+) -> np.ndarray:
+    """Train per-sub-space codebooks, shape ``(m, clusters, d0 // m)``.
+
+    Trains on a uniform sample of at most ``sample_size`` rows (64 per centroid
+    by default) so memory-mapped corpora are never read in full.
+    """
+    n_rows, dim = embeddings_q0.shape
+    dsub = _check_m(dim, m)
+    rng = np.random.default_rng(seed)
+    if n_rows > sample_size:
+        rows = np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+        sample = _normalize(embeddings_q0[rows])
+    else:
+        sample = _normalize(embeddings_q0[:])
+    clusters = min(PQ_MAX_CLUSTERS, sample.shape[0])
+    codebooks = np.empty((m, clusters, dsub), dtype=np.float32)
+    for sub in range(m):
+        part = np.ascontiguousarray(sample[:, sub * dsub : (sub + 1) * dsub])
+        codebooks[sub] = kmeans(part, k=clusters, iters=iters, seed=seed + sub).centroids
+    return codebooks
+
+
+def pq_encode(
+    embeddings_q0: np.ndarray, codebooks: np.ndarray, chunk_rows: int = 65536
+) -> np.ndarray:
+    """Quantize rows to ``uint8`` codes of shape ``(n, m)``, one chunk at a time."""
+    m, _, dsub = codebooks.shape
+    n_rows = embeddings_q0.shape[0]
+    _check_m(embeddings_q0.shape[1], m)
+    codes = np.empty((n_rows, m), dtype=np.uint8)
+    for start in range(0, n_rows, chunk_rows):
+        block = _normalize(embeddings_q0[start : start + chunk_rows])
+        for sub in range(m):
+            labels, _ = assign_to_centroids(block[:, sub * dsub : (sub + 1) * dsub], codebooks[sub])
+            codes[start : start + block.shape[0], sub] = labels
+    return codes
+
+
+def adc_table(q0_query: np.ndarray, codebooks: np.ndarray) -> np.ndarray:
+    """Per-sub-space inner products of the normalized query with every centroid."""
+    m, _, dsub = codebooks.shape
+    q = _normalize(q0_query.reshape(-1)).reshape(m, 1, dsub)
+    return np.matmul(q, codebooks.transpose(0, 2, 1))[:, 0, :]
+
+
+def adc_scores(table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Approximate cosine of the query behind ``table`` with each coded row."""
+    if codes.shape[0] == 0:
+        return np.zeros(0, dtype=np.float32)
+    return table[np.arange(table.shape[0]), codes].sum(axis=1, dtype=np.float32)
+
+
+__all__ = ["PQ_MAX_CLUSTERS", "adc_scores", "adc_table", "pq_encode", "train_pq"]
@@ -0,0 +1,217 @@
+"""Process-wide, hot-reloadable CR index handles.
+
+One :class:`CRIndexManager` exists per ``(npz, meta)`` path pair and is shared
+by every :class:`~neuralcache.rerank.Reranker` (and therefore every
+namespace). Readers call :meth:`CRIndexManager.get`, which returns the index
+currently being served. When the files on disk change (their mtime/size stamp
+moves) a replacement is loaded on a background thread and swapped in with a
+single reference assignment, so requests already holding the old index finish
+with it undisturbed. When a corpus store directory is configured it is opened
+as part of the same load, so the index and the documents its ids refer to are
+always swapped together.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from neuralcache.cr.corpus import CORPUS_META_NAME, CorpusStore, load_corpus_store
+from neuralcache.cr.index import CRIndex, load_cr_index
+from neuralcache.metrics import record_cr_index_load
+
+logger = logging.getLogger(__name__)
+
+Stamp = tuple[int, ...]
+_MISSING_RETRY_S = 1.0
+
+
+@dataclass(frozen=True)
+class LoadedIndex:
+    index: CRIndex
+    stamp: Stamp
+    version: int
+    loaded_at: float
+    load_seconds: float
+    corpus: CorpusStore | None = None
+
+
+class CRIndexManager:
+    def __init__(
+        self,
+        npz_path: str,
+        meta_path: str,
+        *,
+        check_interval_s: float | None = 2.0,
+        loader: Callable[[str, str], CRIndex] = load_cr_index,
+        corpus_dir: str | None = None,
+    ) -> None:
+        self.npz_path = npz_path
+        self.meta_path = meta_path
+        self.corpus_dir = corpus_dir
+        self.check_interval_s = check_interval_s
+        self._loader = loader
+        self._current: LoadedIndex | None = None
+        self._version = 0
+        self._last_check = float("-inf")
+        self._lock = threading.Lock()
+        self._reload_thread: threading.Thread | None = None
+
+    @property
+    def current(self) -> LoadedIndex | None:
+        return self._current
+
+    def _stamp(self) -> Stamp | None:
+        try:
+            npz = Path(self.npz_path).stat()
+            meta = Path(self.meta_path).stat()
+        except FileNotFoundError:
+            return None
+        stamp: Stamp = (npz.st_mtime_ns, npz.st_size, meta.st_mtime_ns, meta.st_size)
+        if self.corpus_dir is not None:
+            # corpus.json is written last, so it stands in for the whole store.
+            try:
+                corpus = (Path(self.corpus_dir) / CORPUS_META_NAME).stat()
+                stamp += (corpus.st_mtime_ns, corpus.st_size)
+            except FileNotFoundError:
+                stamp += (-1, -1)
+        return stamp
+
+    def get(self) -> CRIndex | None:
+        """Return the served index, scheduling a reload if the files changed."""
+        loaded = self.get_loaded()
+        return loaded.index if loaded is not None else None
+
+    def get_loaded(self) -> LoadedIndex | None:
+        """Like :meth:`get`, but return the index together with its corpus and version.
+
+        The first successful load happens inline; later versions are loaded in
+        the background while the previous index keeps serving. A missing index
+        is retried on later calls rather than remembered.
+        """
+        current = self._current
+        interval = self.check_interval_s
+        if current is None:
+            interval = _MISSING_RETRY_S if interval is None else min(interval, _MISSING_RETRY_S)
+        elif interval is None:
+            return current
+        now = time.monotonic()
+        if now - self._last_check < interval:
+            return current
+        self._last_check = now
+        stamp = self._stamp()
+        if stamp is None or (current is not None and stamp == current.stamp):
+            return current
+        if current is None:
+            return self._load(stamp)
+        self._reload_in_background(stamp)
+        return current
+
+    def reload(self) -> LoadedIndex | None:
+        """Load the files now (regardless of stamp) and swap the result in.
+
+        Returns ``None`` if the index files are missing; load errors propagate.
+        """
+        stamp = self._stamp()
+        if stamp is None:
+            return None
+        return self._load(stamp, raise_errors=True)
+
+    def wait_for_reload(self, timeout: float | None = None) -> None:
+        thread = self._reload_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _reload_in_background(self, stamp: Stamp) -> None:
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._reload_thread = threading.Thread(
+                target=self._load, args=(stamp,), name="nc-cr-reload", daemon=True
+            )
+            self._reload_thread.start()
+
+    def _load(self, stamp: Stamp, *, raise_errors: bool = False) -> LoadedIndex | None:
+        start = time.perf_counter()
+        try:
+            index = self._loader(self.npz_path, self.meta_path)
+            corpus = self._load_corpus()
+        except Exception:
+            # A half-written index (npz and meta from different builds) or a file
+            # removed mid-load: keep serving the old index and retry next check.
+            record_cr_index_load(time.perf_counter() - start, self._version, 0, success=False)
+            if raise_errors:
+                raise
+            logger.warning("CR index reload from %s failed", self.npz_path, exc_info=True)
+            return None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._version += 1
+            loaded = LoadedIndex(
+                index=index,
+                stamp=stamp,
+                version=self._version,
+                loaded_at=time.time(),
+                load_seconds=elapsed,
+                corpus=corpus,
+            )
+            self._current = loaded
+        record_cr_index_load(elapsed, loaded.version, int(index.meta.doc_count))
+        return loaded
+
+    def _load_corpus(self) -> CorpusStore | None:
+        if self.corpus_dir is None:
+            return None
+        if not (Path(self.corpus_dir) / CORPUS_META_NAME).exists():
+            # The index is still useful for request-supplied documents.
+            logger.warning("CR corpus store %s not found; corpus mode disabled", self.corpus_dir)
+            return None
+        return load_corpus_store(self.corpus_dir)
+
+
+_managers: dict[tuple[str, str, str | None], CRIndexManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_cr_index_manager(
+    npz_path: str,
+    meta_path: str,
+    *,
+    check_interval_s: float | None = 2.0,
+    corpus_dir: str | None = None,
+) -> CRIndexManager:
+    """Return the shared manager for these paths, creating it on first use."""
+    key = (
+        str(Path(npz_path).absolute()),
+        str(Path(meta_path).absolute()),
+        str(Path(corpus_dir).absolute()) if corpus_dir else None,
+    )
+    manager = _managers.get(key)
+    if manager is not None:
+        return manager
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = CRIndexManager(
+                key[0], key[1], check_interval_s=check_interval_s, corpus_dir=key[2]
+            )
+            _managers[key] = manager
+        return manager
+
+
+def reset_cr_index_managers() -> None:
+    """Drop all shared managers (tests and embedders that swap index paths)."""
+    with _managers_lock:
+        _managers.clear()
+
+
+__all__ = [
+    "CRIndexManager",
+    "LoadedIndex",
+    "get_cr_index_manager",
+    "reset_cr_index_managers",
+]
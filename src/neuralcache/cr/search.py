@@ -1,10 +1,28 @@
 from __future__ import annotations
 
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import Any
+
 import numpy as np
 
-from neuralcache.cr.index import CRIndex
+from neuralcache.cr.index import CRIndex, compute_bucket_means
+from neuralcache.cr.pq import adc_scores, adc_table
 from neuralcache.cr.utils import pca_transform
 
+# Distinct embedding matrices whose derived bucket means are kept per index.
+_MEANS_CACHE_SIZE = 8
+
+
+def _matrix_digest(arr: np.ndarray) -> bytes:
+    """Content key for an embedding matrix: its shape plus a hash of its values."""
+    data = np.ascontiguousarray(arr, dtype=np.float32)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(data.shape).encode())
+    h.update(data.data)
+    return h.digest()
+
 
 def _cosine(a: np.ndarray, b: np.ndarray, eps: float = 1e-9) -> np.ndarray:
     a_norm = a / (np.linalg.norm(a, axis=-1, keepdims=True) + eps)
@@ -12,60 +30,195 @@ def _cosine(a: np.ndarray, b: np.ndarray, eps: float = 1e-9) -> np.ndarray:
     return a_norm @ b_norm.T
 
 
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest scores, best first."""
+    if k <= 0 or scores.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < scores.size:
+        picked = np.argpartition(-scores, k - 1)[:k]
+        return picked[np.argsort(-scores[picked], kind="stable")]
+    return np.argsort(-scores, kind="stable")
+
+
+def _layout(cr: CRIndex) -> dict[str, Any]:
+    """Bucket sizes, topic offsets and stacked topic centroids, built once per index."""
+    cache = cr._search_cache
+    layout = cache.get("layout")
+    if layout is None:
+        topic_counts = [len(topics) for topics in cr.topic_buckets_per_coarse]
+        topic_offsets = np.zeros(len(topic_counts) + 1, dtype=np.int64)
+        np.cumsum(topic_counts, out=topic_offsets[1:])
+        dim1 = cr.proj1_components.shape[0]
+        centroids = [np.asarray(c, dtype=np.float32) for c in cr.topic_centroids_per_coarse]
+        layout = {
+            "coarse_sizes": np.array([len(b) for b in cr.coarse_buckets], dtype=np.int64),
+            "topic_offsets": topic_offsets,
+            "topic_sizes": np.array(
+                [len(b) for topics in cr.topic_buckets_per_coarse for b in topics], dtype=np.int64
+            ),
+            "topic_centroids": (
+                np.concatenate(centroids) if centroids else np.zeros((0, dim1), dtype=np.float32)
+            ),
+        }
+        cache["layout"] = layout
+    return layout
+
+
+def _bucket_means(
+    cr: CRIndex, doc_embeddings_q0: np.ndarray | None, stored: bool
+) -> tuple[np.ndarray, np.ndarray]:
+    if (stored or doc_embeddings_q0 is None) and (
+        cr.coarse_means is not None and cr.topic_means is not None
+    ):
+        return cr.coarse_means, cr.topic_means
+    if doc_embeddings_q0 is None:
+        raise ValueError("Searching without doc_embeddings_q0 needs stored bucket means")
+    # Derive the means from the caller's embeddings. Per-request callers embed the
+    # same candidates afresh each time, so besides the identity fast path the
+    # means are keyed by a content digest of the matrix; the cache lives on the
+    # index and is dropped whenever its buckets change.
+    cache = cr._search_cache
+    last = cache.get("means_last")
+    if last is not None and last[0]() is doc_embeddings_q0:
+        return last[1], last[2]
+    digest = _matrix_digest(doc_embeddings_q0)
+    by_digest: OrderedDict[bytes, tuple[np.ndarray, np.ndarray]] = cache.setdefault(
+        "means", OrderedDict()
+    )
+    hit = by_digest.get(digest)
+    if hit is not None:
+        coarse_means, topic_means = hit
+    else:
+        coarse_means, topic_means = compute_bucket_means(
+            doc_embeddings_q0, cr.coarse_buckets, cr.topic_buckets_per_coarse
+        )
+        by_digest[digest] = (coarse_means, topic_means)
+        while len(by_digest) > _MEANS_CACHE_SIZE:
+            by_digest.popitem(last=False)
+    cache["means_last"] = (weakref.ref(doc_embeddings_q0), coarse_means, topic_means)
+    return coarse_means, topic_means
+
+
 def hierarchical_candidates(
     q0_query: np.ndarray,
-    doc_embeddings_q0: np.ndarray,
+    doc_embeddings_q0: np.ndarray | None,
     cr: CRIndex,
     top_coarse: int = 3,
     top_topics_per_coarse: int = 2,
     max_candidates: int = 256,
+    pq_rescore_factor: int | None = None,
+    stored_means: bool = False,
+    max_doc_id: int | None = None,
 ) -> list[int]:
-    q1 = pca_transform(q0_query[None, :], cr.proj1_components, cr.proj1_mean)
+    """Route the query down the CR hierarchy and return candidate doc ids.
+
+    Buckets are boosted by the similarity of their mean ``doc_embeddings_q0``
+    row to the query. ``stored_means`` uses the means saved with the index
+    instead, which is only equivalent when ``doc_embeddings_q0`` is the corpus
+    the index was built from (as in corpus mode).
+
+    With ``pq_rescore_factor`` set and an index that carries PQ codes, leaf
+    documents are first ranked from their codes; only the best
+    ``pq_rescore_factor`` times the per-topic cap are read from
+    ``doc_embeddings_q0`` and re-scored exactly. Passing ``doc_embeddings_q0``
+    as ``None`` ranks leaves from the codes alone, so no float q0 row is read
+    (the index must carry PQ codes and stored means).
+
+    ``max_doc_id`` drops bucket members at or past it, like tombstones: ids
+    added to the index after ``doc_embeddings_q0`` was written have no row in
+    it.
+    """
+    codes, codebooks = cr.pq_codes, cr.pq_codebooks
+    if codes is None or codebooks is None:
+        if doc_embeddings_q0 is None:
+            raise ValueError("Searching without doc_embeddings_q0 needs an index with PQ codes")
+        codes = codebooks = None
+    layout = _layout(cr)
+    coarse_means, topic_means = _bucket_means(cr, doc_embeddings_q0, stored_means)
+    q0 = q0_query[None, :]
+    q1 = pca_transform(q0, cr.proj1_components, cr.proj1_mean)
     q2 = pca_transform(q1, cr.proj2_components, cr.proj2_mean)
 
     s2 = _cosine(q2, cr.coarse_centroids).ravel()
-    coarse_boost = np.full_like(s2, fill_value=-1.0)
-    for idx, bucket in enumerate(cr.coarse_buckets):
-        if not bucket:
-            continue
-        mean_vec = doc_embeddings_q0[np.asarray(bucket)].mean(axis=0, keepdims=True)
-        coarse_boost[idx] = float(_cosine(q0_query[None, :], mean_vec).ravel()[0])
-    coarse_scores = 0.5 * s2 + 0.5 * coarse_boost
-    coarse_ids = np.argsort(-coarse_scores)[:top_coarse]
+    coarse_boost = np.where(layout["coarse_sizes"] > 0, _cosine(q0, coarse_means).ravel(), -1.0)
+    coarse_ids = _top(0.5 * s2 + 0.5 * coarse_boost, top_coarse)
+
+    # Score the topics of every selected coarse bucket with one product each.
+    topic_offsets = layout["topic_offsets"]
+    spans = [(int(topic_offsets[c]), int(topic_offsets[c + 1])) for c in coarse_ids]
+    rows = np.concatenate([np.arange(a, b) for a, b in spans]) if spans else np.zeros(0, int)
+    if rows.size == 0:
+        return []
+    s1 = _cosine(q1, layout["topic_centroids"][rows]).ravel()
+    topic_boost = np.where(
+        layout["topic_sizes"][rows] > 0, _cosine(q0, topic_means[rows]).ravel(), -1.0
+    )
+    topic_scores = 0.5 * s1 + 0.5 * topic_boost
+
+    chosen: list[np.ndarray] = []
+    cursor = 0
+    for coarse_id, (start, stop) in zip(coarse_ids.tolist(), spans, strict=True):
+        local = _top(topic_scores[cursor : cursor + stop - start], top_topics_per_coarse)
+        cursor += stop - start
+        topic_buckets = cr.topic_buckets_per_coarse[coarse_id]
+        for tid in local.tolist():
+            doc_indices = np.asarray(topic_buckets[tid], dtype=np.int64)
+            if doc_indices.size:
+                chosen.append(doc_indices)
+    if not chosen:
+        return []
+
+    tombstones = np.fromiter(cr.tombstones, dtype=np.int64) if cr.tombstones else None
+    if tombstones is not None:
+        chosen = [ids[~np.isin(ids, tombstones)] for ids in chosen]
+    if max_doc_id is not None:
+        chosen = [ids[ids < max_doc_id] for ids in chosen]
+    sizes = [ids.size for ids in chosen]
+    all_ids = np.concatenate(chosen)
+    if all_ids.size == 0:
+        return []
 
-    candidate_ids: list[int] = []
     topics_total = max(1, top_coarse * top_topics_per_coarse)
     docs_per_topic_cap = max(1, max_candidates // topics_total)
-    for cid in coarse_ids:
-        topic_centroids = cr.topic_centroids_per_coarse[cid]
-        if topic_centroids.shape[0] == 0:
-            continue
-        s1 = _cosine(q1, topic_centroids).ravel()
-        topic_boost = np.full_like(s1, fill_value=-1.0)
-        for tid, bucket in enumerate(cr.topic_buckets_per_coarse[cid]):
-            if not bucket:
-                continue
-            mean_vec = doc_embeddings_q0[np.asarray(bucket)].mean(axis=0, keepdims=True)
-            topic_boost[tid] = float(_cosine(q0_query[None, :], mean_vec).ravel()[0])
-        topic_scores = 0.5 * s1 + 0.5 * topic_boost
-        topic_ids = np.argsort(-topic_scores)[:top_topics_per_coarse]
-        for tid in topic_ids:
-            doc_bucket = cr.topic_buckets_per_coarse[cid][tid]
-            if not doc_bucket:
-                continue
-            doc_indices = np.asarray(doc_bucket)
-            topic_doc_scores = _cosine(q0_query[None, :], doc_embeddings_q0[doc_indices]).ravel()
-            keep = np.argsort(-topic_doc_scores)[
-                : min(docs_per_topic_cap, doc_indices.size)
-            ]
-            candidate_ids.extend(doc_indices[keep].tolist())
+    table = None
+    if codebooks is not None and (pq_rescore_factor or doc_embeddings_q0 is None):
+        table = adc_table(q0_query, codebooks)
+
+    def _scores(ids: np.ndarray) -> np.ndarray:
+        if doc_embeddings_q0 is None:
+            assert table is not None and codes is not None
+            return adc_scores(table, codes[ids])
+        return _cosine(q0, doc_embeddings_q0[ids]).ravel()
+
+    if (
+        pq_rescore_factor
+        and table is not None
+        and codes is not None
+        and doc_embeddings_q0 is not None
+    ):
+        approx = adc_scores(table, codes[all_ids])
+        shortlist: list[np.ndarray] = []
+        cursor = 0
+        for size in sizes:
+            keep = _top(approx[cursor : cursor + size], docs_per_topic_cap * pq_rescore_factor)
+            shortlist.append(all_ids[cursor + keep])
+            cursor += size
+        sizes = [ids.size for ids in shortlist]
+        all_ids = np.concatenate(shortlist)
+    doc_scores = _scores(all_ids)
+
+    candidate_ids: list[int] = []
+    cursor = 0
+    for size in sizes:
+        keep = _top(doc_scores[cursor : cursor + size], docs_per_topic_cap)
+        candidate_ids.extend(all_ids[cursor + keep].tolist())
+        cursor += size
 
     candidate_ids = list(dict.fromkeys(candidate_ids))
 
     if len(candidate_ids) > max_candidates:
-        candidate_vectors = doc_embeddings_q0[np.array(candidate_ids)]
-        s0 = _cosine(q0_query[None, :], candidate_vectors).ravel()
-        order = np.argsort(-s0)[:max_candidates]
+        s0 = _scores(np.array(candidate_ids))
+        order = _top(s0, max_candidates)
         candidate_ids = [candidate_ids[i] for i in order.tolist()]
 
     return candidate_ids
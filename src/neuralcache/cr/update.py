@@ -0,0 +1,170 @@
+"""Incremental CR index maintenance: add and remove documents without a rebuild.
+
+New documents are projected with the index's frozen PCA components and
+appended to their nearest coarse and topic buckets; removed documents are
+tombstoned. Assignment distances are tracked against the build-time baseline
+so :func:`drift_report` can say when the centroids have aged enough that a
+full rebuild is worth it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from neuralcache.cr.index import BucketList, Buckets, CRIndex
+from neuralcache.cr.pq import pq_encode
+from neuralcache.cr.utils import assign_to_centroids, pca_transform
+
+
+@dataclass
+class DriftReport:
+    added: int
+    removed: int
+    churn: float
+    coarse_distortion: float | None
+    topic_distortion: float | None
+    needs_rebuild: bool
+
+
+def _extend(buckets: Buckets, i: int, doc_ids: np.ndarray) -> None:
+    if isinstance(buckets, BucketList):
+        buckets.extend(i, doc_ids.tolist())
+    else:
+        buckets[i].extend(doc_ids.tolist())
+
+
+def _writable(array: np.ndarray) -> np.ndarray:
+    return array if array.flags.writeable else np.array(array)
+
+
+def _fold_mean(mean: np.ndarray, count: int, rows: np.ndarray) -> np.ndarray:
+    return (mean * count + rows.sum(axis=0)) / (count + rows.shape[0])
+
+
+def add_documents(idx: CRIndex, embeddings_q0: np.ndarray) -> np.ndarray:
+    """Assign new documents to existing buckets and return their doc ids.
+
+    Ids continue from ``idx.meta.doc_count``. Centroids are not moved; a
+    coarse bucket that had no topics gets a single topic seeded from the
+    documents routed to it. Stored bucket means are updated in place and,
+    for indexes with a PQ stage, the new docs are encoded with the existing
+    codebooks.
+    """
+    x = np.asarray(embeddings_q0, dtype=np.float32)
+    if x.ndim == 1:
+        x = x[None, :]
+    if x.shape[1] != idx.meta.d0:
+        raise ValueError(f"Expected embeddings of dim {idx.meta.d0}, got {x.shape[1]}")
+    if x.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    q1 = pca_transform(x, idx.proj1_components, idx.proj1_mean).astype(np.float32)
+    q2 = pca_transform(q1, idx.proj2_components, idx.proj2_mean).astype(np.float32)
+    doc_ids = np.arange(idx.meta.doc_count, idx.meta.doc_count + x.shape[0], dtype=np.int64)
+    coarse_labels, coarse_sq = assign_to_centroids(q2, idx.coarse_centroids)
+    topic_sq_sum = 0.0
+    # Indexes that predate stored means have neither; search derives them on first use.
+    coarse_means = topic_means = None
+    if idx.coarse_means is not None and idx.topic_means is not None:
+        coarse_means = _writable(idx.coarse_means)
+        topic_means = _writable(idx.topic_means)
+
+    for coarse_id in np.unique(coarse_labels).tolist():
+        members = np.flatnonzero(coarse_labels == coarse_id)
+        if coarse_means is not None:
+            coarse_means[coarse_id] = _fold_mean(
+                coarse_means[coarse_id], len(idx.coarse_buckets[coarse_id]), x[members]
+            )
+            topic_start = sum(len(t) for t in idx.topic_buckets_per_coarse[:coarse_id])
+        _extend(idx.coarse_buckets, coarse_id, doc_ids[members])
+        topic_centroids = idx.topic_centroids_per_coarse[coarse_id]
+        if topic_centroids.shape[0] == 0:
+            centroid = q1[members].mean(axis=0, keepdims=True)
+            idx.topic_centroids_per_coarse[coarse_id] = centroid
+            idx.topic_buckets_per_coarse[coarse_id] = [doc_ids[members].tolist()]
+            topic_sq_sum += float(((q1[members] - centroid) ** 2).sum(dtype=np.float64))
+            if topic_means is not None:
+                topic_means = np.insert(topic_means, topic_start, x[members].mean(axis=0), axis=0)
+            continue
+        topic_labels, topic_sq = assign_to_centroids(q1[members], topic_centroids)
+        topic_sq_sum += float(topic_sq.sum(dtype=np.float64))
+        topic_buckets = idx.topic_buckets_per_coarse[coarse_id]
+        for topic_id in np.unique(topic_labels).tolist():
+            routed = members[topic_labels == topic_id]
+            if topic_means is not None:
+                row = topic_start + topic_id
+                topic_means[row] = _fold_mean(
+                    topic_means[row], len(topic_buckets[topic_id]), x[routed]
+                )
+            _extend(topic_buckets, topic_id, doc_ids[routed])
+    if coarse_means is not None:
+        idx.coarse_means, idx.topic_means = coarse_means, topic_means
+    if idx.pq_codebooks is not None and idx.pq_codes is not None:
+        idx.pq_codes = np.concatenate([idx.pq_codes, pq_encode(x, idx.pq_codebooks)])
+    idx.invalidate_caches()
+
+    meta = idx.meta
+    if meta.build_doc_count is None:
+        meta.build_doc_count = meta.doc_count
+    meta.doc_count += x.shape[0]
+    meta.added_count += x.shape[0]
+    meta.added_coarse_sqdist_sum += float(coarse_sq.sum(dtype=np.float64))
+    meta.added_topic_sqdist_sum += topic_sq_sum
+    return doc_ids
+
+
+def remove_documents(idx: CRIndex, doc_ids: np.ndarray | list[int]) -> int:
+    """Tombstone ``doc_ids`` and return how many were newly removed."""
+    ids = np.asarray(doc_ids, dtype=np.int64).ravel()
+    if ids.size and (ids.min() < 0 or ids.max() >= idx.meta.doc_count):
+        raise ValueError(f"Doc ids must be in [0, {idx.meta.doc_count})")
+    fresh = set(ids.tolist()) - idx.tombstones
+    idx.tombstones.update(fresh)
+    if idx.meta.build_doc_count is None:
+        idx.meta.build_doc_count = idx.meta.doc_count
+    idx.meta.removed_count += len(fresh)
+    return len(fresh)
+
+
+def drift_report(
+    idx: CRIndex,
+    *,
+    distortion_threshold: float = 1.5,
+    churn_threshold: float = 0.25,
+) -> DriftReport:
+    """Compare post-build assignments with the build-time baseline.
+
+    Distortion is the mean squared distance of added docs to their assigned
+    centroid divided by the same quantity at build time (1.0 means new docs
+    fit the clusters as well as the originals did). Churn is the fraction of
+    the build-time corpus added or removed since. Either crossing its
+    threshold flags the index for a rebuild. Indexes built before these
+    statistics were recorded report ``None`` distortion.
+    """
+    meta = idx.meta
+    base_count = meta.build_doc_count or max(meta.doc_count - meta.added_count, 1)
+    churn = (meta.added_count + meta.removed_count) / max(base_count, 1)
+
+    def _ratio(added_sum: float, baseline: float | None) -> float | None:
+        if meta.added_count == 0 or not baseline:
+            return None
+        return (added_sum / meta.added_count) / baseline
+
+    coarse = _ratio(meta.added_coarse_sqdist_sum, meta.coarse_sqdist_mean)
+    topic = _ratio(meta.added_topic_sqdist_sum, meta.topic_sqdist_mean)
+    needs_rebuild = churn > churn_threshold or any(
+        ratio is not None and ratio > distortion_threshold for ratio in (coarse, topic)
+    )
+    return DriftReport(
+        added=meta.added_count,
+        removed=meta.removed_count,
+        churn=churn,
+        coarse_distortion=coarse,
+        topic_distortion=topic,
+        needs_rebuild=needs_rebuild,
+    )
+
+
+__all__ = ["DriftReport", "add_documents", "drift_report", "remove_documents"]
@@ -1,12 +1,50 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
+from typing import Literal
 
 import numpy as np
 
+PCAMethod = Literal["full", "randomized", "incremental"]
 
-def pca_fit(x: np.ndarray, out_dim: int) -> tuple[np.ndarray, np.ndarray]:
-    """Compute PCA projection via SVD, returning (components, mean)."""
+
+def pca_fit(
+    x: np.ndarray,
+    out_dim: int,
+    method: PCAMethod = "full",
+    *,
+    seed: int = 0,
+    oversample: int = 10,
+    power_iters: int = 4,
+    chunk_rows: int = 65536,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute a PCA projection, returning (components, mean).
+
+    ``method`` selects the solver:
+
+    - ``full``: exact SVD of the centred matrix (needs it fully resident).
+    - ``randomized``: Halko et al. range finder with ``power_iters`` subspace
+      iterations; centring is applied implicitly in row chunks.
+    - ``incremental``: streams ``x`` in row chunks through a
+      :class:`CovarianceAccumulator`; memory is O(d^2) regardless of ``len(x)``.
+    """
+    if method == "randomized":
+        return randomized_pca_fit(
+            x,
+            out_dim,
+            seed=seed,
+            oversample=oversample,
+            power_iters=power_iters,
+            chunk_rows=chunk_rows,
+        )
+    if method == "incremental":
+        return pca_fit_streaming(
+            (x[start : start + chunk_rows] for start in _row_chunks(x.shape[0], chunk_rows)),
+            out_dim,
+        )
+    if method != "full":
+        raise ValueError(f"Unknown PCA method: {method}")
     mu = x.mean(axis=0, keepdims=True)
     centered = x - mu
     _, _, vt = np.linalg.svd(centered, full_matrices=False)
@@ -14,6 +52,102 @@ def pca_fit(x: np.ndarray, out_dim: int) -> tuple[np.ndarray, np.ndarray]:
     return components, mu.squeeze(0)
 
 
+class CovarianceAccumulator:
+    """Streaming mean/covariance accumulator for chunked PCA fits.
+
+    Sums are kept in float64 around a shift (the first chunk's mean) so the
+    covariance stays well conditioned even when the data are far from the origin.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = int(dim)
+        self.count = 0
+        self._shift: np.ndarray | None = None
+        self._sum = np.zeros(self.dim, dtype=np.float64)
+        self._outer = np.zeros((self.dim, self.dim), dtype=np.float64)
+
+    def update(self, chunk: np.ndarray) -> None:
+        block = np.asarray(chunk, dtype=np.float64)
+        if block.shape[0] == 0:
+            return
+        if self._shift is None:
+            self._shift = block.mean(axis=0)
+        block = block - self._shift
+        self.count += block.shape[0]
+        self._sum += block.sum(axis=0)
+        self._outer += block.T @ block
+
+    def mean(self) -> np.ndarray:
+        if self.count == 0 or self._shift is None:
+            raise ValueError("CovarianceAccumulator has not seen any rows")
+        return self._shift + self._sum / self.count
+
+    def covariance(self) -> np.ndarray:
+        if self.count == 0:
+            raise ValueError("CovarianceAccumulator has not seen any rows")
+        shifted_mean = self._sum / self.count
+        return self._outer / self.count - np.outer(shifted_mean, shifted_mean)
+
+    def components(self, out_dim: int) -> tuple[np.ndarray, np.ndarray]:
+        eigvals, eigvecs = np.linalg.eigh(self.covariance())
+        order = np.argsort(eigvals)[::-1][:out_dim]
+        return eigvecs[:, order].T, self.mean()
+
+
+def pca_fit_streaming(chunks: Iterable[np.ndarray], out_dim: int) -> tuple[np.ndarray, np.ndarray]:
+    """Fit PCA from an iterable of row chunks via :class:`CovarianceAccumulator`."""
+    acc: CovarianceAccumulator | None = None
+    for chunk in chunks:
+        if acc is None:
+            acc = CovarianceAccumulator(np.asarray(chunk).shape[1])
+        acc.update(chunk)
+    if acc is None:
+        raise ValueError("pca_fit_streaming received no data")
+    return acc.components(out_dim)
+
+
+def randomized_pca_fit(
+    x: np.ndarray,
+    out_dim: int,
+    *,
+    seed: int = 0,
+    oversample: int = 10,
+    power_iters: int = 4,
+    chunk_rows: int = 65536,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Randomized PCA (range finder + small SVD) without materialising ``x - mean``."""
+    n_rows, dim = x.shape
+    rank = min(out_dim + oversample, dim, n_rows)
+    mu = np.zeros(dim, dtype=np.float64)
+    for start in _row_chunks(n_rows, chunk_rows):
+        mu += np.asarray(x[start : start + chunk_rows], dtype=np.float64).sum(axis=0)
+    mu /= max(n_rows, 1)
+
+    def centered_matmul(m: np.ndarray) -> np.ndarray:  # (x - mu) @ m
+        out = np.empty((n_rows, m.shape[1]), dtype=np.float64)
+        shift = mu @ m
+        for start in _row_chunks(n_rows, chunk_rows):
+            block = np.asarray(x[start : start + chunk_rows], dtype=np.float64)
+            out[start : start + block.shape[0]] = block @ m - shift
+        return out
+
+    def centered_rmatmul(q: np.ndarray) -> np.ndarray:  # (x - mu).T @ q
+        out = np.zeros((dim, q.shape[1]), dtype=np.float64)
+        for start in _row_chunks(n_rows, chunk_rows):
+            block = np.asarray(x[start : start + chunk_rows], dtype=np.float64)
+            out += block.T @ q[start : start + block.shape[0]]
+        return out - np.outer(mu, q.sum(axis=0))
+
+    rng = np.random.default_rng(seed)
+    q, _ = np.linalg.qr(centered_matmul(rng.standard_normal((dim, rank))))
+    for _ in range(power_iters):
+        z, _ = np.linalg.qr(centered_rmatmul(q))
+        q, _ = np.linalg.qr(centered_matmul(z))
+    b = centered_rmatmul(q).T  # (rank, dim) == q.T @ (x - mu)
+    _, _, vt = np.linalg.svd(b, full_matrices=False)
+    return vt[:out_dim, :], mu
+
+
 def pca_transform(x: np.ndarray, components: np.ndarray, mu: np.ndarray) -> np.ndarray:
     return (x - mu[None, :]) @ components.T
 
@@ -26,22 +160,146 @@ def pca_backproject(z: np.ndarray, components: np.ndarray, mu: np.ndarray) -> np
 class KMeansResult:
     centroids: np.ndarray
     labels: np.ndarray
+    iterations: int = 0
+    inertia: float = 0.0
 
 
-def kmeans_lloyd(x: np.ndarray, k: int, iters: int = 25, seed: int = 42) -> KMeansResult:
-    """Simple Lloyd's algorithm with random-sample initialisation."""
+def _row_chunks(n_rows: int, chunk_rows: int) -> range:
+    return range(0, n_rows, max(1, int(chunk_rows)))
+
+
+def assign_to_centroids(
+    x: np.ndarray, centroids: np.ndarray, chunk_rows: int = 65536
+) -> tuple[np.ndarray, np.ndarray]:
+    """Nearest-centroid labels and squared distances, computed in row chunks.
+
+    Uses ``|x|^2 - 2 x.c + |c|^2`` so each chunk costs one GEMM and a
+    (chunk_rows, k) buffer instead of an (n, k, d) broadcast.
+    """
+    n_rows = x.shape[0]
+    labels = np.empty(n_rows, dtype=np.int32)
+    sq_dist = np.empty(n_rows, dtype=np.float32)
+    c = np.asarray(centroids, dtype=np.float32)
+    c_sq = np.einsum("ij,ij->i", c, c)
+    for start in _row_chunks(n_rows, chunk_rows):
+        block = np.asarray(x[start : start + chunk_rows], dtype=np.float32)
+        d = block @ c.T
+        d *= -2.0
+        d += c_sq[None, :]
+        d += np.einsum("ij,ij->i", block, block)[:, None]
+        best = d.argmin(axis=1)
+        stop = start + block.shape[0]
+        labels[start:stop] = best
+        sq_dist[start:stop] = np.maximum(d[np.arange(block.shape[0]), best], 0.0)
+    return labels, sq_dist
+
+
+def kmeans_plusplus_init(
+    x: np.ndarray,
+    k: int,
+    rng: np.random.Generator,
+    chunk_rows: int = 65536,
+    sample_size: int | None = None,
+) -> np.ndarray:
+    """k-means++ seeding (optionally on a uniform row sample for very large inputs)."""
+    n_rows = x.shape[0]
+    if sample_size is not None and n_rows > sample_size:
+        rows = np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+        x = np.asarray(x[rows], dtype=np.float32)
+        n_rows = x.shape[0]
+    centroids = np.empty((k, x.shape[1]), dtype=np.float32)
+    centroids[0] = x[int(rng.integers(n_rows))]
+    _, closest = assign_to_centroids(x, centroids[:1], chunk_rows)
+    for i in range(1, k):
+        total = float(closest.sum(dtype=np.float64))
+        if total <= 0.0:
+            pick = int(rng.integers(n_rows))
+        else:
+            probs = closest.astype(np.float64) / total
+            pick = int(rng.choice(n_rows, p=probs))
+        centroids[i] = x[pick]
+        _, dist_new = assign_to_centroids(x, centroids[i : i + 1], chunk_rows)
+        np.minimum(closest, dist_new, out=closest)
+    return centroids
+
+
+def _accumulate_means(
+    x: np.ndarray, labels: np.ndarray, k: int, chunk_rows: int
+) -> tuple[np.ndarray, np.ndarray]:
+    sums = np.zeros((k, x.shape[1]), dtype=np.float64)
+    counts = np.zeros(k, dtype=np.int64)
+    for start in _row_chunks(x.shape[0], chunk_rows):
+        block = np.asarray(x[start : start + chunk_rows], dtype=np.float64)
+        block_labels = labels[start : start + block.shape[0]]
+        # One-hot GEMM is far faster than np.add.at for scattering rows into sums.
+        onehot = np.zeros((block.shape[0], k), dtype=np.float64)
+        onehot[np.arange(block.shape[0]), block_labels] = 1.0
+        sums += onehot.T @ block
+        counts += np.bincount(block_labels, minlength=k)
+    return sums, counts
+
+
+def kmeans(
+    x: np.ndarray,
+    k: int,
+    iters: int = 25,
+    seed: int = 42,
+    *,
+    tol: float = 1e-4,
+    batch_size: int | None = None,
+    chunk_rows: int = 65536,
+    init_sample: int | None = 100_000,
+) -> KMeansResult:
+    """Memory-bounded k-means with k-means++ seeding and early stopping.
+
+    ``x`` may be any array-like supporting row slicing (including ``np.memmap``);
+    peak extra memory is O(chunk_rows * k + k * d) regardless of ``len(x)``.
+    With ``batch_size`` set, centroids are refined with mini-batch updates
+    (Sculley 2010) instead of full Lloyd passes. Iteration stops once the largest
+    centroid shift falls below ``tol`` times the data scale.
+    """
     rng = np.random.default_rng(seed)
     n_samples = x.shape[0]
     if k > n_samples:
         raise ValueError("k cannot exceed number of samples")
-    idx = rng.choice(n_samples, size=k, replace=False)
-    centroids = x[idx].copy()
-    labels = np.zeros(n_samples, dtype=np.int32)
-    for _ in range(iters):
-        distances = ((x[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
-        labels = distances.argmin(axis=1)
-        for centroid_idx in range(k):
-            mask = labels == centroid_idx
-            if mask.any():
-                centroids[centroid_idx] = x[mask].mean(axis=0)
-    return KMeansResult(centroids=centroids, labels=labels)
+    centroids = kmeans_plusplus_init(x, k, rng, chunk_rows=chunk_rows, sample_size=init_sample)
+    scale = float(np.sqrt(np.mean(np.var(np.asarray(centroids, dtype=np.float64), axis=0))) or 1.0)
+    threshold = tol * scale
+    iterations = 0
+    if batch_size is not None and batch_size < n_samples:
+        counts = np.zeros(k, dtype=np.int64)
+        for iterations in range(1, iters + 1):  # noqa: B007 - reported in result
+            rows = np.sort(rng.choice(n_samples, size=batch_size, replace=False))
+            batch = np.asarray(x[rows], dtype=np.float32)
+            batch_labels, _ = assign_to_centroids(batch, centroids, chunk_rows)
+            previous = centroids.copy()
+            for cid in np.unique(batch_labels):
+                members = batch[batch_labels == cid]
+                counts[cid] += members.shape[0]
+                eta = members.shape[0] / counts[cid]
+                centroids[cid] = (1.0 - eta) * centroids[cid] + eta * members.mean(axis=0)
+            if float(np.max(np.linalg.norm(centroids - previous, axis=1))) <= threshold:
+                break
+    else:
+        for iterations in range(1, iters + 1):  # noqa: B007 - reported in result
+            labels, _ = assign_to_centroids(x, centroids, chunk_rows)
+            sums, counts = _accumulate_means(x, labels, k, chunk_rows)
+            updated = centroids.copy()
+            filled = counts > 0
+            updated[filled] = (sums[filled] / counts[filled, None]).astype(np.float32)
+            shift = float(np.max(np.linalg.norm(updated - centroids, axis=1)))
+            centroids = updated
+            if shift <= threshold:
+                break
+    labels, sq_dist = assign_to_centroids(x, centroids, chunk_rows)
+    return KMeansResult(
+        centroids=centroids,
+        labels=labels,
+        iterations=iterations,
+        inertia=float(sq_dist.sum(dtype=np.float64)),
+    )
+
+
+def kmeans_lloyd(x: np.ndarray, k: int, iters: int = 25, seed: int = 42) -> KMeansResult:
+    """Lloyd's algorithm; kept as the historical entry point for :func:`kmeans`."""
+    return kmeans(x, k=k, iters=iters, seed=seed)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+# Scoring stages are degraded in a fixed order as the budget drains: each one is
+# checked just before it runs and switches to its cheap variant once less than
+# this fraction of the budget remains.
+FORCE_CASCADE_BELOW = 0.75  # run cascade mode: encode only docs past the hashing gate
+SKIP_CR_BELOW = 0.6  # skip CR hierarchical candidate search
+SHRINK_CANDIDATES_BELOW = 0.4  # keep only gating_min_candidates
+TRUNCATE_MMR_BELOW = 0.1  # stop MMR, order the rest by base score
+
+
+class Deadline:
+    """Latency budget for one request, measured from ``start`` on ``clock``."""
+
+    def __init__(
+        self,
+        budget_ms: float,
+        *,
+        start: float | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.budget_ms = float(budget_ms)
+        self._clock = clock
+        self.start = clock() if start is None else start
+        self.degradations: list[str] = []
+
+    @classmethod
+    def earliest(cls, *budgets_ms: float | None, start: float | None = None) -> Deadline | None:
+        """The tightest of several optional budgets sharing one start, or ``None``."""
+        given = [float(ms) for ms in budgets_ms if ms is not None]
+        return cls(min(given), start=start) if given else None
+
+    def remaining_ms(self) -> float:
+        return self.budget_ms - (self._clock() - self.start) * 1000.0
+
+    def remaining_fraction(self) -> float:
+        if self.budget_ms <= 0:
+            return 0.0
+        return self.remaining_ms() / self.budget_ms
+
+    def degrade(self, name: str, below: float) -> bool:
+        """Record and return whether stage ``name`` must degrade at this point."""
+        if self.remaining_fraction() >= below:
+            return False
+        if name not in self.degradations:
+            self.degradations.append(name)
+        return True
+
+    def debug(self) -> dict[str, object]:
+        return {
+            "budget_ms": self.budget_ms,
+            "remaining_ms": self.remaining_ms(),
+            "degradations": list(self.degradations),
+        }
+
+
+__all__ = [
+    "Deadline",
+    "FORCE_CASCADE_BELOW",
+    "SHRINK_CANDIDATES_BELOW",
+    "SKIP_CR_BELOW",
+    "TRUNCATE_MMR_BELOW",
+]
@@ -12,12 +12,15 @@ from __future__ import annotations
 import hashlib
 import importlib
 import logging
+import threading
 from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from typing import Any, Protocol, TypeAlias
 
 import numpy as np
 
+from .metrics import record_resident_encoders
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +40,10 @@ class HashingEncoder:
 
     dim: int
 
+    @property
+    def identity(self) -> str:
+        return f"hash:md5:{self.dim}"
+
     def encode(self, text: str) -> np.ndarray:
         return _hash_to_vector(text, self.dim)
 
@@ -60,6 +67,10 @@ class OpenAIEncoder:
         self._client = client_factory()
         self._model = model
 
+    @property
+    def identity(self) -> str:
+        return f"openai:{self._model}"
+
     def encode(self, text: str) -> np.ndarray:
         response = self._client.embeddings.create(model=self._model, input=[text])
         return _to_float32(response.data[0].embedding)
@@ -84,6 +95,11 @@ class SentenceTransformerEncoder:
             ) from exc
         encoder_factory: Any = module.SentenceTransformer
         self._model = encoder_factory(model_name)
+        self._model_name = model_name
+
+    @property
+    def identity(self) -> str:
+        return f"sentence-transformer:{self._model_name}"
 
     def encode(self, text: str) -> np.ndarray:
         vector = self._model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
@@ -126,9 +142,32 @@ def _ensure_matrix(vectors: Sequence[VectorInput]) -> np.ndarray:
     return np.asarray(vectors, dtype=np.float32)
 
 
-def create_encoder(name: str, *, dim: int, model: str | None = None) -> SupportsEncode:
-    """Factory returning an encoder implementation based on configuration."""
+def create_encoder(
+    name: str,
+    *,
+    dim: int,
+    model: str | None = None,
+    cache_dir: str | None = None,
+    cache_shard_bytes: int = 64 * 1024 * 1024,
+) -> SupportsEncode:
+    """Factory returning an encoder implementation based on configuration.
+
+    When ``cache_dir`` is set the encoder is wrapped in a persistent on-disk cache
+    keyed by the encoder identity, so restarts and sibling worker processes reuse
+    previously computed vectors instead of re-encoding them.
+    """
 
+    encoder = _create_base_encoder(name, dim=dim, model=model)
+    if not cache_dir:
+        return encoder
+    from .storage.embedding_cache import CachedEncoder, DiskEmbeddingCache
+
+    identity = getattr(encoder, "identity", type(encoder).__name__)
+    cache = DiskEmbeddingCache(cache_dir, identity, shard_bytes=cache_shard_bytes)
+    return CachedEncoder(encoder, cache)
+
+
+def _create_base_encoder(name: str, *, dim: int, model: str | None = None) -> SupportsEncode:
     backend = (name or "hash").lower()
     if backend == "hash":
         return HashingEncoder(dim=dim)
@@ -157,10 +196,97 @@ def create_encoder(name: str, *, dim: int, model: str | None = None) -> Supports
     return HashingEncoder(dim=dim)
 
 
+_BACKEND_ALIASES = {
+    "openai-api": "openai",
+    "sentence_transformer": "sentence-transformer",
+    "hf": "sentence-transformer",
+}
+
+EncoderKey: TypeAlias = tuple[str, str | None, int, str | None, int]
+
+
+@dataclass(slots=True)
+class _SharedEncoder:
+    encoder: SupportsEncode
+    refs: int
+
+
+# Process-wide encoders, shared by every Reranker (namespace) with the same config.
+_shared_encoders: dict[EncoderKey, _SharedEncoder] = {}
+_shared_keys: dict[int, EncoderKey] = {}
+_shared_lock = threading.Lock()
+
+
+def _encoder_key(
+    name: str, dim: int, model: str | None, cache_dir: str | None, cache_shard_bytes: int
+) -> EncoderKey:
+    backend = (name or "hash").lower()
+    backend = _BACKEND_ALIASES.get(backend, backend)
+    return (backend, model, int(dim), cache_dir or None, int(cache_shard_bytes))
+
+
+def acquire_encoder(
+    name: str,
+    *,
+    dim: int,
+    model: str | None = None,
+    cache_dir: str | None = None,
+    cache_shard_bytes: int = 64 * 1024 * 1024,
+) -> SupportsEncode:
+    """Return the shared encoder for this configuration, creating it on first use.
+
+    Every call takes a reference that must be handed back with
+    :func:`release_encoder`; the instance (and its model weights or cache
+    handles) is dropped when the last reference goes. Creation happens under
+    the registry lock so concurrent first requests load a model only once.
+    """
+    key = _encoder_key(name, dim, model, cache_dir, cache_shard_bytes)
+    with _shared_lock:
+        shared = _shared_encoders.get(key)
+        if shared is None:
+            encoder = create_encoder(
+                name, dim=dim, model=model, cache_dir=cache_dir, cache_shard_bytes=cache_shard_bytes
+            )
+            shared = _SharedEncoder(encoder=encoder, refs=0)
+            _shared_encoders[key] = shared
+            _shared_keys[id(encoder)] = key
+            record_resident_encoders(len(_shared_encoders))
+        shared.refs += 1
+        return shared.encoder
+
+
+def release_encoder(encoder: SupportsEncode) -> None:
+    """Drop one reference taken by :func:`acquire_encoder` (unknown encoders are ignored)."""
+    with _shared_lock:
+        key = _shared_keys.get(id(encoder))
+        if key is None:
+            return
+        shared = _shared_encoders.get(key)
+        if shared is None or shared.encoder is not encoder:
+            return
+        shared.refs -= 1
+        if shared.refs > 0:
+            return
+        del _shared_encoders[key]
+        del _shared_keys[id(encoder)]
+        record_resident_encoders(len(_shared_encoders))
+    cache = getattr(encoder, "cache", None)
+    if cache is not None and hasattr(cache, "close"):
+        cache.close()
+
+
+def resident_encoder_count() -> int:
+    with _shared_lock:
+        return len(_shared_encoders)
+
+
 __all__ = [
     "SupportsEncode",
     "HashingEncoder",
     "OpenAIEncoder",
     "SentenceTransformerEncoder",
+    "acquire_encoder",
     "create_encoder",
+    "release_encoder",
+    "resident_encoder_count",
 ]
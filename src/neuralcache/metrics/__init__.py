@@ -5,7 +5,14 @@ from .prom import (
     metrics_enabled,
     observe_rerank,
     record_context_use,
+    record_cr_index_load,
+    record_dynamic_batch,
     record_feedback,
+    record_namespace_eviction,
+    record_namespace_footprint,
+    record_namespace_load,
+    record_resident_encoders,
+    record_response_cache,
 )
 from .text import context_used, lexical_overlap
 
@@ -16,5 +23,12 @@ __all__ = [
     "metrics_enabled",
     "observe_rerank",
     "record_context_use",
+    "record_cr_index_load",
+    "record_dynamic_batch",
     "record_feedback",
+    "record_namespace_eviction",
+    "record_namespace_footprint",
+    "record_namespace_load",
+    "record_resident_encoders",
+    "record_response_cache",
 ]
@@ -5,6 +5,7 @@ try:  # pragma: no cover - optional dependency
         CONTENT_TYPE_LATEST,
         CollectorRegistry,
         Counter,
+        Gauge,
         Histogram,
         generate_latest,
     )
@@ -33,6 +34,29 @@ except Exception:  # pragma: no cover - prefer graceful fallback
     def record_feedback(success: bool) -> None:
         return None
 
+    def record_cr_index_load(
+        duration: float, version: int, doc_count: int, success: bool = True
+    ) -> None:
+        return None
+
+    def record_resident_encoders(count: int) -> None:
+        return None
+
+    def record_namespace_eviction(reason: str) -> None:
+        return None
+
+    def record_namespace_load(reloaded: bool) -> None:
+        return None
+
+    def record_namespace_footprint(count: int, estimated_bytes: int) -> None:
+        return None
+
+    def record_response_cache(outcome: str) -> None:
+        return None
+
+    def record_dynamic_batch(size: int, max_size: int) -> None:
+        return None
+
 else:  # pragma: no cover - exercised when prometheus_client is installed
     PROMETHEUS_AVAILABLE = True
     _REGISTRY = CollectorRegistry()
@@ -91,6 +115,69 @@ else:  # pragma: no cover - exercised when prometheus_client is installed
         registry=_REGISTRY,
     )
 
+    _CR_INDEX_LOAD_SECONDS = Histogram(
+        "neuralcache_cr_index_load_seconds",
+        "Time spent loading (or reloading) the CR index, by outcome.",
+        labelnames=("outcome",),
+        registry=_REGISTRY,
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+    )
+    _CR_INDEX_VERSION = Gauge(
+        "neuralcache_cr_index_version",
+        "Monotonic version of the CR index currently served (increments on every swap).",
+        registry=_REGISTRY,
+    )
+    _CR_INDEX_DOCS = Gauge(
+        "neuralcache_cr_index_documents",
+        "Documents covered by the CR index currently served.",
+        registry=_REGISTRY,
+    )
+    _RESIDENT_ENCODERS = Gauge(
+        "neuralcache_resident_encoders",
+        "Encoder/model instances held in the process-wide registry (shared by namespaces).",
+        registry=_REGISTRY,
+    )
+    _NAMESPACE_EVICTIONS = Counter(
+        "neuralcache_namespace_evictions_total",
+        "Namespaces evicted from the resident registry, by trigger (count or memory).",
+        labelnames=("reason",),
+        registry=_REGISTRY,
+    )
+    _NAMESPACE_LOADS = Counter(
+        "neuralcache_namespace_loads_total",
+        "Namespaces made resident, split into first loads and reloads after eviction.",
+        labelnames=("kind",),
+        registry=_REGISTRY,
+    )
+    _RESIDENT_NAMESPACES = Gauge(
+        "neuralcache_resident_namespaces",
+        "Namespaces currently resident in the registry.",
+        registry=_REGISTRY,
+    )
+    _NAMESPACE_BYTES = Gauge(
+        "neuralcache_namespace_estimated_bytes",
+        "Estimated memory held by resident namespaces (shared encoders excluded).",
+        registry=_REGISTRY,
+    )
+    _DYNAMIC_BATCH_SIZE = Histogram(
+        "neuralcache_dynamic_batch_size",
+        "Single /rerank requests scored together by the dynamic batcher.",
+        registry=_REGISTRY,
+        buckets=(1, 2, 4, 8, 16, 32, 64),
+    )
+    _DYNAMIC_BATCH_FILL = Histogram(
+        "neuralcache_dynamic_batch_fill_ratio",
+        "Dynamic batch size as a fraction of the configured maximum.",
+        registry=_REGISTRY,
+        buckets=(0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+    )
+    _RESPONSE_CACHE = Counter(
+        "neuralcache_response_cache_requests_total",
+        "Cacheable /rerank requests by outcome: hit, miss, or join (coalesced into a miss).",
+        labelnames=("outcome",),
+        registry=_REGISTRY,
+    )
+
     def metrics_enabled() -> bool:
         return True
 
@@ -129,11 +216,47 @@ else:  # pragma: no cover - exercised when prometheus_client is installed
         outcome = "success" if success else "failure"
         _FEEDBACK_EVENTS.labels(outcome=outcome).inc()
 
+    def record_cr_index_load(
+        duration: float, version: int, doc_count: int, success: bool = True
+    ) -> None:
+        outcome = "success" if success else "failure"
+        _CR_INDEX_LOAD_SECONDS.labels(outcome=outcome).observe(max(duration, 0.0))
+        if success:
+            _CR_INDEX_VERSION.set(version)
+            _CR_INDEX_DOCS.set(doc_count)
+
+    def record_resident_encoders(count: int) -> None:
+        _RESIDENT_ENCODERS.set(count)
+
+    def record_namespace_eviction(reason: str) -> None:
+        _NAMESPACE_EVICTIONS.labels(reason=reason).inc()
+
+    def record_namespace_load(reloaded: bool) -> None:
+        _NAMESPACE_LOADS.labels(kind="reload" if reloaded else "new").inc()
+
+    def record_namespace_footprint(count: int, estimated_bytes: int) -> None:
+        _RESIDENT_NAMESPACES.set(count)
+        _NAMESPACE_BYTES.set(estimated_bytes)
+
+    def record_response_cache(outcome: str) -> None:
+        _RESPONSE_CACHE.labels(outcome=outcome).inc()
+
+    def record_dynamic_batch(size: int, max_size: int) -> None:
+        _DYNAMIC_BATCH_SIZE.observe(size)
+        _DYNAMIC_BATCH_FILL.observe(size / max(1, max_size))
+
 
 __all__ = [
     "latest_metrics",
     "metrics_enabled",
     "observe_rerank",
     "record_context_use",
+    "record_cr_index_load",
+    "record_dynamic_batch",
     "record_feedback",
+    "record_namespace_eviction",
+    "record_namespace_footprint",
+    "record_namespace_load",
+    "record_resident_encoders",
+    "record_response_cache",
 ]
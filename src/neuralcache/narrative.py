@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import pathlib
+import threading
 import time
 from contextlib import suppress
 
@@ -12,6 +13,13 @@ from .storage.sqlite_state import SQLiteState
 
 
 class NarrativeTracker:
+    """Running success-weighted mean of document embeddings.
+
+    ``update`` and the persistence methods serialize on a re-entrant lock so
+    concurrent scoring threads can share one tracker; ``coherence`` reads a
+    single snapshot of the vector.
+    """
+
     def __init__(
         self,
         dim: int = 768,
@@ -30,6 +38,7 @@ class NarrativeTracker:
         self._sqlite = sqlite_state
         self.v = np.zeros((dim,), dtype=np.float32)
         self._updated_ts = 0.0
+        self._lock = threading.RLock()
         self._load()
 
     def _load(self) -> None:
@@ -66,49 +75,63 @@ class NarrativeTracker:
                 self._sqlite.save_narrative(self.v)
             return
 
+        self._write_json(now)
+
+    def _write_json(self, updated_ts: float) -> None:
         path = pathlib.Path(self.path)
         path.parent.mkdir(parents=True, exist_ok=True)
         with suppress(Exception), path.open("w", encoding="utf-8") as handle:
-            json.dump({"v": self.v.tolist(), "updated_ts": now}, handle)
+            json.dump({"v": self.v.tolist(), "updated_ts": updated_ts}, handle)
         with suppress(Exception):
             path.chmod(0o600)
 
+    def flush(self) -> None:
+        """Persist the current vector without refreshing its retention timestamp."""
+        with self._lock:
+            # SQLite writes commit immediately; only the JSON file can lag the vector.
+            if self.backend == "json" and self._updated_ts:
+                self._write_json(self._updated_ts)
+
     def update(self, doc_embedding: np.ndarray, success: float) -> None:
-        if success < self.success_gate:
-            return
-        doc_embedding = doc_embedding.astype(np.float32).reshape(-1)
-        if doc_embedding.size != self.v.size:
-            # Resize narrative to match embedding dim if needed
-            self.v = np.zeros_like(doc_embedding, dtype=np.float32)
-        self.v = (1 - self.alpha) * self.v + self.alpha * doc_embedding
-        self.v = safe_normalize(self.v)
-        self._save()
+        with self._lock:
+            if success < self.success_gate:
+                return
+            doc_embedding = doc_embedding.astype(np.float32).reshape(-1)
+            if doc_embedding.size != self.v.size:
+                # Resize narrative to match embedding dim if needed
+                self.v = np.zeros_like(doc_embedding, dtype=np.float32)
+            self.v = (1 - self.alpha) * self.v + self.alpha * doc_embedding
+            self.v = safe_normalize(self.v)
+            self._save()
 
     def coherence(self, doc_embeddings: np.ndarray) -> np.ndarray:
         # Returns cosine similarity with narrative vector
-        if self.v.size == 0:
+        current = self.v  # ``update`` swaps in a new array rather than mutating
+        if current.size == 0:
             return np.zeros((doc_embeddings.shape[0],), dtype=np.float32)
-        v = self.v.reshape(1, -1)
+        v = current.reshape(1, -1)
         v = safe_normalize(v)
         docs_norm = safe_normalize(doc_embeddings)
         sims = (v @ docs_norm.T).reshape(-1)
         return sims.astype(np.float32)
 
     def purge_if_stale(self, retention_seconds: float) -> None:
-        if retention_seconds <= 0:
-            return
-        cutoff = time.time() - retention_seconds
-        if self._updated_ts == 0 or self._updated_ts >= cutoff:
-            return
-        self.v = np.zeros_like(self.v, dtype=np.float32)
-        self._updated_ts = 0.0
-        if self.backend == "sqlite" and self._sqlite is not None:
-            with suppress(Exception):
-                self._sqlite.clear_narrative()
-        elif self.backend == "json":
-            path = pathlib.Path(self.path)
-            with suppress(FileNotFoundError):
-                path.unlink()
+        with self._lock:
+            if retention_seconds <= 0:
+                return
+            cutoff = time.time() - retention_seconds
+            if self._updated_ts == 0 or self._updated_ts >= cutoff:
+                return
+            self.v = np.zeros_like(self.v, dtype=np.float32)
+            self._updated_ts = 0.0
+            if self.backend == "sqlite" and self._sqlite is not None:
+                with suppress(Exception):
+                    self._sqlite.clear_narrative()
+            elif self.backend == "json":
+                path = pathlib.Path(self.path)
+                with suppress(FileNotFoundError):
+                    path.unlink()
 
     def refresh(self) -> None:
-        self._load()
+        with self._lock:
+            self._load()
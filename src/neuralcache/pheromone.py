@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import pathlib
+import threading
 import time
 from contextlib import suppress
 
@@ -9,7 +10,11 @@ from .storage.sqlite_state import SQLiteState
 
 
 class PheromoneStore:
-    """Durable pheromone store supporting JSON or SQLite backends."""
+    """Durable pheromone store supporting JSON or SQLite backends.
+
+    Safe to share between threads: every read-modify-write (and the JSON dump
+    of ``data``) runs under one re-entrant lock.
+    """
 
     def __init__(
         self,
@@ -27,6 +32,7 @@ class PheromoneStore:
         self.path = (base_path / path).as_posix()
         self._sqlite = sqlite_state
         self.data: dict[str, dict[str, float]] = {}  # id -> {value, t, exposures}
+        self._lock = threading.RLock()
         if self.backend == "json":
             self._load()
 
@@ -55,102 +61,114 @@ class PheromoneStore:
         with suppress(Exception):
             path.chmod(0o600)
 
+    def flush(self) -> None:
+        """Persist in-memory records (JSON backend; SQLite writes are immediate)."""
+        with self._lock:
+            if self.backend == "json" and self.data:
+                self._save()
+
     def _decay_factor(self, dt: float) -> float:
         if self.half_life_s <= 0:
             return 0.0
         return 0.5 ** (dt / self.half_life_s)
 
     def get_bonus(self, doc_id: str, now: float | None = None) -> float:
-        now = time.time() if now is None else now
-        if self.backend == "sqlite" and self._sqlite is not None:
-            rec = self._sqlite.get_pheromones([doc_id]).get(
-                doc_id,
-                {"value": 0.0, "t": now, "exposures": 0.0},
-            )
+        with self._lock:
+            now = time.time() if now is None else now
+            if self.backend == "sqlite" and self._sqlite is not None:
+                rec = self._sqlite.get_pheromones([doc_id]).get(
+                    doc_id,
+                    {"value": 0.0, "t": now, "exposures": 0.0},
+                )
+                value = float(rec.get("value", 0.0))
+                t = float(rec.get("t", now))
+                exposures = float(rec.get("exposures", 0.0))
+                value *= self._decay_factor(now - t)
+                value *= max(0.0, 1.0 - self.exposure_penalty * exposures)
+                self._sqlite.upsert_pheromone(doc_id, value, timestamp=now, add_exposure=0.0)
+                return value
+
+            if doc_id not in self.data:
+                return 0.0
+            rec = self.data[doc_id]
             value = float(rec.get("value", 0.0))
             t = float(rec.get("t", now))
             exposures = float(rec.get("exposures", 0.0))
             value *= self._decay_factor(now - t)
             value *= max(0.0, 1.0 - self.exposure_penalty * exposures)
-            self._sqlite.upsert_pheromone(doc_id, value, timestamp=now, add_exposure=0.0)
+            rec["value"] = value
+            rec["t"] = now
+            self.data[doc_id] = rec
+            self._save()
             return value
 
-        if doc_id not in self.data:
-            return 0.0
-        rec = self.data[doc_id]
-        value = float(rec.get("value", 0.0))
-        t = float(rec.get("t", now))
-        exposures = float(rec.get("exposures", 0.0))
-        value *= self._decay_factor(now - t)
-        value *= max(0.0, 1.0 - self.exposure_penalty * exposures)
-        rec["value"] = value
-        rec["t"] = now
-        self.data[doc_id] = rec
-        self._save()
-        return value
-
     def bulk_bonus(self, ids: list[str]) -> list[float]:
-        now = time.time()
-        if self.backend == "sqlite" and self._sqlite is not None:
-            recs = self._sqlite.get_pheromones(ids)
-            bonuses: list[float] = []
-            for doc_id in ids:
-                rec = recs.get(doc_id, {"value": 0.0, "t": now, "exposures": 0.0})
-                value = float(rec.get("value", 0.0))
-                t = float(rec.get("t", now))
-                exposures = float(rec.get("exposures", 0.0))
-                value *= self._decay_factor(now - t)
-                value *= max(0.0, 1.0 - self.exposure_penalty * exposures)
-                self._sqlite.upsert_pheromone(doc_id, value, timestamp=now, add_exposure=0.0)
-                bonuses.append(value)
-            return bonuses
-        return [self.get_bonus(i, now=now) for i in ids]
+        with self._lock:
+            now = time.time()
+            if self.backend == "sqlite" and self._sqlite is not None:
+                recs = self._sqlite.get_pheromones(ids)
+                bonuses: list[float] = []
+                for doc_id in ids:
+                    rec = recs.get(doc_id, {"value": 0.0, "t": now, "exposures": 0.0})
+                    value = float(rec.get("value", 0.0))
+                    t = float(rec.get("t", now))
+                    exposures = float(rec.get("exposures", 0.0))
+                    value *= self._decay_factor(now - t)
+                    value *= max(0.0, 1.0 - self.exposure_penalty * exposures)
+                    self._sqlite.upsert_pheromone(doc_id, value, timestamp=now, add_exposure=0.0)
+                    bonuses.append(value)
+                return bonuses
+            return [self.get_bonus(i, now=now) for i in ids]
 
     def reinforce(self, ids: list[str], reward: float) -> None:
-        now = time.time()
-        for doc_id in ids:
-            if self.backend == "sqlite" and self._sqlite is not None:
-                rec = self._sqlite.get_pheromones([doc_id]).get(
-                    doc_id,
-                    {"value": 0.0, "t": now, "exposures": 0.0},
-                )
-                value = float(rec.get("value", 0.0))
-                t = float(rec.get("t", now))
-                value = value * self._decay_factor(now - t) + float(reward)
-                self._sqlite.upsert_pheromone(doc_id, value, timestamp=now, add_exposure=0.0)
-            else:
-                rec = self.data.get(doc_id, {"value": 0.0, "t": now, "exposures": 0.0})
-                rec["value"] = float(rec["value"]) * self._decay_factor(now - float(rec["t"]))
-                rec["value"] += float(reward)
-                rec["t"] = now
-                self.data[doc_id] = rec
-        if self.backend == "json":
-            self._save()
+        with self._lock:
+            now = time.time()
+            for doc_id in ids:
+                if self.backend == "sqlite" and self._sqlite is not None:
+                    rec = self._sqlite.get_pheromones([doc_id]).get(
+                        doc_id,
+                        {"value": 0.0, "t": now, "exposures": 0.0},
+                    )
+                    value = float(rec.get("value", 0.0))
+                    t = float(rec.get("t", now))
+                    value = value * self._decay_factor(now - t) + float(reward)
+                    self._sqlite.upsert_pheromone(doc_id, value, timestamp=now, add_exposure=0.0)
+                else:
+                    rec = self.data.get(doc_id, {"value": 0.0, "t": now, "exposures": 0.0})
+                    rec["value"] = float(rec["value"]) * self._decay_factor(now - float(rec["t"]))
+                    rec["value"] += float(reward)
+                    rec["t"] = now
+                    self.data[doc_id] = rec
+            if self.backend == "json":
+                self._save()
 
     def record_exposure(self, ids: list[str]) -> None:
-        for doc_id in ids:
+        with self._lock:
             if self.backend == "sqlite" and self._sqlite is not None:
-                self._sqlite.increment_exposures([doc_id], step=1.0)
-            else:
+                # One transaction; a repeated id is counted once per occurrence.
+                self._sqlite.increment_exposures(list(ids), step=1.0)
+                return
+            for doc_id in ids:
                 rec = self.data.get(doc_id, {"value": 0.0, "t": time.time(), "exposures": 0.0})
                 rec["exposures"] = float(rec.get("exposures", 0.0)) + 1.0
                 self.data[doc_id] = rec
-        if self.backend == "json":
-            self._save()
+            if self.backend == "json":
+                self._save()
 
     def purge_older_than(self, retention_seconds: float) -> None:
-        if retention_seconds <= 0:
-            return
-        if self.backend == "sqlite" and self._sqlite is not None:
-            self._sqlite.purge_older_than(retention_seconds)
-            return
-        cutoff = time.time() - retention_seconds
-        stale_keys = [
-            doc_id
-            for doc_id, rec in self.data.items()
-            if float(rec.get("t", 0.0)) < cutoff
-        ]
-        for key in stale_keys:
-            self.data.pop(key, None)
-        if self.backend == "json":
-            self._save()
+        with self._lock:
+            if retention_seconds <= 0:
+                return
+            if self.backend == "sqlite" and self._sqlite is not None:
+                self._sqlite.purge_older_than(retention_seconds)
+                return
+            cutoff = time.time() - retention_seconds
+            stale_keys = [
+                doc_id
+                for doc_id, rec in self.data.items()
+                if float(rec.get("t", 0.0)) < cutoff
+            ]
+            for key in stale_keys:
+                self.data.pop(key, None)
+            if self.backend == "json":
+                self._save()
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import itertools
 import random
+import threading
+import time
+from collections.abc import Collection, Mapping, Sequence
+from contextlib import suppress
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -8,16 +14,47 @@ import numpy as np
 
 from . import gating
 from .config import Settings
-from .cr.index import CRIndex, load_cr_index
+from .cr.corpus import CorpusUnavailableError, matches_filters
+from .cr.index import CRIndex
+from .cr.registry import CRIndexManager, get_cr_index_manager
 from .cr.search import hierarchical_candidates
-from .encoder import create_encoder
+from .deadline import (
+    FORCE_CASCADE_BELOW,
+    SHRINK_CANDIDATES_BELOW,
+    SKIP_CR_BELOW,
+    TRUNCATE_MMR_BELOW,
+    Deadline,
+)
+from .encoder import HashingEncoder, acquire_encoder, release_encoder
 from .narrative import NarrativeTracker
 from .pheromone import PheromoneStore
-from .similarity import batched_cosine_sims, embed_corpus, safe_normalize
+from .similarity import (
+    batched_cosine_sims,
+    collapse_near_duplicates,
+    embed_corpus,
+    safe_normalize,
+)
+from .storage.feedback_store import FeedbackStore
 from .storage.sqlite_state import SQLiteState
-from .types import Document, ScoredDocument
+from .types import RESULT_FIELDS, Document, ScoredDocument
 import os
 
+# Candidates fetched per requested slot when corpus-mode filters may drop some.
+_FILTER_OVERFETCH = 4
+
+# Rough per-namespace footprint used by memory-budgeted eviction: object/settings
+# overhead, one JSON pheromone record (key + three-float dict), and SQLite's
+# default page cache per open connection.
+_RERANKER_BASE_BYTES = 64 * 1024
+_PHEROMONE_ENTRY_BYTES = 400
+_SQLITE_CONNECTION_BYTES = 2 * 1024 * 1024
+
+# Results per request whose exposure is recorded (feeds the pheromone penalty).
+_EXPOSED_TOP_K = 10
+
+# Process-wide so an evicted-and-reloaded namespace never reuses an old epoch.
+_STATE_EPOCHS = itertools.count(1)
+
 
 def _safe_float(value: Any, default: float) -> float:
     if value is None:
@@ -47,6 +84,26 @@ def _safe_int(value: Any, default: int) -> int:
     return int(default)
 
 
+@dataclass
+class ScoreJob:
+    """Arguments of one :meth:`Reranker.score` call, for :meth:`Reranker.score_many`.
+
+    ``query_embedding`` may be left ``None`` to have ``query_text`` encoded with
+    the rest of the batch.
+    """
+
+    docs: list[Document]
+    query_embedding: np.ndarray | None = None
+    query_text: str | None = None
+    mmr_lambda: float | None = None
+    overrides: dict[str, object] | None = None
+    debug: dict[str, object] | None = None
+    use_cr: bool | None = None
+    remember_top_k: int | None = None
+    fields: Collection[str] | None = None
+    deadline: Deadline | None = None
+
+
 class Reranker:
     def __init__(self, settings: Settings | None = None):
         self.settings = settings or Settings()
@@ -56,12 +113,24 @@ class Reranker:
                 np.random.seed(int(self.settings.deterministic_seed))
             except Exception:  # pragma: no cover
                 pass
-        self.encoder = create_encoder(
+        # Shared with every other Reranker using the same backend/model/dim, so a
+        # new namespace costs its own state rather than another model load.
+        self._shared_encoder = acquire_encoder(
             self.settings.embedding_backend,
             dim=self.settings.narrative_dim,
             model=self.settings.embedding_model,
+            cache_dir=self.settings.embedding_cache_dir,
+            cache_shard_bytes=int(self.settings.embedding_cache_shard_mb) * 1024 * 1024,
         )
-        self._cr_index: CRIndex | None = None
+        self.encoder = self._shared_encoder
+        # Changes whenever feedback alters narrative/pheromone state; response
+        # caches key on it. Exposure recording deliberately does not bump it.
+        self.state_epoch = next(_STATE_EPOCHS)
+        self._closed = False
+        self._close_pending = False
+        self._leases: list[None] = []
+        self._teardown_claim = threading.Lock()
+        self._cheap_encoder: HashingEncoder | None = None
         storage_backend = (self.settings.storage_backend or "sqlite").lower()
         if not self.settings.storage_persistence_enabled:
             storage_backend = "memory"
@@ -97,42 +166,115 @@ class Reranker:
         if retention_seconds:
             self.narr.purge_if_stale(retention_seconds)
             self.pher.purge_older_than(retention_seconds)
+        # Embeddings of recently served results, looked up by /feedback.
+        max_mb = self.settings.feedback_cache_max_mb
+        self.feedback_store = FeedbackStore.sized(
+            self.settings.narrative_dim,
+            self.settings.feedback_cache_size,
+            int(max_mb * 1024 * 1024) if max_mb is not None else None,
+            ttl_s=self.settings.feedback_ttl_s,
+        )
 
-    def _ensure_cr_loaded(self) -> CRIndex | None:
-        if not self.settings.cr.on:
+    def estimated_bytes(self) -> int:
+        """Approximate memory held by this namespace (the shared encoder is excluded)."""
+        total = _RERANKER_BASE_BYTES + int(self.narr.v.nbytes)
+        total += len(self.pher.data) * _PHEROMONE_ENTRY_BYTES
+        total += self.feedback_store.nbytes
+        if self._sqlite_state is not None:
+            total += _SQLITE_CONNECTION_BYTES
+        return total
+
+    def acquire_lease(self) -> bool:
+        """Mark the reranker in use so :meth:`close` waits for :meth:`release_lease`.
+
+        Returns ``False`` (without leasing) once a close has been requested.
+        """
+        # Lock-free: list append/pop and attribute reads are atomic, and every path
+        # that could see "close requested and no leases" races for _teardown_claim.
+        self._leases.append(None)
+        if self._close_pending:
+            self.release_lease()
+            return False
+        return True
+
+    def release_lease(self) -> None:
+        with suppress(IndexError):
+            self._leases.pop()
+        if self._close_pending and not self._leases:
+            self._teardown_once()
+
+    def close(self) -> None:
+        """Flush state and release resources (idempotent).
+
+        While leases are outstanding the teardown is deferred to the last
+        :meth:`release_lease`, so an evicted namespace finishes in-flight requests.
+        """
+        self._close_pending = True
+        if not self._leases:
+            self._teardown_once()
+
+    def _teardown_once(self) -> None:
+        if not self._teardown_claim.acquire(blocking=False):
+            return
+        self._closed = True
+        self._teardown()
+
+    def _teardown(self) -> None:
+        self.narr.flush()
+        self.pher.flush()
+        if self._sqlite_state is not None:
+            self._sqlite_state.close()
+        release_encoder(self._shared_encoder)
+
+    def cr_manager(self) -> CRIndexManager:
+        return get_cr_index_manager(
+            self.settings.cr.index_npz_path,
+            self.settings.cr.index_meta_path,
+            check_interval_s=self.settings.cr.reload_check_interval_s,
+            corpus_dir=self.settings.cr.corpus_dir,
+        )
+
+    def _ensure_cr_loaded(self, use_cr: bool | None = None) -> CRIndex | None:
+        if not (self.settings.cr.on if use_cr is None else use_cr):
             return None
-        if self._cr_index is None:
-            try:
-                self._cr_index = load_cr_index(
-                    self.settings.cr.index_npz_path,
-                    self.settings.cr.index_meta_path,
-                )
-            except FileNotFoundError:
-                self._cr_index = None
-        return self._cr_index
+        # Shared across namespaces and hot-reloaded; callers keep the returned
+        # object for the whole request so a swap never changes it mid-score.
+        return self.cr_manager().get()
 
-    def _ensure_embeddings(self, docs: list[Document]) -> np.ndarray:
+    def _ensure_embeddings(
+        self,
+        docs: list[Document],
+        *,
+        text_memo: dict[str, np.ndarray] | None = None,
+    ) -> np.ndarray:
         # Expect embeddings to be provided; otherwise fallback to simple bag-of-words hashing.
         # In production you would plug a real embedding model here.
         if len(docs) == 0:
             return np.zeros((0, self.settings.narrative_dim), dtype=np.float32)
         embeddings: list[np.ndarray | None] = []
-        missing_texts: list[str] = []
-        missing_indices: list[int] = []
+        # Identical texts (duplicate chunks under different ids) are encoded once and
+        # scattered back; ``text_memo`` extends that across the items of a batch call.
+        unique_texts: dict[str, list[int]] = {}
 
         for idx, doc in enumerate(docs):
             if doc.embedding:
                 embeddings.append(np.asarray(doc.embedding, dtype=np.float32))
+            elif text_memo is not None and doc.text in text_memo:
+                embeddings.append(text_memo[doc.text])
             else:
                 embeddings.append(None)
-                missing_texts.append(doc.text)
-                missing_indices.append(idx)
+                unique_texts.setdefault(doc.text, []).append(idx)
 
-        if missing_texts:
+        if unique_texts:
+            missing_texts = list(unique_texts)
             encoded = self.encoder.encode_batch(missing_texts)
             encoded = np.atleast_2d(np.asarray(encoded, dtype=np.float32))
-            for offset, vec in zip(missing_indices, encoded, strict=False):
-                embeddings[offset] = np.asarray(vec, dtype=np.float32)
+            for text, vec in zip(missing_texts, encoded, strict=False):
+                vec = np.asarray(vec, dtype=np.float32)
+                if text_memo is not None:
+                    text_memo[text] = vec
+                for offset in unique_texts[text]:
+                    embeddings[offset] = vec
 
         target_dim = self.settings.narrative_dim
         adjusted: list[np.ndarray] = []
@@ -151,10 +293,66 @@ class Reranker:
         mat = np.stack(adjusted, axis=0)
         return safe_normalize(mat)
 
+    def _cascade_active(self, overrides: dict[str, object], query_text: str | None) -> bool:
+        flag = overrides.get("cascade")
+        enabled = flag if isinstance(flag, bool) else self.settings.cascade_enabled
+        if not enabled or not query_text:
+            return False
+        # Nothing to save when the configured encoder already is the hashing encoder.
+        identity = str(getattr(self.encoder, "identity", ""))
+        return not (isinstance(self.encoder, HashingEncoder) or identity.startswith("hash:"))
+
+    def _prefilter_similarities(
+        self,
+        q: np.ndarray,
+        docs: list[Document],
+        query_text: str,
+        *,
+        text_memo: dict[str, np.ndarray] | None = None,
+    ) -> np.ndarray:
+        """Cheap first-stage similarities used to gate the cascade.
+
+        Documents carrying their own embedding are compared against the real query
+        vector; everything else uses the hashing encoder on both sides.
+        """
+        sims = np.zeros((len(docs),), dtype=np.float32)
+        provided = [i for i, doc in enumerate(docs) if doc.embedding]
+        hashed = [i for i, doc in enumerate(docs) if not doc.embedding]
+        if provided:
+            provided_embeddings = self._ensure_embeddings(
+                [docs[i] for i in provided], text_memo=text_memo
+            )
+            sims[provided] = batched_cosine_sims(q, provided_embeddings)
+        if hashed:
+            if self._cheap_encoder is None:
+                self._cheap_encoder = HashingEncoder(dim=self.settings.narrative_dim)
+            unique = list(dict.fromkeys(docs[i].text for i in hashed))
+            row_of = {text: row for row, text in enumerate(unique)}
+            cheap = self._cheap_encoder.encode_batch(unique)
+            cheap_q = self._cheap_encoder.encode(query_text)
+            cheap_sims = batched_cosine_sims(cheap_q, cheap)
+            sims[hashed] = cheap_sims[[row_of[docs[i].text] for i in hashed]]
+        return sims
+
+    def _fit_query(self, query_embedding: np.ndarray) -> np.ndarray:
+        q = query_embedding.astype(np.float32).reshape(-1)
+        target_dim = self.settings.narrative_dim
+        if q.size != target_dim:
+            # resize query vector via simple pad/truncate for compatibility
+            q = q[:target_dim] if q.size > target_dim else np.pad(q, (0, target_dim - q.size))
+        return q
+
     def encode_query(self, query: str) -> np.ndarray:
         vec = self.encoder.encode(query)
         return safe_normalize(np.asarray(vec, dtype=np.float32).reshape(1, -1)).reshape(-1)
 
+    def encode_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Like :meth:`encode_query` for several queries, in one encoder call."""
+        if not queries:
+            return np.zeros((0, self.settings.narrative_dim), dtype=np.float32)
+        encoded = self.encoder.encode_batch(list(queries))
+        return safe_normalize(np.atleast_2d(np.asarray(encoded, dtype=np.float32)))
+
     def score(
         self,
         query_embedding: np.ndarray,
@@ -164,7 +362,26 @@ class Reranker:
         query_text: str | None = None,
         overrides: dict[str, object] | None = None,
         debug: dict[str, object] | None = None,
+        text_memo: dict[str, np.ndarray] | None = None,
+        use_cr: bool | None = None,
+        remember_top_k: int | None = None,
+        fields: Collection[str] | None = None,
+        deadline: Deadline | None = None,
+        pheromone_bonus: Mapping[str, float] | None = None,
+        record_exposure: bool = True,
+        dense_pass: tuple[np.ndarray, np.ndarray] | None = None,
     ) -> list[ScoredDocument]:
+        """Score and order ``docs`` for the query.
+
+        With a ``deadline``, stages are checked against the remaining budget as
+        they start and fall back to cheaper variants in a fixed order (cascade
+        mode, no CR, fewer candidates, base-score order instead of MMR);
+        the applied degradations are reported under ``debug["deadline"]``.
+        ``pheromone_bonus`` (covering every id in ``docs``) and
+        ``record_exposure=False`` let :meth:`score_many` do that I/O once per batch;
+        ``dense_pass`` is the ``(doc_embeddings, similarities)`` pair it computed
+        for ``docs``, used unless cascade mode runs.
+        """
         if len(docs) == 0:
             if debug is not None:
                 debug["gating"] = {
@@ -177,16 +394,41 @@ class Reranker:
                 }
             return []
 
+        overrides = overrides or {}
         doc_texts = [d.text for d in docs]
-        doc_embeddings = self._ensure_embeddings(docs)
-        q = query_embedding.astype(np.float32).reshape(-1)
-        if q.size != doc_embeddings.shape[1]:
-            # resize query vector via simple pad/truncate for compatibility
-            target_dim = doc_embeddings.shape[1]
-            q = q[:target_dim] if q.size > target_dim else np.pad(q, (0, target_dim - q.size))
+        q = self._fit_query(query_embedding)
+
+        # Cascade mode gates on cheap hashing similarities and only runs the model
+        # encoder on the survivors; otherwise every document is encoded up front.
+        cascade = self._cascade_active(overrides, query_text)
+        if (
+            not cascade
+            and deadline is not None
+            and any(not doc.embedding for doc in docs)
+            and self._cascade_active({"cascade": True}, query_text)
+            and deadline.degrade("force_cascade", FORCE_CASCADE_BELOW)
+        ):
+            cascade = True
+        doc_embeddings: np.ndarray | None = None
+        if cascade:
+            prefilter_start = time.perf_counter()
+            dense = self._prefilter_similarities(q, docs, str(query_text), text_memo=text_memo)
+            prefilter_s = time.perf_counter() - prefilter_start
+        elif dense_pass is not None:
+            doc_embeddings, dense = dense_pass
+        else:
+            doc_embeddings = self._ensure_embeddings(docs, text_memo=text_memo)
+            dense = batched_cosine_sims(q, doc_embeddings)
 
         candidates = list(range(len(docs)))
-        cr = self._ensure_cr_loaded()
+        cr = self._ensure_cr_loaded(use_cr)
+        if (
+            cr is not None
+            and query_text
+            and deadline is not None
+            and deadline.degrade("skip_cr", SKIP_CR_BELOW)
+        ):
+            cr = None
         if cr is not None and query_text:
             dim0 = int(cr.meta.d0)
             doc_embeddings_q0 = embed_corpus(doc_texts, dim=dim0)
@@ -205,9 +447,6 @@ class Reranker:
         if not candidates:
             return []
 
-        dense = batched_cosine_sims(q, doc_embeddings)
-
-        overrides = overrides or {}
         mode_override = overrides.get("gating_mode")
         mode = mode_override if isinstance(mode_override, str) else self.settings.gating_mode
         threshold = _safe_float(
@@ -247,6 +486,16 @@ class Reranker:
             candidate_indices = candidate_indices[gating_positions]
             sims_for_gate = sims_for_gate[gating_positions]
 
+        shrink_to = max(1, min_c)
+        if (
+            deadline is not None
+            and candidate_indices.size > shrink_to
+            and deadline.degrade("shrink_candidates", SHRINK_CANDIDATES_BELOW)
+        ):
+            shrink_positions = gating.top_indices_by_similarity(sims_for_gate, shrink_to)
+            candidate_indices = candidate_indices[shrink_positions]
+            sims_for_gate = sims_for_gate[shrink_positions]
+
         effective_candidate_count = int(candidate_indices.size)
 
         debug_gating = {
@@ -266,12 +515,34 @@ class Reranker:
             return []
 
         docs_subset = [docs[i] for i in candidate_indices]
-        doc_embeddings_subset = doc_embeddings[candidate_indices]
-        dense_subset = dense[candidate_indices]
+        if doc_embeddings is not None:
+            doc_embeddings_subset = doc_embeddings[candidate_indices]
+            dense_subset = dense[candidate_indices]
+        else:
+            encode_start = time.perf_counter()
+            doc_embeddings_subset = self._ensure_embeddings(docs_subset, text_memo=text_memo)
+            dense_subset = batched_cosine_sims(q, doc_embeddings_subset)
+            encode_s = time.perf_counter() - encode_start
+            if debug is not None:
+                skipped = len(docs) - effective_candidate_count
+                debug["cascade"] = {
+                    "survivors": effective_candidate_count,
+                    "total": len(docs),
+                    "survivor_fraction": effective_candidate_count / len(docs),
+                    "prefilter_ms": prefilter_s * 1000.0,
+                    "encode_ms": encode_s * 1000.0,
+                    # Extrapolates the per-survivor encode cost to the skipped documents.
+                    "estimated_saved_ms": encode_s * 1000.0 * skipped / effective_candidate_count,
+                }
 
         narr = self.narr.coherence(doc_embeddings_subset)
+        candidate_ids = [docs[i].id for i in candidate_indices]
         pher = np.array(
-            self.pher.bulk_bonus([docs[i].id for i in candidate_indices]),
+            (
+                [pheromone_bonus[doc_id] for doc_id in candidate_ids]
+                if pheromone_bonus is not None
+                else self.pher.bulk_bonus(candidate_ids)
+            ),
             dtype=np.float32,
         )
 
@@ -281,9 +552,26 @@ class Reranker:
             + self.settings.weight_pheromone * pher
         )
 
+        # Optional near-duplicate collapse: keep the best-scoring member of each group
+        # so MMR only iterates over distinct candidates.
+        dup_threshold = overrides.get(
+            "near_duplicate_threshold", self.settings.near_duplicate_threshold
+        )
+        collapsed: dict[int, list[int]] = {}
+        remaining_positions = set(range(effective_candidate_count))
+        if dup_threshold is not None:
+            keep, collapsed = collapse_near_duplicates(
+                doc_embeddings_subset, base, threshold=_safe_float(dup_threshold, 1.0)
+            )
+            remaining_positions = set(keep.tolist())
+            if debug is not None:
+                debug["near_duplicates"] = {
+                    "threshold": _safe_float(dup_threshold, 1.0),
+                    "collapsed_count": int(effective_candidate_count - keep.size),
+                }
+
         # MMR diversity — greedy re-ranking
         mmr_selected_positions: list[int] = []
-        remaining_positions = set(range(effective_candidate_count))
 
         # ε-greedy exploration: occasionally pick a random item
         override = os.getenv("NEURALCACHE_EPSILON")
@@ -311,6 +599,11 @@ class Reranker:
 
         order_positions: list[int] = []
         while remaining_positions:
+            if deadline is not None and deadline.degrade("truncate_mmr", TRUNCATE_MMR_BELOW):
+                order_positions.extend(
+                    sorted(remaining_positions, key=lambda pos: (-float(base[pos]), pos))
+                )
+                break
             if random.random() < epsilon:
                 pick = random.choice(list(remaining_positions))
             else:
@@ -319,30 +612,240 @@ class Reranker:
             mmr_selected_positions.append(pick)
             remaining_positions.remove(pick)
 
+        # Attributes outside the requested projection are left empty rather than
+        # copied (and re-validated) into every result.
+        want = RESULT_FIELDS if fields is None else frozenset(fields)
         scored = [
             ScoredDocument(
                 id=docs_subset[pos].id,
-                text=docs_subset[pos].text,
-                metadata=docs_subset[pos].metadata,
-                embedding=docs_subset[pos].embedding,
+                text=docs_subset[pos].text if "text" in want else "",
+                metadata=docs_subset[pos].metadata if "metadata" in want else {},
+                embedding=docs_subset[pos].embedding if "embedding" in want else None,
                 score=float(base[pos]),
-                components={
-                    "dense": float(dense_subset[pos]),
-                    "narrative": float(narr[pos]),
-                    "pheromone": float(pher[pos]),
-                },
+                components=(
+                    {
+                        "dense": float(dense_subset[pos]),
+                        "narrative": float(narr[pos]),
+                        "pheromone": float(pher[pos]),
+                    }
+                    if "components" in want
+                    else {}
+                ),
+                collapsed_ids=(
+                    [docs_subset[dup].id for dup in collapsed[pos]] if pos in collapsed else None
+                ),
             )
             for pos in order_positions
         ]
         if debug is not None:
             debug["epsilon_used"] = float(epsilon)
             debug["mmr_lambda_used"] = float(mmr_lam)
+            if deadline is not None:
+                debug["deadline"] = deadline.debug()
 
         # Record exposure for top-K
-        self.pher.record_exposure([sd.id for sd in scored[: min(len(scored), 10)]])
+        if record_exposure:
+            self.pher.record_exposure([sd.id for sd in scored[:_EXPOSED_TOP_K]])
+        if remember_top_k:
+            served = order_positions[:remember_top_k]
+            self.feedback_store.remember(
+                [docs_subset[pos].id for pos in served], doc_embeddings_subset[served]
+            )
 
         return scored
 
+    def score_many(
+        self, jobs: Sequence[ScoreJob], *, return_exceptions: bool = False
+    ) -> list[list[ScoredDocument] | Exception]:
+        """Score independent requests together, sharing the per-call overhead.
+
+        Queries without an embedding are encoded in one encoder call and
+        pheromone bonuses are read once for the union of document ids. Jobs not
+        in cascade mode share one dense pass (see :meth:`_stacked_dense_pass`),
+        and exposures are written in one transaction. Each job is otherwise
+        scored exactly as :meth:`score` would score it alone.
+
+        With ``return_exceptions``, a job that fails has its exception in place of
+        its results and the others are unaffected; a failing shared step is left
+        to each job to redo, so only the jobs it actually breaks fail.
+        """
+        if not jobs:
+            return []
+        queries: list[np.ndarray | None] = [job.query_embedding for job in jobs]
+        pending = [i for i, job in enumerate(jobs) if job.query_embedding is None]
+        with suppress(Exception):
+            encoded = self.encode_queries([jobs[i].query_text or "" for i in pending])
+            for i, query in zip(pending, encoded, strict=True):
+                queries[i] = query
+        text_memo: dict[str, np.ndarray] = {}
+        # Cascade jobs encode only their gated survivors, inside score().
+        dense_jobs = {
+            i: query
+            for i, (job, query) in enumerate(zip(jobs, queries, strict=True))
+            if query is not None and not self._cascade_active(job.overrides or {}, job.query_text)
+        }
+        dense_passes: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        with suppress(Exception):
+            stacked = self._stacked_dense_pass(
+                [jobs[i].docs for i in dense_jobs], list(dense_jobs.values()), text_memo=text_memo
+            )
+            dense_passes = dict(zip(dense_jobs, stacked, strict=True))
+        bonus: dict[str, float] | None = None
+        ids = list(dict.fromkeys(doc.id for job in jobs for doc in job.docs))
+        with suppress(Exception):
+            bonus = dict(zip(ids, self.pher.bulk_bonus(ids), strict=True)) if ids else {}
+
+        results: list[list[ScoredDocument] | Exception] = []
+        exposed: list[str] = []
+        for i, job in enumerate(jobs):
+            try:
+                query = queries[i]
+                if query is None:
+                    query = self.encode_query(job.query_text or "")
+                scored = self.score(
+                    query,
+                    job.docs,
+                    job.mmr_lambda,
+                    query_text=job.query_text,
+                    overrides=job.overrides,
+                    debug=job.debug,
+                    text_memo=text_memo,
+                    use_cr=job.use_cr,
+                    remember_top_k=job.remember_top_k,
+                    fields=job.fields,
+                    deadline=job.deadline,
+                    pheromone_bonus=bonus,
+                    record_exposure=False,
+                    dense_pass=dense_passes.get(i),
+                )
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                results.append(exc)
+                continue
+            results.append(scored)
+            exposed.extend(sd.id for sd in scored[:_EXPOSED_TOP_K])
+        if exposed:
+            self.pher.record_exposure(exposed)
+        return results
+
+    def _stacked_dense_pass(
+        self,
+        doc_lists: Sequence[list[Document]],
+        queries: Sequence[np.ndarray],
+        *,
+        text_memo: dict[str, np.ndarray] | None = None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Per-list ``(doc_embeddings, similarities)`` from a single ``Q @ D.T``.
+
+        Documents without an embedding share one column per distinct text across
+        all lists; each list's similarities are its query's row gathered at its
+        own columns.
+        """
+        columns_of_text: dict[str, int] = {}
+        union: list[Document] = []
+        columns: list[np.ndarray] = []
+        for docs in doc_lists:
+            cols: list[int] = []
+            for doc in docs:
+                col = None if doc.embedding else columns_of_text.get(doc.text)
+                if col is None:
+                    col = len(union)
+                    union.append(doc)
+                    if not doc.embedding:
+                        columns_of_text[doc.text] = col
+                cols.append(col)
+            columns.append(np.asarray(cols, dtype=int))
+        if not union:
+            return [
+                (
+                    np.zeros((0, self.settings.narrative_dim), dtype=np.float32),
+                    np.zeros(0, dtype=np.float32),
+                )
+                for _ in doc_lists
+            ]
+        embeddings = self._ensure_embeddings(union, text_memo=text_memo)
+        q = safe_normalize(np.stack([self._fit_query(query) for query in queries]))
+        sims = q @ embeddings.T
+        return [(embeddings[cols], sims[row, cols]) for row, cols in enumerate(columns)]
+
+    def score_corpus(
+        self,
+        query_embedding: np.ndarray,
+        query_text: str,
+        mmr_lambda: float | None = None,
+        *,
+        filters: dict[str, Any] | None = None,
+        overrides: dict[str, object] | None = None,
+        debug: dict[str, object] | None = None,
+        text_memo: dict[str, np.ndarray] | None = None,
+        remember_top_k: int | None = None,
+        fields: Collection[str] | None = None,
+        deadline: Deadline | None = None,
+    ) -> list[ScoredDocument]:
+        """Retrieve candidates from the served corpus store, then score them as usual.
+
+        The CR index picks up to ``cr.max_candidates`` documents for the query;
+        metadata ``filters`` are applied to that candidate set (which is
+        over-fetched to compensate). Raises :class:`CorpusUnavailableError` when
+        no index with a corpus store is being served.
+        """
+        loaded = self.cr_manager().get_loaded()
+        if loaded is None or loaded.corpus is None:
+            raise CorpusUnavailableError("No CR index with a corpus store is loaded")
+        cr, corpus = loaded.index, loaded.corpus
+        if corpus.dim != int(cr.meta.d0):
+            raise CorpusUnavailableError(
+                f"Corpus store dim {corpus.dim} does not match CR index d0 {cr.meta.d0}"
+            )
+        max_candidates = int(self.settings.cr.max_candidates)
+        fetch = max_candidates * _FILTER_OVERFETCH if filters else max_candidates
+        q0 = embed_corpus([query_text], dim=corpus.dim)[0]
+        # Codes-only ranking leaves the memory-mapped float q0 store untouched.
+        codes_only = (
+            not self.settings.cr.pq_exact_rescore
+            and cr.pq_codes is not None
+            and cr.coarse_means is not None
+        )
+        rows = hierarchical_candidates(
+            q0_query=q0,
+            doc_embeddings_q0=None if codes_only else corpus.q0,
+            cr=cr,
+            top_coarse=self.settings.cr.top_coarse,
+            top_topics_per_coarse=self.settings.cr.top_topics_per_coarse,
+            max_candidates=fetch,
+            pq_rescore_factor=self.settings.cr.pq_rescore_factor or None,
+            stored_means=True,
+            # Documents added to the index after the store was written have no row there.
+            max_doc_id=len(corpus),
+        )
+        retrieved = len(rows)
+        if filters:
+            rows = [row for row in rows if matches_filters(corpus.metadata(row), filters)]
+            rows = rows[:max_candidates]
+        identity = str(getattr(self.encoder, "identity", ""))
+        if debug is not None:
+            debug["corpus"] = {
+                "index_version": loaded.version,
+                "retrieved": retrieved,
+                "after_filters": len(rows),
+                "stored_embeddings": corpus.has_embeddings_for(identity),
+                "pq_codes_only": codes_only,
+            }
+        return self.score(
+            query_embedding,
+            corpus.documents(rows, encoder_identity=identity),
+            mmr_lambda,
+            query_text=query_text,
+            overrides=overrides,
+            debug=debug,
+            text_memo=text_memo,
+            use_cr=False,
+            remember_top_k=remember_top_k,
+            fields=fields,
+            deadline=deadline,
+        )
+
     def update_feedback(
         self,
         selected_ids: list[str],
@@ -351,12 +854,20 @@ class Reranker:
         *,
         best_doc_embedding: list[float] | None = None,
         best_doc_text: str | None = None,
+        selected_embeddings: dict[str, np.ndarray] | None = None,
     ) -> None:
         # Update narrative and pheromones with feedback signal
+        self.state_epoch = next(_STATE_EPOCHS)
         self.pher.reinforce(selected_ids, reward=success)
         if not selected_ids and best_doc_embedding is None and not best_doc_text:
             return
 
+        if selected_embeddings:
+            rows = [selected_embeddings[sid] for sid in selected_ids if sid in selected_embeddings]
+            if rows:
+                self.narr.update(np.mean(rows, axis=0), success=success)
+                return
+
         selected_docs: list[Document] = []
         if doc_map:
             selected_docs = [doc_map[sid] for sid in selected_ids if sid in doc_map]
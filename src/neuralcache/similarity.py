@@ -25,5 +25,35 @@ def batched_cosine_sims(query: np.ndarray, docs: np.ndarray) -> np.ndarray:
     return (q @ docs_norm.T).reshape(-1)
 
 
+def collapse_near_duplicates(
+    embeddings: np.ndarray, scores: np.ndarray, threshold: float
+) -> tuple[np.ndarray, dict[int, list[int]]]:
+    """Greedily group rows whose cosine similarity is >= ``threshold``.
+
+    Rows are visited in descending ``scores`` order; each unassigned row becomes a
+    representative and absorbs every unassigned row similar to it. Returns the
+    representative positions (in visiting order) and a map from representative to
+    the positions it absorbed.
+    """
+    n = embeddings.shape[0]
+    if n == 0:
+        return np.empty(0, dtype=int), {}
+    normed = safe_normalize(embeddings)
+    sims = normed @ normed.T
+    owner = np.full(n, -1, dtype=int)
+    keep: list[int] = []
+    groups: dict[int, list[int]] = {}
+    for pos in np.argsort(-scores, kind="mergesort").tolist():
+        if owner[pos] >= 0:
+            continue
+        owner[pos] = pos
+        keep.append(pos)
+        dups = np.flatnonzero((sims[pos] >= threshold) & (owner < 0))
+        if dups.size:
+            owner[dups] = pos
+            groups[pos] = dups.tolist()
+    return np.asarray(keep, dtype=int), groups
+
+
 def embed_corpus(texts: list[str], dim: int = 384) -> np.ndarray:
     return encode_texts(texts, dim=dim)
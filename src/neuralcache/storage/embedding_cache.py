@@ -0,0 +1,305 @@
+"""Persistent on-disk cache for encoder outputs.
+
+Vectors are appended to fixed-width float32 shard files and located through an
+append-only index of ``text hash -> (shard, row)`` records. Shards are read via
+``np.memmap`` so any number of processes (uvicorn workers, restarted servers)
+can share one cache directory. Writes are serialised through an advisory file
+lock: the first process to acquire it becomes the single writer, everyone else
+opens the cache read-only and picks up new entries as the index grows.
+
+Each encoder identity (backend, model, dimension) gets its own sub-directory so
+vectors from different models can never be mixed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import IO, Any
+
+import numpy as np
+
+try:  # pragma: no cover - platform dependent
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+_RECORD = np.dtype([("key", "V16"), ("shard", "<u4"), ("row", "<u4")])
+_INDEX_NAME = "index.bin"
+_META_NAME = "meta.json"
+_LOCK_NAME = "writer.lock"
+
+
+def text_key(text: str) -> bytes:
+    """Return the 16-byte cache key for ``text``."""
+
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _shard_name(shard: int) -> str:
+    return f"shard-{shard:05d}.f32"
+
+
+def _truncate_to_multiple(path: Path, unit: int) -> None:
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return
+    if size % unit:
+        os.truncate(path, size - size % unit)
+
+
+class DiskEmbeddingCache:
+    """Append-only, memory-mapped embedding store keyed by text hash."""
+
+    def __init__(
+        self,
+        root: str | os.PathLike[str],
+        identity: str,
+        *,
+        shard_bytes: int = 64 * 1024 * 1024,
+        readonly: bool = False,
+    ) -> None:
+        self.identity = identity
+        digest = hashlib.sha1(identity.encode("utf-8"), usedforsecurity=False).hexdigest()
+        self.path = Path(root) / digest[:16]
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.shard_bytes = max(1, int(shard_bytes))
+        self._readonly = readonly
+        self._lock = threading.Lock()
+        self._index: dict[bytes, tuple[int, int]] = {}
+        self._index_pos = 0
+        self._maps: dict[int, np.memmap] = {}
+        self._dim: int | None = None
+        self._lock_handle: IO[bytes] | None = None
+        self._writer_checked = False
+        self.hits = 0
+        self.misses = 0
+        self._load_meta()
+
+    @property
+    def dim(self) -> int | None:
+        return self._dim
+
+    @property
+    def is_writer(self) -> bool:
+        return self._lock_handle is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh_index()
+            return len(self._index)
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": float(len(self._index)),
+            "hits": float(self.hits),
+            "misses": float(self.misses),
+            "hit_rate": float(self.hits / total) if total else 0.0,
+        }
+
+    # ------------------------------------------------------------------ reads
+    def get_many(self, keys: Sequence[bytes]) -> list[np.ndarray | None]:
+        """Return cached vectors (or ``None``) for each key."""
+
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                self._refresh_index()
+            out: list[np.ndarray | None] = []
+            for key in keys:
+                loc = self._index.get(key)
+                vec = None if loc is None else self._read(*loc)
+                if vec is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                out.append(vec)
+            return out
+
+    def _read(self, shard: int, row: int) -> np.ndarray | None:
+        if self._dim is None:
+            self._load_meta()
+            if self._dim is None:
+                return None
+        mapped = self._maps.get(shard)
+        if mapped is None or row >= mapped.shape[0]:
+            mapped = self._map_shard(shard)
+            if mapped is None or row >= mapped.shape[0]:
+                return None
+        return np.array(mapped[row], dtype=np.float32)
+
+    def _map_shard(self, shard: int) -> np.memmap | None:
+        assert self._dim is not None
+        shard_path = self.path / _shard_name(shard)
+        try:
+            rows = shard_path.stat().st_size // (self._dim * 4)
+        except FileNotFoundError:
+            return None
+        if rows == 0:
+            return None
+        mapped = np.memmap(shard_path, dtype=np.float32, mode="r", shape=(rows, self._dim))
+        self._maps[shard] = mapped
+        return mapped
+
+    def _refresh_index(self) -> None:
+        index_path = self.path / _INDEX_NAME
+        try:
+            size = index_path.stat().st_size
+        except FileNotFoundError:
+            return
+        complete = (size - self._index_pos) // _RECORD.itemsize
+        if complete <= 0:
+            return
+        with index_path.open("rb") as handle:
+            handle.seek(self._index_pos)
+            raw = handle.read(complete * _RECORD.itemsize)
+        records = np.frombuffer(raw, dtype=_RECORD)
+        for rec in records:
+            self._index[bytes(rec["key"])] = (int(rec["shard"]), int(rec["row"]))
+        self._index_pos += len(raw)
+
+    def _load_meta(self) -> None:
+        meta_path = self.path / _META_NAME
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return
+        if meta.get("identity") == self.identity and meta.get("dim"):
+            self._dim = int(meta["dim"])
+
+    # ----------------------------------------------------------------- writes
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> int:
+        """Append vectors for keys not already cached. Returns rows written.
+
+        Silently does nothing when this process is not the writer or when the
+        vector width does not match the cache's established dimension.
+        """
+
+        mat = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+        if mat.shape[0] != len(keys) or mat.shape[0] == 0 or mat.shape[1] == 0:
+            return 0
+        with self._lock:
+            if not self._acquire_writer():
+                return 0
+            self._refresh_index()
+            if self._dim is None:
+                self._dim = int(mat.shape[1])
+                meta = {"identity": self.identity, "dim": self._dim}
+                (self.path / _META_NAME).write_text(json.dumps(meta), encoding="utf-8")
+            if mat.shape[1] != self._dim:
+                return 0
+            fresh: dict[bytes, int] = {}
+            for pos, key in enumerate(keys):
+                if key not in self._index and key not in fresh:
+                    fresh[key] = pos
+            if not fresh:
+                return 0
+            return self._append(list(fresh), mat[list(fresh.values())])
+
+    def _append(self, keys: list[bytes], mat: np.ndarray) -> int:
+        assert self._dim is not None
+        row_bytes = self._dim * 4
+        rows_per_shard = max(1, self.shard_bytes // row_bytes)
+        shard = self._last_shard()
+        shard_path = self.path / _shard_name(shard)
+        rows = shard_path.stat().st_size // row_bytes if shard_path.exists() else 0
+        records = np.zeros(len(keys), dtype=_RECORD)
+        records["key"] = np.frombuffer(b"".join(keys), dtype="V16")
+        written = 0
+        while written < len(keys):
+            if rows >= rows_per_shard:
+                shard += 1
+                rows = 0
+                shard_path = self.path / _shard_name(shard)
+            take = min(len(keys) - written, rows_per_shard - rows)
+            with shard_path.open("ab") as handle:
+                handle.write(mat[written : written + take].tobytes())
+            records["shard"][written : written + take] = shard
+            records["row"][written : written + take] = np.arange(rows, rows + take)
+            rows += take
+            written += take
+        # Vectors are flushed before their index records so readers never see
+        # an index entry pointing past the end of a shard.
+        with (self.path / _INDEX_NAME).open("ab") as handle:
+            handle.write(records.tobytes())
+        self._refresh_index()
+        return written
+
+    def _last_shard(self) -> int:
+        shards = sorted(self.path.glob("shard-*.f32"))
+        if not shards:
+            return 0
+        return int(shards[-1].stem.split("-", 1)[1])
+
+    def _acquire_writer(self) -> bool:
+        if self._readonly:
+            return False
+        if self._writer_checked:
+            return self._lock_handle is not None
+        self._writer_checked = True
+        handle = (self.path / _LOCK_NAME).open("ab")
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+        self._lock_handle = handle
+        self._recover()
+        return True
+
+    def _recover(self) -> None:
+        # A writer that died mid-append can leave a partial vector at the end of
+        # a shard or a partial record at the end of the index. Appending after
+        # either would misalign every later row, so the new writer trims them.
+        # Readers only ever consume whole rows and records, so they are unaffected.
+        if self._dim is not None:
+            row_bytes = self._dim * 4
+            for shard_path in self.path.glob("shard-*.f32"):
+                _truncate_to_multiple(shard_path, row_bytes)
+        _truncate_to_multiple(self.path / _INDEX_NAME, _RECORD.itemsize)
+
+    def close(self) -> None:
+        with self._lock:
+            self._maps.clear()
+            if self._lock_handle is not None:
+                self._lock_handle.close()
+                self._lock_handle = None
+            self._writer_checked = False
+
+
+class CachedEncoder:
+    """Encoder wrapper that serves repeated texts from a :class:`DiskEmbeddingCache`."""
+
+    def __init__(self, inner: Any, cache: DiskEmbeddingCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    @property
+    def identity(self) -> str:
+        return self.cache.identity
+
+    def encode(self, text: str) -> np.ndarray:
+        return self.encode_batch([text])[0]
+
+    def encode_batch(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.asarray(self.inner.encode_batch([]), dtype=np.float32)
+        keys = [text_key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = [pos for pos, vec in enumerate(cached) if vec is None]
+        if missing:
+            fresh = self.inner.encode_batch([texts[pos] for pos in missing])
+            encoded = np.atleast_2d(np.asarray(fresh, dtype=np.float32))
+            self.cache.put_many([keys[pos] for pos in missing], encoded)
+            for pos, vec in zip(missing, encoded, strict=False):
+                cached[pos] = vec
+        return np.stack([np.asarray(vec, dtype=np.float32) for vec in cached], axis=0)
+
+
+__all__ = ["CachedEncoder", "DiskEmbeddingCache", "text_key"]
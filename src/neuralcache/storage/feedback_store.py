@@ -0,0 +1,90 @@
+"""Bounded store of recently served document embeddings for ``/feedback``.
+
+Feedback only needs the embedding of each selected document, so results are
+kept as normalized float32 rows in a ring buffer allocated once per namespace:
+its size in bytes is fixed at construction, a lookup is one dict probe, and the
+oldest rows are overwritten as new results arrive. Rows also expire after a
+TTL so stale selections are rejected like unknown ones.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class FeedbackStore:
+    def __init__(self, dim: int, capacity: int, ttl_s: float | None = None) -> None:
+        self.dim = int(dim)
+        self.capacity = max(0, int(capacity))
+        self.ttl_s = ttl_s if ttl_s and ttl_s > 0 else None
+        self._vectors = np.zeros((self.capacity, self.dim), dtype=np.float32)
+        self._stamps = np.zeros(self.capacity, dtype=np.float64)
+        self._owners: list[str | None] = [None] * self.capacity
+        self._slots: dict[str, int] = {}
+        self._head = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def sized(
+        cls, dim: int, max_rows: int, max_bytes: int | None, ttl_s: float | None = None
+    ) -> FeedbackStore:
+        """Build a store holding ``max_rows`` rows, fewer if that would exceed ``max_bytes``."""
+        rows = max(0, int(max_rows))
+        if max_bytes is not None:
+            rows = min(rows, int(max_bytes) // (4 * max(1, int(dim))))
+        return cls(dim, rows, ttl_s)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._vectors.nbytes + self._stamps.nbytes)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def remember(
+        self, doc_ids: Sequence[str], embeddings: np.ndarray, *, now: float | None = None
+    ) -> None:
+        """Store one row per id, replacing any earlier row for the same id."""
+        if self.capacity == 0 or len(doc_ids) == 0:
+            return
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(doc_ids), -1)
+        rows: np.ndarray = matrix[:, : self.dim]
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        rows = rows / np.where(norms > 0, norms, np.float32(1.0))
+        stamp = time.time() if now is None else now
+        with self._lock:
+            for doc_id, row in zip(doc_ids, rows, strict=True):
+                previous = self._slots.pop(doc_id, None)
+                if previous is not None:
+                    self._owners[previous] = None
+                slot = self._head
+                self._head = (slot + 1) % self.capacity
+                evicted = self._owners[slot]
+                if evicted is not None:
+                    del self._slots[evicted]
+                self._owners[slot] = doc_id
+                self._slots[doc_id] = slot
+                self._vectors[slot, : row.size] = row
+                self._vectors[slot, row.size :] = 0.0
+                self._stamps[slot] = stamp
+
+    def lookup(self, doc_ids: Sequence[str], *, now: float | None = None) -> dict[str, np.ndarray]:
+        """Return copies of the live rows for ``doc_ids``; unknown or expired ids are omitted."""
+        cutoff = None
+        if self.ttl_s is not None:
+            cutoff = (time.time() if now is None else now) - self.ttl_s
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for doc_id in doc_ids:
+                slot = self._slots.get(doc_id)
+                if slot is None or (cutoff is not None and self._stamps[slot] < cutoff):
+                    continue
+                found[doc_id] = self._vectors[slot].copy()
+        return found
+
+
+__all__ = ["FeedbackStore"]
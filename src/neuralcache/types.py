@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from .config import Settings
 
@@ -30,9 +30,14 @@ class Document(BaseModel):
         return value
 
 
+# Optional per-result attributes; ``id``, ``score`` and ``collapsed_ids`` are always returned.
+ResultField = Literal["components", "text", "metadata", "embedding"]
+RESULT_FIELDS: frozenset[str] = frozenset(("components", "text", "metadata", "embedding"))
+
+
 class RerankRequest(BaseModel):
     query: str
-    documents: list[Document]
+    documents: list[Document] = Field(default_factory=list)
     query_embedding: list[float] | None = None
     top_k: int = 10
     mmr_lambda: float | None = 0.5
@@ -41,6 +46,26 @@ class RerankRequest(BaseModel):
     gating_min_candidates: int | None = None
     gating_max_candidates: int | None = None
     gating_entropy_temp: float | None = None
+    near_duplicate_threshold: float | None = Field(default=None, ge=0.0, le=1.0)
+    cascade: bool | None = None
+    # Corpus mode: candidates come from the server's CR corpus store instead of
+    # ``documents``; ``filters`` exact-match their metadata (list = any of).
+    corpus: bool = False
+    filters: dict[str, Any] | None = None
+    # Projection of each result; None returns every field (the historical shape).
+    fields: list[ResultField] | None = None
+    # Latency budget in ms from arrival; scoring degrades as it runs out.
+    deadline_ms: float | None = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def _check_document_source(self) -> RerankRequest:
+        if self.corpus and self.documents:
+            raise ValueError("documents must be omitted in corpus mode")
+        if not self.corpus and "documents" not in self.model_fields_set:
+            raise ValueError("documents is required unless corpus is true")
+        if self.filters and not self.corpus:
+            raise ValueError("filters are only supported in corpus mode")
+        return self
 
     @field_validator("top_k")
     @classmethod
@@ -64,6 +89,7 @@ class RerankRequest(BaseModel):
 class ScoredDocument(Document):
     score: float = 0.0
     components: dict[str, float] = Field(default_factory=dict)
+    collapsed_ids: list[str] | None = None  # near-duplicates folded into this result
 
 
 class RerankDebug(BaseModel):
@@ -71,6 +97,10 @@ class RerankDebug(BaseModel):
     deterministic: bool | None = None
     epsilon_used: float | None = None
     mmr_lambda_used: float | None = None
+    near_duplicates: dict[str, Any] | None = None
+    cascade: dict[str, Any] | None = None
+    corpus: dict[str, Any] | None = None
+    deadline: dict[str, Any] | None = None
 
 
 class ErrorInfo(BaseModel):
@@ -0,0 +1,57 @@
+import orjson
+from fastapi.testclient import TestClient
+
+from neuralcache.api.server import app, settings
+
+client = TestClient(app)
+NDJSON = {"Accept": "application/x-ndjson"}
+DOCS = [
+    {"id": "a", "text": "alpha", "embedding": [0.1, 0.2, 0.3]},
+    {"id": "b", "text": "beta", "embedding": [0.3, 0.2, 0.1]},
+]
+
+
+def _item(**extra):
+    base = {"query": "q", "query_embedding": [0.1, 0.2, 0.3], "documents": DOCS, "top_k": 2}
+    return {**base, **extra}
+
+
+def _lines(resp):
+    return [orjson.loads(line) for line in resp.text.splitlines()]
+
+
+def test_ndjson_lines_match_the_buffered_body(monkeypatch):
+    monkeypatch.setattr(settings, "epsilon_greedy", 0.0)
+    batch = [_item(), _item(fields=["components"])]
+    streamed = client.post("/rerank/batch", json=batch, headers=NDJSON)
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(streamed)
+    assert [line.pop("index") for line in lines] == [0, 1]
+    buffered = client.post("/rerank/batch", json=batch).json()
+    assert [[r["id"] for r in item["results"]] for item in lines] == [
+        [r["id"] for r in item["results"]] for item in buffered
+    ]
+    assert "text" not in lines[1]["results"][0]
+
+
+def test_failed_item_becomes_an_error_line():
+    corpus = {"query": "q", "query_embedding": [0.1, 0.2, 0.3], "corpus": True, "top_k": 2}
+    batch = [_item(), corpus]
+    headers = {**NDJSON, settings.namespace_header: "stream-no-corpus"}
+    lines = _lines(client.post("/rerank/batch", json=batch, headers=headers))
+    assert lines[0]["index"] == 0 and len(lines[0]["results"]) == 2
+    assert lines[1]["index"] == 1 and lines[1]["error"]["code"] == "NOT_FOUND"
+
+
+def test_oversized_batch_is_rejected_before_streaming(monkeypatch):
+    monkeypatch.setattr(settings, "max_batch_size", 1)
+    resp = client.post("/rerank/batch", json=[_item(), _item()], headers=NDJSON)
+    assert resp.status_code == 400
+
+
+def test_parallel_workers_emit_every_index(monkeypatch):
+    monkeypatch.setattr(settings, "batch_stream_workers", 3)
+    lines = _lines(client.post("/rerank/batch", json=[_item()] * 5, headers=NDJSON))
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3, 4]
+    assert all(len(line["results"]) == 2 for line in lines)
@@ -0,0 +1,61 @@
+from neuralcache.config import Settings
+from neuralcache.encoder import HashingEncoder
+from neuralcache.rerank import Reranker
+from neuralcache.types import Document
+
+
+class _ModelEncoder:
+    identity = "fake:model"
+
+    def __init__(self, dim: int) -> None:
+        self.inner = HashingEncoder(dim=dim)
+        self.encoded: list[str] = []
+
+    def encode(self, text):
+        return self.inner.encode(text)
+
+    def encode_batch(self, texts):
+        self.encoded.extend(texts)
+        return self.inner.encode_batch(texts)
+
+
+def _reranker(**kwargs) -> tuple[Reranker, _ModelEncoder]:
+    settings = Settings(
+        narrative_dim=64, deterministic=True, storage_persistence_enabled=False, **kwargs
+    )
+    rr = Reranker(settings=settings)
+    model = _ModelEncoder(64)
+    rr.encoder = model
+    return rr, model
+
+
+GATE_ON = {"gating_mode": "on", "gating_min_candidates": 5, "gating_max_candidates": 5}
+
+
+def test_cascade_encodes_only_survivors():
+    rr, model = _reranker(cascade_enabled=True)
+    docs = [Document(id=str(i), text=f"topic {i % 7} item {i}") for i in range(40)]
+    debug: dict[str, object] = {}
+    q = rr.encode_query("topic 3")
+    scored = rr.score(q, docs, query_text="topic 3", overrides=GATE_ON, debug=debug)
+    assert len(scored) == 5
+    assert len(model.encoded) == 5
+    cascade = debug["cascade"]
+    assert cascade["survivors"] == 5 and cascade["total"] == 40
+    assert abs(cascade["survivor_fraction"] - 5 / 40) < 1e-9
+
+
+def test_cascade_off_by_default_encodes_everything():
+    rr, model = _reranker()
+    docs = [Document(id=str(i), text=f"topic {i % 7} item {i}") for i in range(40)]
+    debug: dict[str, object] = {}
+    rr.score(rr.encode_query("topic 3"), docs, query_text="topic 3", overrides=GATE_ON, debug=debug)
+    assert len(model.encoded) == 40
+    assert "cascade" not in debug
+
+
+def test_cascade_request_override():
+    rr, model = _reranker()
+    docs = [Document(id=str(i), text=f"doc {i}") for i in range(20)]
+    rr.score(rr.encode_query("doc"), docs, query_text="doc", overrides={**GATE_ON, "cascade": True})
+    assert len(model.encoded) == 5
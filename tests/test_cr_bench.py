@@ -0,0 +1,43 @@
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from neuralcache.cr.bench import run_grid, split_queries, synthetic_corpus
+from neuralcache.cr.cli import bench_cr_main
+
+
+def test_run_grid_sweeps_search_params_per_build():
+    indexed, queries = split_queries(synthetic_corpus(600, 32, clusters=8), 20)
+    assert indexed.shape == (580, 32) and queries.shape == (20, 32)
+    grid = {
+        "d1": [16],
+        "d2": [8, 32],  # d2 > d1 is skipped
+        "k2": [4],
+        "k1": [3],
+        "top_coarse": [1, 4],
+        "top_topics_per_coarse": [1],
+    }
+    results = run_grid(indexed, queries, grid, k=5, max_candidates=600)
+    assert [(r.d2, r.top_coarse) for r in results] == [(8, 1), (8, 4)]
+    narrow, wide = results
+    # Probing every coarse bucket with an uncapped budget cannot lose recall.
+    assert wide.recall_at_k >= narrow.recall_at_k
+    assert 0.0 < narrow.recall_at_k <= 1.0
+    assert narrow.index_bytes == wide.index_bytes > 0
+
+    with pytest.raises(ValueError):
+        run_grid(indexed, queries, {"d1": [16]})
+
+
+def test_bench_cli_writes_json_and_csv(tmp_path: Path, capsys):
+    out_json, out_csv = tmp_path / "r.json", tmp_path / "r.csv"
+    argv = ["--synthetic", "400", "--dim", "32", "--queries", "10", "--d1", "16", "--d2", "8"]
+    argv += ["--k2", "4", "--k1", "3", "--top-coarse", "1", "2"]
+    bench_cr_main(argv + ["--out", str(out_json), "--out", str(out_csv)])
+    rows = json.loads(out_json.read_text())
+    assert len(rows) == 2 and {"recall_at_k", "p99_ms", "build_s"} <= rows[0].keys()
+    with out_csv.open() as handle:
+        assert len(list(csv.DictReader(handle))) == 2
+    assert "recall@10" in capsys.readouterr().out
@@ -0,0 +1,236 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from neuralcache.api import server as server_mod
+from neuralcache.cr.cli import build_cr_main, update_cr_main
+from neuralcache.cr.corpus import (
+    CorpusStore,
+    append_corpus_store,
+    matches_filters,
+    write_corpus_store,
+)
+from neuralcache.cr.registry import reset_cr_index_managers
+from neuralcache.encoder import HashingEncoder
+
+TOPICS = ["solar panels and batteries", "sourdough bread baking", "marathon training plans"]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_managers():
+    reset_cr_index_managers()
+    yield
+    reset_cr_index_managers()
+
+
+def _write_docs(path: Path, n: int = 90) -> None:
+    with path.open("w", encoding="utf-8") as handle:
+        for i in range(n):
+            topic = TOPICS[i % len(TOPICS)]
+            record = {"id": f"d{i}", "text": f"{topic} note {i}", "metadata": {"lang": "en"}}
+            if i % 2:
+                record["metadata"] = {"lang": "de", "topic": i % len(TOPICS)}
+            handle.write(json.dumps(record) + "\n")
+
+
+def test_store_roundtrip(tmp_path: Path):
+    records = [
+        {"id": "a", "text": "héllo", "metadata": {"k": 1}},
+        {"id": "b", "text": ""},
+        {"id": "c", "text": "third", "metadata": {"tags": ["x", "y"]}},
+    ]
+    q0 = np.arange(12, dtype=np.float32).reshape(3, 4)
+    assert write_corpus_store(tmp_path / "corpus", iter(records), q0) == 3
+
+    store = CorpusStore(tmp_path / "corpus")
+    assert len(store) == 3 and store.dim == 4
+    assert np.array_equal(store.q0, q0)
+    docs = store.documents([2, 0, 1])
+    assert [d.id for d in docs] == ["c", "a", "b"]
+    assert docs[1].text == "héllo" and docs[1].metadata == {"k": 1}
+    assert docs[2].metadata == {}
+
+    with pytest.raises(ValueError):
+        write_corpus_store(tmp_path / "bad", records[:2], q0)
+
+
+def test_store_keeps_encoder_embeddings(tmp_path: Path):
+    records = [{"id": f"r{i}", "text": f"text number {i}"} for i in range(5)]
+    q0 = np.zeros((5, 4), dtype=np.float32)
+    encoder = HashingEncoder(dim=8)
+    write_corpus_store(tmp_path / "corpus", records, q0, encoder=encoder, batch_size=2)
+
+    store = CorpusStore(tmp_path / "corpus")
+    assert store.embeddings is not None and store.embeddings.shape == (5, 8)
+    docs = store.documents([4, 1], encoder_identity=encoder.identity)
+    for doc in docs:
+        assert np.allclose(doc.embedding, encoder.encode(doc.text))
+    other = HashingEncoder(dim=16).identity
+    assert all(doc.embedding is None for doc in store.documents([0], encoder_identity=other))
+    assert all(doc.embedding is None for doc in store.documents([0]))
+
+
+def test_append_keeps_rows_and_encoder_embeddings(tmp_path: Path):
+    encoder = HashingEncoder(dim=8)
+    records = [{"id": f"r{i}", "text": f"text number {i}"} for i in range(3)]
+    write_corpus_store(tmp_path / "c", records, np.ones((3, 4), np.float32), encoder=encoder)
+    extra = [{"id": "x", "text": "extra", "metadata": {"k": 2}}, {"text": "anonymous"}]
+    new_q0 = np.full((2, 4), 2.0, dtype=np.float32)
+    assert append_corpus_store(tmp_path / "c", extra, new_q0, encoder=encoder) == 5
+
+    store = CorpusStore(tmp_path / "c")
+    assert len(store) == 5 and np.array_equal(store.q0[3:], new_q0)
+    assert [store.doc_id(row) for row in range(5)] == ["r0", "r1", "r2", "x", "4"]
+    assert store.metadata(3) == {"k": 2} and store.text(1) == "text number 1"
+    (doc,) = store.documents([3], encoder_identity=encoder.identity)
+    assert np.allclose(doc.embedding, encoder.encode("extra"))
+    with pytest.raises(ValueError):
+        append_corpus_store(tmp_path / "c", extra, new_q0)
+
+
+def test_matches_filters():
+    meta = {"lang": "de", "topic": 2}
+    assert matches_filters(meta, {"lang": "de"})
+    assert matches_filters(meta, {"lang": ["en", "de"], "topic": 2})
+    assert not matches_filters(meta, {"lang": "en"})
+    assert not matches_filters(meta, {"missing": 1})
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_build_cli_writes_corpus_store(tmp_path: Path, stream: bool):
+    docs = tmp_path / "docs.jsonl"
+    _write_docs(docs, n=30)
+    argv = [str(docs), "--dim", "64", "--d1", "16", "--d2", "8", "--k2", "3", "--k1", "2"]
+    argv += ["--npz", str(tmp_path / "i.npz"), "--meta", str(tmp_path / "i.json")]
+    argv += ["--corpus-dir", str(tmp_path / "corpus")]
+    build_cr_main(argv + (["--stream", "--chunk-size", "7"] if stream else []))
+
+    store = CorpusStore(tmp_path / "corpus")
+    assert len(store) == 30 and store.dim == 64
+    assert store.doc_id(29) == "d29" and store.metadata(1) == {"lang": "de", "topic": 1}
+
+
+def _corpus_client(tmp_path: Path, monkeypatch, *extra: str) -> TestClient:
+    docs = tmp_path / "docs.jsonl"
+    _write_docs(docs)
+    argv = [str(docs), "--dim", "64", "--d1", "16", "--d2", "8", "--k2", "3", "--k1", "2"]
+    argv += ["--npz", str(tmp_path / "i.npz"), "--meta", str(tmp_path / "i.json")]
+    build_cr_main(argv + ["--corpus-dir", str(tmp_path / "corpus"), *extra])
+    monkeypatch.setattr(server_mod.settings.cr, "index_npz_path", str(tmp_path / "i.npz"))
+    monkeypatch.setattr(server_mod.settings.cr, "index_meta_path", str(tmp_path / "i.json"))
+    monkeypatch.setattr(server_mod.settings.cr, "corpus_dir", str(tmp_path / "corpus"))
+    monkeypatch.setattr(server_mod.settings, "epsilon_greedy", 0.0)
+    return TestClient(server_mod.app)
+
+
+def test_corpus_mode_rerank(tmp_path: Path, monkeypatch):
+    client = _corpus_client(tmp_path, monkeypatch)
+    resp = client.post(
+        "/rerank", json={"query": "sourdough bread baking", "corpus": True, "top_k": 5}
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert len(body["results"]) == 5
+    assert body["results"][0]["text"].startswith("sourdough")
+    assert all(doc["id"].startswith("d") for doc in body["results"])
+    assert body["debug"]["corpus"]["retrieved"] > 0
+    assert body["debug"]["corpus"]["stored_embeddings"] is True
+
+    filtered = client.post(
+        "/rerank",
+        json={"query": "sourdough bread baking", "corpus": True, "filters": {"lang": "de"}},
+    ).json()
+    assert filtered["results"]
+    assert all(doc["metadata"]["lang"] == "de" for doc in filtered["results"])
+
+    batch = client.post(
+        "/rerank/batch",
+        json=[
+            {"query": "marathon training plans", "corpus": True, "top_k": 3},
+            {"query": "q", "documents": [{"id": "x", "text": "inline"}]},
+        ],
+    )
+    assert batch.status_code == 200
+    first, second = batch.json()
+    assert first["results"][0]["text"].startswith("marathon")
+    assert [doc["id"] for doc in second["results"]] == ["x"]
+
+
+def test_corpus_mode_can_rank_from_pq_codes_alone(tmp_path: Path, monkeypatch):
+    client = _corpus_client(tmp_path, monkeypatch, "--pq-m", "8")
+    monkeypatch.setattr(server_mod.settings.cr, "pq_exact_rescore", False)
+    resp = client.post(
+        "/rerank", json={"query": "sourdough bread baking", "corpus": True, "top_k": 5}
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["debug"]["corpus"]["pq_codes_only"] is True
+    assert body["results"][0]["text"].startswith("sourdough")
+
+
+@pytest.mark.parametrize("append", [False, True])
+def test_corpus_mode_after_update_add(tmp_path: Path, monkeypatch, append: bool):
+    client = _corpus_client(tmp_path, monkeypatch)
+    added = tmp_path / "added.jsonl"
+    added.write_text(
+        "\n".join(
+            json.dumps({"id": f"new{i}", "text": f"sourdough bread baking extra {i}"})
+            for i in range(45)
+        )
+    )
+    argv = [
+        "--add",
+        str(added),
+        "--npz",
+        str(tmp_path / "i.npz"),
+        "--meta",
+        str(tmp_path / "i.json"),
+    ]
+    update_cr_main(argv + (["--corpus-dir", str(tmp_path / "corpus")] if append else []))
+
+    resp = client.post(
+        "/rerank", json={"query": "sourdough bread baking extra", "corpus": True, "top_k": 90}
+    )
+    assert resp.status_code == 200, resp.text
+    ids = [doc["id"] for doc in resp.json()["results"]]
+    assert ids
+    # Without the append the store stops at the build; added ids are skipped, not fatal.
+    assert any(doc_id.startswith("new") for doc_id in ids) is append
+
+
+def test_update_refuses_a_store_out_of_step_with_the_index(tmp_path: Path, monkeypatch):
+    _corpus_client(tmp_path, monkeypatch)
+    added = tmp_path / "added.jsonl"
+    added.write_text(json.dumps({"id": "n", "text": "marathon training plans extra"}))
+    argv = [
+        "--add",
+        str(added),
+        "--npz",
+        str(tmp_path / "i.npz"),
+        "--meta",
+        str(tmp_path / "i.json"),
+    ]
+    update_cr_main(argv)
+    with pytest.raises(SystemExit, match="Corpus store has 90 docs but the index has 91"):
+        update_cr_main(argv + ["--corpus-dir", str(tmp_path / "corpus")])
+
+
+def test_corpus_mode_without_store(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(server_mod.settings.cr, "index_npz_path", str(tmp_path / "none.npz"))
+    monkeypatch.setattr(server_mod.settings.cr, "corpus_dir", str(tmp_path / "none"))
+    client = TestClient(server_mod.app)
+    resp = client.post("/rerank", json={"query": "q", "corpus": True})
+    assert resp.status_code == 404
+    assert resp.json()["error"]["code"] == "NOT_FOUND"
+
+
+def test_request_validation(tmp_path: Path):
+    client = TestClient(server_mod.app)
+    assert client.post("/rerank", json={"query": "q"}).status_code == 422
+    both = {"query": "q", "corpus": True, "documents": [{"id": "a", "text": "t"}]}
+    assert client.post("/rerank", json=both).status_code == 422
+    stray = {"query": "q", "documents": [], "filters": {"lang": "en"}}
+    assert client.post("/rerank", json=stray).status_code == 422
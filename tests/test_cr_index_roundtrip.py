@@ -31,3 +31,63 @@ def test_cr_index_build_save_load_roundtrip(tmp_path: Path):
     # Dimension of projections should not exceed original dimensionality
     assert loaded.proj1_components.shape[1] <= embeddings.shape[1]
     assert loaded.proj2_components.shape[1] <= loaded.proj1_components.shape[1]
+
+
+def _legacy_save(idx, npz_path: Path, meta_path: Path) -> None:
+    np.savez_compressed(
+        npz_path,
+        proj1_components=idx.proj1_components,
+        proj1_mean=idx.proj1_mean,
+        proj2_components=idx.proj2_components,
+        proj2_mean=idx.proj2_mean,
+        coarse_centroids=idx.coarse_centroids,
+        coarse_buckets=np.array(idx.coarse_buckets + [[]], dtype=object)[:-1],
+        topic_centroids_per_coarse=np.array(idx.topic_centroids_per_coarse + [None], dtype=object)[
+            :-1
+        ],
+        topic_buckets_per_coarse=np.array(idx.topic_buckets_per_coarse + [None], dtype=object)[:-1],
+    )
+    meta = {k: v for k, v in vars(idx.meta).items() if k != "format_version"}
+    meta_path.write_text(json.dumps(meta))
+
+
+def _assert_same_structure(loaded, idx) -> None:
+    assert [list(b) for b in loaded.coarse_buckets] == idx.coarse_buckets
+    assert [[list(t) for t in topics] for topics in loaded.topic_buckets_per_coarse] == (
+        idx.topic_buckets_per_coarse
+    )
+    for a, b in zip(loaded.topic_centroids_per_coarse, idx.topic_centroids_per_coarse, strict=True):
+        assert np.array_equal(a, b)
+    assert np.array_equal(loaded.coarse_centroids, idx.coarse_centroids)
+
+
+def test_cr_index_v2_is_pickle_free_and_memory_mapped(tmp_path: Path):
+    rng = np.random.default_rng(1)
+    embeddings = rng.normal(size=(300, 32)).astype(np.float32)
+    idx = build_cr_index(embeddings, d1=16, d2=8, k2=6, k1_per_bucket=4, seed=7)
+    npz_path = tmp_path / "cr_index.npz"
+    meta_path = tmp_path / "cr_index.meta.json"
+    save_cr_index(idx, str(npz_path), str(meta_path))
+
+    assert json.loads(meta_path.read_text())["format_version"] == 2
+    with np.load(npz_path, allow_pickle=False) as z:
+        assert "coarse_offsets" in z.files and "topic_bucket_indices" in z.files
+
+    loaded = load_cr_index(str(npz_path), str(meta_path))
+    assert isinstance(loaded.coarse_centroids, np.memmap)
+    assert loaded.coarse_buckets.indices.dtype == np.int32
+    _assert_same_structure(loaded, idx)
+    _assert_same_structure(load_cr_index(str(npz_path), str(meta_path), mmap=False), idx)
+
+
+def test_cr_index_loader_reads_legacy_format(tmp_path: Path):
+    rng = np.random.default_rng(2)
+    embeddings = rng.normal(size=(120, 32)).astype(np.float32)
+    idx = build_cr_index(embeddings, d1=16, d2=8, k2=4, k1_per_bucket=3, seed=5)
+    npz_path = tmp_path / "legacy.npz"
+    meta_path = tmp_path / "legacy.meta.json"
+    _legacy_save(idx, npz_path, meta_path)
+
+    loaded = load_cr_index(str(npz_path), str(meta_path))
+    assert loaded.meta.format_version == 1
+    _assert_same_structure(loaded, idx)
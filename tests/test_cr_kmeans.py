@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import numpy as np
+
+from neuralcache.cr.index import build_cr_index
+from neuralcache.cr.utils import assign_to_centroids, kmeans
+
+
+def _blobs(n_per: int = 200, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    centers = np.array([[0.0, 0.0], [10.0, 10.0], [-10.0, 10.0]], dtype=np.float32)
+    x = np.concatenate([c + rng.normal(scale=0.5, size=(n_per, 2)) for c in centers])
+    return x.astype(np.float32), np.repeat(np.arange(3), n_per)
+
+
+def test_chunked_assignment_matches_broadcast():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(257, 8)).astype(np.float32)
+    c = rng.normal(size=(5, 8)).astype(np.float32)
+    labels, sq = assign_to_centroids(x, c, chunk_rows=16)
+    brute = ((x[:, None, :] - c[None, :, :]) ** 2).sum(axis=2)
+    assert np.array_equal(labels, brute.argmin(axis=1))
+    assert np.allclose(sq, brute.min(axis=1), atol=1e-4)
+
+
+def _purity(labels: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(np.bincount(truth[labels == c]).max() for c in np.unique(labels))
+    return hits / labels.size
+
+
+def test_kmeans_recovers_blobs_and_stops_early():
+    x, truth = _blobs()
+    result = kmeans(x, k=3, iters=50, seed=3, chunk_rows=64)
+    assert _purity(result.labels, truth) == 1.0
+    assert result.iterations < 50
+
+
+def test_minibatch_kmeans_on_memmap(tmp_path: Path):
+    x, truth = _blobs(n_per=500)
+    path = tmp_path / "x.npy"
+    np.save(path, x)
+    mapped = np.load(path, mmap_mode="r")
+    result = kmeans(mapped, k=3, iters=40, seed=5, batch_size=128, chunk_rows=100)
+    assert _purity(result.labels, truth) > 0.99
+
+
+def test_parallel_topic_clustering_matches_serial_build():
+    rng = np.random.default_rng(3)
+    x = rng.normal(size=(600, 32)).astype(np.float32)
+    serial = build_cr_index(x, d1=16, d2=8, k2=6, k1_per_bucket=4, seed=11)
+    parallel = build_cr_index(x, d1=16, d2=8, k2=6, k1_per_bucket=4, seed=11, workers=3)
+    assert parallel.coarse_buckets == serial.coarse_buckets
+    assert parallel.topic_buckets_per_coarse == serial.topic_buckets_per_coarse
+    for a, b in zip(
+        parallel.topic_centroids_per_coarse, serial.topic_centroids_per_coarse, strict=True
+    ):
+        assert np.array_equal(a, b)
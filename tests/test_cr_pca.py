@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from neuralcache.cr.index import build_cr_index
+from neuralcache.cr.utils import CovarianceAccumulator, pca_fit
+
+
+def _low_rank(n: int = 400, d: int = 24, rank: int = 4, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(rank, d))
+    scales = np.array([8.0, 5.0, 3.0, 2.0])[:rank, None]
+    latent = rng.normal(size=(n, rank))
+    noise = 0.01 * rng.normal(size=(n, d))
+    return (latent @ (scales * basis) + noise + 3.0).astype(np.float64)
+
+
+def _subspace_overlap(a: np.ndarray, b: np.ndarray) -> float:
+    # Smallest cosine of the principal angles between two row spaces.
+    return float(np.linalg.svd(a @ b.T, compute_uv=False).min())
+
+
+@pytest.mark.parametrize("method", ["randomized", "incremental"])
+def test_pca_methods_match_full_subspace(method):
+    x = _low_rank()
+    full_c, full_mu = pca_fit(x, out_dim=4)
+    other_c, other_mu = pca_fit(x, out_dim=4, method=method, chunk_rows=37)
+    assert np.allclose(full_mu, other_mu)
+    assert _subspace_overlap(full_c, other_c) > 0.999
+
+
+def test_covariance_accumulator_matches_numpy():
+    x = _low_rank(n=123)
+    acc = CovarianceAccumulator(x.shape[1])
+    for start in range(0, x.shape[0], 10):
+        acc.update(x[start : start + 10])
+    assert np.allclose(acc.mean(), x.mean(axis=0))
+    assert np.allclose(acc.covariance(), np.cov(x, rowvar=False, bias=True))
+
+
+def test_build_cr_index_with_streaming_pca():
+    x = _low_rank(n=200, d=32).astype(np.float32)
+    idx = build_cr_index(x, d1=8, d2=4, k2=4, k1_per_bucket=3, pca_method="incremental")
+    assert idx.proj1_components.shape == (8, 32)
+    assert idx.meta.doc_count == 200
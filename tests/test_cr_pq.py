@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from neuralcache.cr.index import build_cr_index, load_cr_index, save_cr_index
+from neuralcache.cr.pq import adc_scores, adc_table, pq_encode, train_pq
+from neuralcache.cr.search import _cosine, hierarchical_candidates
+from neuralcache.cr.update import add_documents
+
+
+def _corpus(n: int = 800, d: int = 64, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=2.0, size=(12, d))
+    return (centers[rng.integers(0, 12, size=n)] + rng.normal(size=(n, d))).astype(np.float32)
+
+
+def test_codes_are_compact_and_adc_tracks_cosine():
+    corpus = _corpus()
+    codebooks = train_pq(corpus, m=8, seed=1)
+    codes = pq_encode(corpus, codebooks, chunk_rows=100)
+    assert codes.shape == (800, 8) and codes.dtype == np.uint8
+    assert corpus[0].nbytes // codes[0].nbytes == 32
+
+    query = corpus[5]
+    approx = adc_scores(adc_table(query, codebooks), codes)
+    exact = _cosine(query[None, :], corpus).ravel()
+    assert np.corrcoef(approx, exact)[0, 1] > 0.95
+
+
+def test_invalid_subspace_count():
+    with pytest.raises(ValueError):
+        train_pq(_corpus(n=50), m=7)
+
+
+def test_pq_search_recall_and_exact_limit():
+    corpus = _corpus()
+    cr = build_cr_index(corpus, d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3, pq_m=16)
+    assert cr.meta.pq_m == 16 and cr.pq_codes.shape == (800, 16)
+    overlap = []
+    for query in corpus[:20]:
+        exact = hierarchical_candidates(query, corpus, cr, max_candidates=48)
+        # A shortlist covering every leaf doc reproduces the float path.
+        assert (
+            hierarchical_candidates(query, corpus, cr, max_candidates=48, pq_rescore_factor=1000)
+            == exact
+        )
+        approx = hierarchical_candidates(query, corpus, cr, max_candidates=48, pq_rescore_factor=4)
+        overlap.append(len(set(approx) & set(exact)) / len(exact))
+    assert np.mean(overlap) > 0.9
+
+
+def test_codes_only_search_never_reads_q0():
+    corpus = _corpus()
+    cr = build_cr_index(corpus, d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3, pq_m=16)
+    overlap = []
+    for query in corpus[:20]:
+        exact = hierarchical_candidates(query, corpus, cr, max_candidates=48)
+        coded = hierarchical_candidates(query, None, cr, max_candidates=48)
+        assert len(coded) == len(exact)
+        overlap.append(len(set(coded) & set(exact)) / len(exact))
+    assert np.mean(overlap) > 0.75
+
+    plain = build_cr_index(corpus, d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3)
+    with pytest.raises(ValueError):
+        hierarchical_candidates(corpus[0], None, plain)
+
+
+def test_codes_roundtrip_and_incremental_add(tmp_path: Path):
+    corpus = _corpus(n=500, seed=2)
+    cr = build_cr_index(corpus[:400], d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3, pq_m=8)
+    save_cr_index(cr, str(tmp_path / "i.npz"), str(tmp_path / "i.json"))
+    loaded = load_cr_index(str(tmp_path / "i.npz"), str(tmp_path / "i.json"))
+    assert np.array_equal(loaded.pq_codes, cr.pq_codes)
+    assert np.allclose(loaded.pq_codebooks, cr.pq_codebooks)
+
+    add_documents(loaded, corpus[400:])
+    assert loaded.pq_codes.shape == (500, 8)
+    assert np.array_equal(loaded.pq_codes[400:], pq_encode(corpus[400:], cr.pq_codebooks))
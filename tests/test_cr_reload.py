@@ -0,0 +1,107 @@
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from neuralcache.api import server as server_mod
+from neuralcache.config import Settings
+from neuralcache.cr.index import build_cr_index, load_cr_index, save_cr_index
+from neuralcache.cr.registry import CRIndexManager, get_cr_index_manager, reset_cr_index_managers
+from neuralcache.rerank import Reranker
+
+
+@pytest.fixture(autouse=True)
+def _fresh_managers():
+    reset_cr_index_managers()
+    yield
+    reset_cr_index_managers()
+
+
+def _write_index(npz: Path, meta: Path, n: int, *, bump_ns: int = 0) -> None:
+    x = np.random.default_rng(n).normal(size=(n, 32)).astype(np.float32)
+    save_cr_index(build_cr_index(x, d1=16, d2=8, k2=3, k1_per_bucket=2), str(npz), str(meta))
+    if bump_ns:
+        # Filesystems with coarse mtimes could otherwise hide a quick rewrite.
+        for path in (npz, meta):
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_ns))
+
+
+def test_missing_index_is_not_cached(tmp_path: Path):
+    npz, meta = tmp_path / "i.npz", tmp_path / "i.json"
+    manager = CRIndexManager(str(npz), str(meta), check_interval_s=0.0)
+    assert manager.get() is None
+    _write_index(npz, meta, 40)
+    index = manager.get()
+    assert index is not None and index.meta.doc_count == 40
+    assert manager.current is not None and manager.current.version == 1
+
+
+def test_changed_files_swap_in_background(tmp_path: Path):
+    npz, meta = tmp_path / "i.npz", tmp_path / "i.json"
+    _write_index(npz, meta, 40)
+    gate = threading.Event()
+
+    def _slow_loader(npz_path: str, meta_path: str):
+        if manager.current is not None:
+            assert gate.wait(5)
+        return load_cr_index(npz_path, meta_path)
+
+    manager = CRIndexManager(str(npz), str(meta), check_interval_s=0.0, loader=_slow_loader)
+    old = manager.get()
+    assert old is not None
+
+    _write_index(npz, meta, 60, bump_ns=10**9)
+    # While the replacement loads, readers keep getting the old index.
+    assert manager.get() is old
+    assert manager.get() is old
+    gate.set()
+    manager.wait_for_reload(timeout=5)
+    new = manager.get()
+    assert new is not old and new.meta.doc_count == 60
+    assert manager.current.version == 2
+
+
+def test_failed_reload_keeps_serving_old_index(tmp_path: Path):
+    npz, meta = tmp_path / "i.npz", tmp_path / "i.json"
+    _write_index(npz, meta, 40)
+    manager = CRIndexManager(str(npz), str(meta), check_interval_s=0.0)
+    old = manager.get()
+    npz.write_bytes(b"not an index")
+    manager.get()
+    manager.wait_for_reload(timeout=5)
+    assert manager.get() is old
+
+
+def test_index_is_shared_across_namespaced_rerankers(tmp_path: Path):
+    npz, meta = tmp_path / "i.npz", tmp_path / "i.json"
+    _write_index(npz, meta, 40)
+    settings = Settings()
+    settings.cr.on = True
+    settings.cr.index_npz_path = str(npz)
+    settings.cr.index_meta_path = str(meta)
+    first = Reranker(settings=settings.model_copy(deep=True))
+    second = Reranker(settings=settings.model_copy(deep=True))
+    assert first._ensure_cr_loaded() is second._ensure_cr_loaded()
+
+
+def test_admin_reload_endpoint(tmp_path: Path, monkeypatch):
+    npz, meta = tmp_path / "i.npz", tmp_path / "i.json"
+    monkeypatch.setattr(server_mod.settings.cr, "index_npz_path", str(npz))
+    monkeypatch.setattr(server_mod.settings.cr, "index_meta_path", str(meta))
+    client = TestClient(server_mod.app)
+
+    missing = client.post("/admin/cr/reload")
+    assert missing.status_code == 404
+
+    _write_index(npz, meta, 40)
+    first = client.post("/admin/cr/reload").json()
+    assert first["version"] == 1 and first["doc_count"] == 40
+    _write_index(npz, meta, 50)
+    second = client.post("/admin/cr/reload").json()
+    assert second["version"] == 2 and second["doc_count"] == 50
+    manager = get_cr_index_manager(str(npz), str(meta))
+    assert manager.get().meta.doc_count == 50
@@ -0,0 +1,133 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import neuralcache.cr.search as search_mod
+from neuralcache.cr.index import build_cr_index, load_cr_index, save_cr_index
+from neuralcache.cr.search import _cosine, hierarchical_candidates
+from neuralcache.cr.update import add_documents
+from neuralcache.cr.utils import pca_transform
+
+
+def _reference_candidates(q0_query, doc_embeddings_q0, cr, top_coarse, top_topics, max_candidates):
+    """The per-bucket loop implementation the vectorized search replaced."""
+    q1 = pca_transform(q0_query[None, :], cr.proj1_components, cr.proj1_mean)
+    q2 = pca_transform(q1, cr.proj2_components, cr.proj2_mean)
+    s2 = _cosine(q2, cr.coarse_centroids).ravel()
+    boost = np.full_like(s2, -1.0)
+    for idx, bucket in enumerate(cr.coarse_buckets):
+        if len(bucket):
+            mean_vec = doc_embeddings_q0[np.asarray(bucket)].mean(axis=0, keepdims=True)
+            boost[idx] = float(_cosine(q0_query[None, :], mean_vec).ravel()[0])
+    coarse_ids = np.argsort(-(0.5 * s2 + 0.5 * boost), kind="stable")[:top_coarse]
+    candidates: list[int] = []
+    cap = max(1, max_candidates // max(1, top_coarse * top_topics))
+    for cid in coarse_ids:
+        centroids = cr.topic_centroids_per_coarse[cid]
+        if centroids.shape[0] == 0:
+            continue
+        s1 = _cosine(q1, centroids).ravel()
+        topic_boost = np.full_like(s1, -1.0)
+        for tid, bucket in enumerate(cr.topic_buckets_per_coarse[cid]):
+            if len(bucket):
+                mean_vec = doc_embeddings_q0[np.asarray(bucket)].mean(axis=0, keepdims=True)
+                topic_boost[tid] = float(_cosine(q0_query[None, :], mean_vec).ravel()[0])
+        for tid in np.argsort(-(0.5 * s1 + 0.5 * topic_boost), kind="stable")[:top_topics]:
+            ids = np.asarray(cr.topic_buckets_per_coarse[cid][tid])
+            if ids.size == 0:
+                continue
+            scores = _cosine(q0_query[None, :], doc_embeddings_q0[ids]).ravel()
+            candidates.extend(
+                ids[np.argsort(-scores, kind="stable")[: min(cap, ids.size)]].tolist()
+            )
+    candidates = list(dict.fromkeys(candidates))
+    if len(candidates) > max_candidates:
+        s0 = _cosine(q0_query[None, :], doc_embeddings_q0[np.array(candidates)]).ravel()
+        candidates = [candidates[i] for i in np.argsort(-s0, kind="stable")[:max_candidates]]
+    return candidates
+
+
+def _corpus(n: int = 600, d: int = 48, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=2.0, size=(10, d))
+    return (centers[rng.integers(0, 10, size=n)] + rng.normal(size=(n, d))).astype(np.float32)
+
+
+@pytest.mark.parametrize("top_coarse,top_topics,max_candidates", [(3, 2, 64), (2, 3, 20)])
+def test_vectorized_search_matches_reference(top_coarse, top_topics, max_candidates):
+    corpus = _corpus()
+    cr = build_cr_index(corpus, d1=24, d2=12, k2=8, k1_per_bucket=5, seed=3)
+    assert cr.coarse_means is not None and cr.topic_means is not None
+    for query in corpus[:15]:
+        got = hierarchical_candidates(query, corpus, cr, top_coarse, top_topics, max_candidates)
+        want = _reference_candidates(query, corpus, cr, top_coarse, top_topics, max_candidates)
+        assert got == want
+
+
+def test_means_roundtrip_and_legacy_fallback(tmp_path: Path):
+    corpus = _corpus(seed=1)
+    cr = build_cr_index(corpus, d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3)
+    save_cr_index(cr, str(tmp_path / "i.npz"), str(tmp_path / "i.json"))
+    loaded = load_cr_index(str(tmp_path / "i.npz"), str(tmp_path / "i.json"))
+    assert np.allclose(loaded.coarse_means, cr.coarse_means)
+    assert np.allclose(loaded.topic_means, cr.topic_means)
+
+    # Without stored means they are derived from the supplied embeddings.
+    loaded.coarse_means = loaded.topic_means = None
+    query = corpus[7]
+    assert hierarchical_candidates(
+        query, corpus, loaded, stored_means=True
+    ) == hierarchical_candidates(query, corpus, cr, stored_means=True)
+
+
+def test_search_derives_means_unless_stored_means_requested():
+    corpus = _corpus(seed=4)
+    cr = build_cr_index(corpus, d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3)
+    # Per-request callers pass embeddings that differ from the indexed corpus;
+    # by default their own means drive the bucket boosts.
+    shifted = corpus + np.random.default_rng(5).normal(scale=3.0, size=corpus.shape)
+    shifted = shifted.astype(np.float32)
+    legacy = build_cr_index(corpus, d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3)
+    legacy.coarse_means = legacy.topic_means = None
+    for query in shifted[:10]:
+        assert hierarchical_candidates(query, shifted, cr) == hierarchical_candidates(
+            query, shifted, legacy
+        )
+
+
+def test_derived_means_are_reused_across_requests(monkeypatch):
+    corpus = _corpus(seed=6)
+    cr = build_cr_index(corpus, d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3)
+    calls = []
+    real = search_mod.compute_bucket_means
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(search_mod, "compute_bucket_means", counting)
+    query = corpus[3]
+    # Each request embeds its candidates into a fresh array with the same values.
+    first = hierarchical_candidates(query, corpus.copy(), cr)
+    assert hierarchical_candidates(query, corpus.copy(), cr) == first
+    assert len(calls) == 1
+    hierarchical_candidates(query, corpus * 2.0, cr)
+    assert len(calls) == 2
+    add_documents(cr, corpus[:5])
+    hierarchical_candidates(query, np.concatenate([corpus, corpus[:5]]), cr)
+    assert len(calls) == 3
+
+
+def test_incremental_add_keeps_means_exact():
+    corpus = _corpus(n=400, seed=2)
+    cr = build_cr_index(corpus[:300], d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3)
+    add_documents(cr, corpus[300:])
+    fresh = build_cr_index(corpus[:300], d1=24, d2=12, k2=6, k1_per_bucket=4, seed=3)
+    fresh.coarse_means = fresh.topic_means = None
+    add_documents(fresh, corpus[300:])
+    query = corpus[350]
+    # Incrementally folded means equal means recomputed from the full corpus.
+    assert hierarchical_candidates(query, corpus, cr, stored_means=True) == hierarchical_candidates(
+        query, corpus, fresh
+    )
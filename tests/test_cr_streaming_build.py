@@ -0,0 +1,128 @@
+import json
+
+import numpy as np
+import pytest
+
+from neuralcache.cr import build as cr_build
+from neuralcache.cr.build import build_cr_index_streaming, iter_jsonl_chunks
+from neuralcache.cr.cli import build_cr_main
+from neuralcache.cr.index import load_cr_index
+
+
+def _write_docs(path, n=60):
+    with path.open("w", encoding="utf-8") as handle:
+        for i in range(n):
+            handle.write(json.dumps({"id": str(i), "text": f"doc {i} topic {i % 5}"}) + "\n")
+            if i % 17 == 0:
+                handle.write("\n")
+
+
+def _bucket_members(index):
+    return sorted(i for bucket in index.coarse_buckets for i in bucket)
+
+
+def test_iter_jsonl_chunks_skips_blank_lines_and_prefix(tmp_path):
+    docs = tmp_path / "docs.jsonl"
+    _write_docs(docs, n=10)
+    chunks = list(iter_jsonl_chunks(docs, chunk_size=4, skip=3))
+    assert [len(c) for c in chunks] == [4, 3]
+    assert chunks[0][0]["id"] == "3"
+
+
+def test_streaming_build_covers_every_doc(tmp_path):
+    docs = tmp_path / "docs.jsonl"
+    _write_docs(docs)
+    index, stats = build_cr_index_streaming(
+        docs, tmp_path / "work", dim=32, d1=16, d2=8, k2=4, k1_per_bucket=3, chunk_size=7
+    )
+    assert stats.doc_count == 60
+    assert stats.docs_per_s > 0
+    assert index.meta.doc_count == 60
+    assert index.meta.d1 == 16 and index.meta.d2 == 8
+    assert _bucket_members(index) == list(range(60))
+    q0 = np.load(tmp_path / "work" / "embeddings_q0.npy")
+    assert q0.shape == (60, 32)
+    assert np.all(np.linalg.norm(q0, axis=1) > 0)
+
+
+def test_streaming_build_resumes_from_checkpoint(tmp_path, monkeypatch):
+    docs = tmp_path / "docs.jsonl"
+    work = tmp_path / "work"
+    _write_docs(docs)
+    original = cr_build._encode_chunk
+    calls = {"n": 0}
+
+    def _flaky(texts, dim):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise RuntimeError("interrupted")
+        return original(texts, dim)
+
+    monkeypatch.setattr(cr_build, "_encode_chunk", _flaky)
+    with pytest.raises(RuntimeError):
+        build_cr_index_streaming(docs, work, dim=32, d1=16, d2=8, k2=4, chunk_size=10)
+    checkpoint = json.loads((work / "checkpoint.json").read_text())
+    assert checkpoint["encoded_rows"] == 20
+
+    monkeypatch.setattr(cr_build, "_encode_chunk", original)
+    index, stats = build_cr_index_streaming(docs, work, dim=32, d1=16, d2=8, k2=4, chunk_size=10)
+    assert stats.resumed_rows == 20
+    assert _bucket_members(index) == list(range(60))
+    fresh = cr_build.encode_texts([f"doc {i} topic {i % 5}" for i in range(60)], dim=32)
+    assert np.allclose(np.load(work / "embeddings_q0.npy"), fresh)
+
+
+def test_resume_with_changed_dims_redoes_projections_only(tmp_path, monkeypatch):
+    docs = tmp_path / "docs.jsonl"
+    work = tmp_path / "work"
+    _write_docs(docs)
+    build_cr_index_streaming(docs, work, dim=32, d1=16, d2=8, k2=4, chunk_size=10)
+
+    def _no_encode(texts, dim):
+        raise AssertionError("embeddings should be reused")
+
+    monkeypatch.setattr(cr_build, "_encode_chunk", _no_encode)
+    index, _ = build_cr_index_streaming(docs, work, dim=32, d1=24, d2=4, k2=4, chunk_size=10)
+    assert (index.meta.d1, index.meta.d2) == (24, 4)
+    assert index.proj1_components.shape == (24, 32)
+    assert index.proj2_components.shape == (4, 24)
+    assert np.load(work / "q1.npy", mmap_mode="r").shape == (60, 24)
+    assert _bucket_members(index) == list(range(60))
+
+
+def test_build_cr_cli_stream_mode(tmp_path, capsys):
+    docs = tmp_path / "docs.jsonl"
+    _write_docs(docs, n=30)
+    npz = tmp_path / "idx.npz"
+    meta = tmp_path / "idx.meta.json"
+    build_cr_main(
+        [
+            str(docs),
+            "--stream",
+            "--dim",
+            "32",
+            "--d1",
+            "16",
+            "--d2",
+            "8",
+            "--k2",
+            "3",
+            "--chunk-size",
+            "8",
+            "--npz",
+            str(npz),
+            "--meta",
+            str(meta),
+        ]
+    )
+    out = capsys.readouterr().out
+    assert "docs/s" in out and "peak RSS" in out
+    assert (tmp_path / "idx.npz.work" / "checkpoint.json").exists()
+    assert load_cr_index(str(npz), str(meta)).meta.doc_count == 30
+
+
+def test_build_cr_cli_stream_rejects_in_memory_pca(tmp_path):
+    docs = tmp_path / "docs.jsonl"
+    _write_docs(docs, n=10)
+    with pytest.raises(SystemExit, match="--stream only supports incremental"):
+        build_cr_main([str(docs), "--stream", "--pca", "randomized"])
@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from neuralcache.cr.cli import update_cr_main
+from neuralcache.cr.index import build_cr_index, load_cr_index, save_cr_index
+from neuralcache.cr.search import hierarchical_candidates
+from neuralcache.cr.update import add_documents, drift_report, remove_documents
+
+
+def _clustered(n: int, seed: int, scale: float = 0.3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(99).normal(scale=3.0, size=(4, 32))
+    x = centers[rng.integers(0, 4, size=n)] + rng.normal(scale=scale, size=(n, 32))
+    return x.astype(np.float32)
+
+
+def _members(buckets) -> list[int]:
+    return sorted(int(i) for bucket in buckets for i in bucket)
+
+
+@pytest.mark.parametrize("reload", [False, True])
+def test_add_documents_assigns_new_ids(tmp_path: Path, reload: bool):
+    idx = build_cr_index(_clustered(200, 0), d1=16, d2=8, k2=4, k1_per_bucket=3, seed=1)
+    if reload:
+        save_cr_index(idx, str(tmp_path / "i.npz"), str(tmp_path / "i.json"))
+        idx = load_cr_index(str(tmp_path / "i.npz"), str(tmp_path / "i.json"))
+
+    new_ids = add_documents(idx, _clustered(10, 1))
+    assert new_ids.tolist() == list(range(200, 210))
+    assert idx.meta.doc_count == 210
+    assert _members(idx.coarse_buckets) == list(range(210))
+    topic_members = [i for topics in idx.topic_buckets_per_coarse for i in _members(topics)]
+    assert sorted(topic_members) == list(range(210))
+
+    report = drift_report(idx)
+    assert report.added == 10
+    assert report.coarse_distortion is not None and report.coarse_distortion < 1.5
+    assert not report.needs_rebuild
+
+
+def test_add_documents_keeps_stored_means_exact_and_tolerates_their_absence():
+    corpus = _clustered(200, 0)
+    extra = _clustered(10, 1)
+    idx = build_cr_index(corpus, d1=16, d2=8, k2=4, k1_per_bucket=3, seed=1)
+    add_documents(idx, extra)
+    full = np.concatenate([corpus, extra])
+    for coarse_id, bucket in enumerate(idx.coarse_buckets):
+        if len(bucket):
+            expected = full[np.asarray(bucket)].mean(axis=0)
+            assert np.allclose(idx.coarse_means[coarse_id], expected, atol=1e-4)
+
+    legacy = build_cr_index(corpus, d1=16, d2=8, k2=4, k1_per_bucket=3, seed=1)
+    legacy.coarse_means = legacy.topic_means = None
+    assert add_documents(legacy, extra).tolist() == list(range(200, 210))
+    assert legacy.coarse_means is None and legacy.topic_means is None
+
+
+def test_removed_documents_are_filtered_and_compacted_on_save(tmp_path: Path):
+    corpus = _clustered(120, 2)
+    idx = build_cr_index(corpus, d1=16, d2=8, k2=4, k1_per_bucket=3, seed=1)
+    query = corpus[0]
+    before = hierarchical_candidates(query, corpus, idx, top_coarse=4, max_candidates=120)
+    assert 0 in before
+
+    assert remove_documents(idx, [0, 5]) == 2
+    assert remove_documents(idx, [5]) == 0
+    after = hierarchical_candidates(query, corpus, idx, top_coarse=4, max_candidates=120)
+    assert 0 not in after and 5 not in after
+
+    save_cr_index(idx, str(tmp_path / "i.npz"), str(tmp_path / "i.json"))
+    loaded = load_cr_index(str(tmp_path / "i.npz"), str(tmp_path / "i.json"))
+    assert not loaded.tombstones
+    assert 0 not in _members(loaded.coarse_buckets)
+    assert loaded.meta.removed_count == 2
+    with pytest.raises(ValueError):
+        remove_documents(loaded, [10_000])
+
+
+def test_drift_report_flags_out_of_distribution_additions():
+    idx = build_cr_index(_clustered(200, 3), d1=16, d2=8, k2=4, k1_per_bucket=3, seed=1)
+    far = np.random.default_rng(4).normal(scale=6.0, size=(20, 32)).astype(np.float32)
+    add_documents(idx, far)
+    report = drift_report(idx)
+    assert report.topic_distortion is not None and report.topic_distortion > 1.5
+    assert report.needs_rebuild
+
+
+def test_update_cr_cli(tmp_path: Path, capsys):
+    idx = build_cr_index(_clustered(60, 5), d1=16, d2=8, k2=3, k1_per_bucket=3, seed=1)
+    npz, meta = tmp_path / "i.npz", tmp_path / "i.json"
+    save_cr_index(idx, str(npz), str(meta))
+    docs = tmp_path / "new.jsonl"
+    docs.write_text("\n".join(json.dumps({"id": f"n{i}", "text": f"new {i}"}) for i in range(3)))
+
+    update_cr_main(
+        ["--add", str(docs), "--remove", "1", "2", "--npz", str(npz), "--meta", str(meta)]
+    )
+    out = capsys.readouterr().out
+    assert "Added 3 docs (ids 60-62), removed 2" in out
+    assert "Drift:" in out
+    loaded = load_cr_index(str(npz), str(meta))
+    assert loaded.meta.doc_count == 63
+    assert {1, 2}.isdisjoint(_members(loaded.coarse_buckets))
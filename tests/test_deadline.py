@@ -0,0 +1,91 @@
+from fastapi.testclient import TestClient
+
+from neuralcache.api.server import app, settings
+from neuralcache.config import Settings
+from neuralcache.deadline import Deadline
+from neuralcache.encoder import HashingEncoder
+from neuralcache.rerank import Reranker
+from neuralcache.types import Document
+
+client = TestClient(app)
+FEW = {"gating_mode": "off", "gating_min_candidates": 4}
+
+
+class _ModelEncoder:
+    identity = "fake:model"
+
+    def __init__(self, dim: int) -> None:
+        self.inner = HashingEncoder(dim=dim)
+
+    def encode(self, text):
+        return self.inner.encode(text)
+
+    def encode_batch(self, texts):
+        return self.inner.encode_batch(texts)
+
+
+def _reranker() -> Reranker:
+    return Reranker(
+        settings=Settings(narrative_dim=64, deterministic=True, storage_persistence_enabled=False)
+    )
+
+
+def _deadline(elapsed_ms: float) -> Deadline:
+    return Deadline(100.0, start=0.0, clock=lambda: elapsed_ms / 1000.0)
+
+
+def _docs(n: int = 20) -> list[Document]:
+    return [Document(id=str(i), text=f"topic {i % 5} item {i}") for i in range(n)]
+
+
+def _score(rr: Reranker, elapsed_ms: float) -> tuple[list, dict]:
+    debug: dict[str, object] = {}
+    scored = rr.score(
+        rr.encode_query("topic 2"),
+        _docs(),
+        query_text="topic 2",
+        overrides=FEW,
+        debug=debug,
+        deadline=_deadline(elapsed_ms),
+    )
+    return scored, debug
+
+
+def test_plenty_of_budget_runs_every_stage():
+    scored, debug = _score(_reranker(), elapsed_ms=10.0)
+    assert len(scored) == 20
+    assert debug["deadline"]["degradations"] == []
+    assert debug["deadline"]["budget_ms"] == 100.0
+
+
+def test_stages_degrade_in_order_as_the_budget_drains():
+    rr = _reranker()
+    assert _score(rr, 70.0)[1]["deadline"]["degradations"] == ["shrink_candidates"]
+
+    scored, debug = _score(rr, 95.0)
+    assert debug["deadline"]["degradations"] == ["shrink_candidates", "truncate_mmr"]
+    assert len(scored) == 4
+    assert [doc.score for doc in scored] == sorted((doc.score for doc in scored), reverse=True)
+
+
+def test_model_encoder_falls_back_to_cascade_mode():
+    rr = _reranker()
+    rr.encoder = _ModelEncoder(dim=64)
+    _, debug = _score(rr, 30.0)
+    assert debug["deadline"]["degradations"] == ["force_cascade"]
+    assert "cascade" in debug
+
+
+def test_header_deadline_is_reported_in_debug():
+    payload = {
+        "query": "q",
+        "documents": [{"id": str(i), "text": f"doc {i}"} for i in range(8)],
+        "top_k": 8,
+        "deadline_ms": 1000.0,
+    }
+    resp = client.post("/rerank", json=payload, headers={settings.deadline_header: "0.001"})
+    assert resp.status_code == 200
+    deadline = resp.json()["debug"]["deadline"]
+    assert deadline["budget_ms"] == 0.001
+    assert "truncate_mmr" in deadline["degradations"]
+    assert len(resp.json()["results"]) == 8
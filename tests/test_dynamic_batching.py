@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from neuralcache.api.batching import RerankBatcher
+from neuralcache.api.server import app, settings
+from neuralcache.config import Settings
+from neuralcache.encoder import HashingEncoder
+from neuralcache.rerank import Reranker, ScoreJob
+from neuralcache.types import Document
+
+client = TestClient(app)
+
+
+class _CountingEncoder:
+    def __init__(self, dim: int) -> None:
+        self.inner = HashingEncoder(dim=dim)
+        self.batches = 0
+
+    def encode(self, text):
+        return self.inner.encode(text)
+
+    def encode_batch(self, texts):
+        self.batches += 1
+        return self.inner.encode_batch(texts)
+
+
+def _reranker() -> Reranker:
+    return Reranker(
+        settings=Settings(narrative_dim=64, deterministic=True, storage_persistence_enabled=False)
+    )
+
+
+def _job(query: str, n: int = 12) -> ScoreJob:
+    docs = [Document(id=f"{query}-{i}", text=f"{query} topic {i % 4}") for i in range(n)]
+    docs.append(Document(id="shared", text="shared topic 1"))
+    return ScoreJob(docs=docs, query_text=query, debug={})
+
+
+def test_score_many_matches_individual_scoring():
+    queries = ["alpha", "beta", "gamma"]
+    alone = _reranker()
+    expected = [alone.score(alone.encode_query(q), _job(q).docs, query_text=q) for q in queries]
+    batched = _reranker().score_many([_job(q) for q in queries])
+    for want, got in zip(expected, batched, strict=True):
+        assert [d.id for d in got] == [d.id for d in want]
+        assert np.allclose([d.score for d in got], [d.score for d in want])
+
+
+def test_score_many_shares_encoding_and_pheromone_io(monkeypatch):
+    rk = _reranker()
+    rk.encoder = encoder = _CountingEncoder(64)
+    calls = {"bulk_bonus": 0, "record_exposure": 0}
+
+    def counting(name, fn):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    for name in ("bulk_bonus", "record_exposure"):
+        monkeypatch.setattr(rk.pher, name, counting(name, getattr(rk.pher, name)))
+    rk.score_many([_job(q) for q in ["alpha", "beta", "gamma", "delta"]])
+    assert encoder.batches == 2  # one call for the queries, one for the document texts
+    assert calls == {"bulk_bonus": 1, "record_exposure": 1}
+
+
+def test_concurrent_submits_share_one_pass(monkeypatch):
+    rk = _reranker()
+    batcher = RerankBatcher(window_ms=2000.0, max_size=3)
+    passes = []
+    original = rk.score_many
+    monkeypatch.setattr(
+        rk, "score_many", lambda jobs, **kw: passes.append(len(jobs)) or original(jobs, **kw)
+    )
+    results = {}
+
+    def call(query):
+        results[query] = batcher.submit(rk, _job(query))
+
+    threads = [threading.Thread(target=call, args=(q,)) for q in ["alpha", "beta", "gamma"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    # The third request fills the batch, so nobody waits out the 2 s window.
+    assert passes == [3]
+    for query, scored in results.items():
+        assert {doc.id for doc in scored} == {doc.id for doc in _job(query).docs}
+
+
+def test_lone_request_runs_when_the_window_closes():
+    rk = _reranker()
+    scored = RerankBatcher(window_ms=1.0).submit(rk, _job("solo"))
+    assert len(scored) == 13
+
+
+def test_failing_job_does_not_fail_its_batch_mates(monkeypatch):
+    rk = _reranker()
+    bad = _job("bad")
+    original = rk.score
+    scored_docs = []
+
+    def flaky(query, docs, *args, **kwargs):
+        if docs is bad.docs:
+            raise ValueError("boom")
+        scored_docs.append(docs)
+        return original(query, docs, *args, **kwargs)
+
+    monkeypatch.setattr(rk, "score", flaky)
+    batcher = RerankBatcher(window_ms=2000.0, max_size=2)
+    outcome = {}
+
+    def call(name, job):
+        try:
+            outcome[name] = len(batcher.submit(rk, job))
+        except ValueError:
+            outcome[name] = "error"
+
+    threads = [
+        threading.Thread(target=call, args=("good", _job("good"))),
+        threading.Thread(target=call, args=("bad", bad)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert outcome == {"good": 13, "bad": "error"}
+    # The good job's side effects (feedback rows, exposures) happen exactly once.
+    assert len(scored_docs) == 1
+
+
+def test_score_many_uses_one_stacked_dense_pass(monkeypatch):
+    rk = _reranker()
+    calls = []
+
+    def logging(name, fn):
+        def wrapper(*args, **kwargs):
+            calls.append(name)
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    for name in ("_stacked_dense_pass", "_ensure_embeddings"):
+        monkeypatch.setattr(rk, name, logging(name, getattr(rk, name)))
+    rk.score_many([_job(q) for q in ["alpha", "beta", "gamma"]])
+    # score() reuses its slice of the shared pass instead of embedding again.
+    assert calls == ["_stacked_dense_pass", "_ensure_embeddings"]
+
+
+def test_api_path_uses_the_batcher(monkeypatch):
+    monkeypatch.setattr(settings, "rerank_batch_window_ms", 1.0)
+    monkeypatch.setattr(settings, "epsilon_greedy", 0.0)
+    payload = {
+        "query": "q",
+        "documents": [{"id": str(i), "text": f"doc {i}"} for i in range(5)],
+        "top_k": 3,
+    }
+    resp = client.post("/rerank", json=payload)
+    assert resp.status_code == 200
+    assert len(resp.json()["results"]) == 3
+    assert resp.json()["debug"]["gating"]["total_candidates"] == 5
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import numpy as np
+
+from neuralcache.encoder import HashingEncoder, create_encoder
+from neuralcache.storage.embedding_cache import CachedEncoder, DiskEmbeddingCache, text_key
+
+
+class CountingEncoder:
+    def __init__(self, dim: int) -> None:
+        self.inner = HashingEncoder(dim=dim)
+        self.calls = 0
+
+    @property
+    def identity(self) -> str:
+        return self.inner.identity
+
+    def encode(self, text: str) -> np.ndarray:
+        return self.inner.encode(text)
+
+    def encode_batch(self, texts):
+        self.calls += len(texts)
+        return self.inner.encode_batch(texts)
+
+
+def test_cached_encoder_survives_restart(tmp_path: Path):
+    texts = [f"doc {i}" for i in range(10)]
+    first = CountingEncoder(16)
+    enc = CachedEncoder(first, DiskEmbeddingCache(tmp_path, first.identity))
+    cold = enc.encode_batch(texts)
+    assert first.calls == 10
+    enc.cache.close()
+
+    second = CountingEncoder(16)
+    warm_cache = DiskEmbeddingCache(tmp_path, second.identity)
+    warm = CachedEncoder(second, warm_cache).encode_batch(texts)
+    assert second.calls == 0
+    assert np.allclose(cold, warm)
+    assert warm_cache.stats()["hit_rate"] == 1.0
+
+
+def test_cache_isolated_by_identity(tmp_path: Path):
+    a = DiskEmbeddingCache(tmp_path, "hash:md5:8")
+    a.put_many([text_key("x")], np.ones((1, 8), dtype=np.float32))
+    b = DiskEmbeddingCache(tmp_path, "hash:md5:16")
+    assert b.get_many([text_key("x")]) == [None]
+
+
+def test_reader_sees_writer_appends_and_shards_roll(tmp_path: Path):
+    writer = DiskEmbeddingCache(tmp_path, "ident", shard_bytes=4 * 4 * 3)
+    reader = DiskEmbeddingCache(tmp_path, "ident", readonly=True)
+    keys = [text_key(str(i)) for i in range(7)]
+    vecs = np.arange(28, dtype=np.float32).reshape(7, 4)
+    assert writer.put_many(keys, vecs) == 7
+    assert len(list(tmp_path.glob("*/shard-*.f32"))) == 3
+    got = reader.get_many(keys)
+    assert all(v is not None for v in got)
+    assert np.allclose(np.stack(got), vecs)
+    assert reader.put_many([text_key("new")], vecs[:1]) == 0
+
+
+def test_new_writer_trims_torn_writes(tmp_path: Path):
+    first = DiskEmbeddingCache(tmp_path, "ident")
+    vecs = np.arange(12, dtype=np.float32).reshape(3, 4)
+    first.put_many([text_key(str(i)) for i in range(3)], vecs)
+    first.close()
+    # Simulate a writer killed mid-append: half a row and half a record.
+    with (first.path / "shard-00000.f32").open("ab") as handle:
+        handle.write(b"\x00" * 6)
+    with (first.path / "index.bin").open("ab") as handle:
+        handle.write(b"\x01" * 5)
+
+    second = DiskEmbeddingCache(tmp_path, "ident")
+    assert second.put_many([text_key("new")], np.full((1, 4), 7.0, dtype=np.float32)) == 1
+    assert (first.path / "shard-00000.f32").stat().st_size == 4 * 4 * 4
+    assert (first.path / "index.bin").stat().st_size % 24 == 0
+    reader = DiskEmbeddingCache(tmp_path, "ident", readonly=True)
+    got = reader.get_many([text_key(str(i)) for i in range(3)] + [text_key("new")])
+    assert np.allclose(np.stack(got[:3]), vecs)
+    assert np.allclose(got[3], 7.0)
+
+
+def test_create_encoder_wraps_with_cache(tmp_path: Path):
+    enc = create_encoder("hash", dim=8, cache_dir=str(tmp_path))
+    assert isinstance(enc, CachedEncoder)
+    assert np.allclose(enc.encode("hello world"), HashingEncoder(dim=8).encode("hello world"))
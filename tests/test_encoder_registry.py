@@ -0,0 +1,67 @@
+import importlib
+import types
+
+from neuralcache.config import Settings
+from neuralcache.encoder import (
+    HashingEncoder,
+    acquire_encoder,
+    release_encoder,
+    resident_encoder_count,
+)
+from neuralcache.rerank import Reranker
+
+
+def _fake_sentence_transformers(monkeypatch) -> list[str]:
+    loads: list[str] = []
+
+    class FakeModel:
+        def __init__(self, name: str) -> None:
+            loads.append(name)
+
+    module = types.SimpleNamespace(SentenceTransformer=FakeModel)
+    real_import = importlib.import_module
+
+    def fake_import(name, *args, **kwargs):
+        if name == "sentence_transformers":
+            return module
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(importlib, "import_module", fake_import)
+    return loads
+
+
+def test_model_is_loaded_once_and_refcounted(monkeypatch):
+    loads = _fake_sentence_transformers(monkeypatch)
+    baseline = resident_encoder_count()
+    first = acquire_encoder("sentence-transformer", dim=8, model="fake-model")
+    second = acquire_encoder("hf", dim=8, model="fake-model")  # alias, same key
+    assert first is second and loads == ["fake-model"]
+    assert resident_encoder_count() == baseline + 1
+
+    other = acquire_encoder("sentence-transformer", dim=8, model="other-model")
+    assert other is not first and loads == ["fake-model", "other-model"]
+
+    release_encoder(first)
+    assert resident_encoder_count() == baseline + 2
+    release_encoder(second)
+    release_encoder(other)
+    assert resident_encoder_count() == baseline
+    release_encoder(other)  # extra releases are ignored
+    release_encoder(HashingEncoder(dim=8))  # as are encoders never acquired
+    assert resident_encoder_count() == baseline
+
+
+def test_namespaced_rerankers_share_the_encoder(tmp_path):
+    settings = Settings(storage_dir=str(tmp_path), narrative_dim=24)
+    baseline = resident_encoder_count()
+    first = Reranker(settings=settings.model_copy(deep=True))
+    second = Reranker(settings=settings.model_copy(deep=True))
+    assert first.encoder is second.encoder
+    assert first.narr is not second.narr
+    assert resident_encoder_count() == baseline + 1
+
+    first.close()
+    first.close()  # idempotent
+    assert resident_encoder_count() == baseline + 1
+    second.close()
+    assert resident_encoder_count() == baseline
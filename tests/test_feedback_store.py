@@ -0,0 +1,45 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from neuralcache.api.server import app, settings
+from neuralcache.storage.feedback_store import FeedbackStore
+
+client = TestClient(app)
+
+
+def test_ring_overwrites_oldest_and_normalizes():
+    store = FeedbackStore(dim=4, capacity=2)
+    store.remember(["a", "b"], np.array([[3.0, 4.0, 0, 0], [0, 0, 1.0, 0]]))
+    assert np.allclose(store.lookup(["a"])["a"], [0.6, 0.8, 0, 0])
+    store.remember(["c"], np.ones((1, 4)))
+    assert set(store.lookup(["a", "b", "c"])) == {"b", "c"}
+    assert len(store) == 2 and store.nbytes == 2 * 4 * 4 + 2 * 8
+
+
+def test_re_remembering_moves_the_row_and_ttl_expires():
+    store = FeedbackStore(dim=2, capacity=2, ttl_s=10.0)
+    store.remember(["a"], np.ones((1, 2)), now=0.0)
+    store.remember(["b"], np.ones((1, 2)), now=0.0)
+    store.remember(["a"], np.ones((1, 2)), now=5.0)  # refreshes "a" in its freed slot
+    assert set(store.lookup(["a", "b"], now=12.0)) == {"a"}  # "b" is past its TTL
+    assert store.lookup(["a"], now=20.0) == {}
+
+
+def test_sized_respects_the_byte_cap():
+    assert FeedbackStore.sized(dim=256, max_rows=1024, max_bytes=256 * 4 * 10).capacity == 10
+    assert FeedbackStore.sized(dim=256, max_rows=5, max_bytes=None).capacity == 5
+
+
+def test_feedback_ids_do_not_cross_namespaces():
+    docs = [{"id": "fb-only-a", "text": "alpha", "embedding": [0.1, 0.2, 0.3]}]
+    served = client.post(
+        "/rerank",
+        json={"query": "q", "documents": docs, "top_k": 1},
+        headers={settings.namespace_header: "feedback-a"},
+    )
+    assert served.status_code == 200
+    fb = {"query": "q", "selected_ids": ["fb-only-a"], "success": 1.0}
+    other = client.post("/feedback", json=fb, headers={settings.namespace_header: "feedback-b"})
+    assert other.status_code == 404
+    own = client.post("/feedback", json=fb, headers={settings.namespace_header: "feedback-a"})
+    assert own.status_code == 200
@@ -14,10 +14,9 @@ def _ping(ns: str):
     assert r.status_code == 200
 
 
-def test_lru_eviction():
-    # Skip if already constrained externally
-    # Force max namespaces to 2 (including default) for this test using monkeypatch-like direct attr
-    global_settings.max_namespaces = 2
+def test_lru_eviction(monkeypatch):
+    # Force max namespaces to 2 (including default) for this test only
+    monkeypatch.setattr(global_settings, "max_namespaces", 2)
 
     default_ns = global_settings.default_namespace
 
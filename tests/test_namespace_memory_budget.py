@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+
+import neuralcache.api.server as server
+from neuralcache.config import Settings
+from neuralcache.rerank import Reranker
+
+client = TestClient(server.app)
+
+
+def _ping(ns: str) -> None:
+    r = client.post(
+        "/rerank",
+        json={"query": "q", "documents": []},
+        headers={server.settings.namespace_header: ns},
+    )
+    assert r.status_code == 200
+
+
+def _tiny_budget(monkeypatch) -> None:
+    monkeypatch.setattr(server.settings, "max_namespaces", None)
+    monkeypatch.setattr(server.settings, "namespace_memory_budget_mb", 1e-6)
+
+
+def test_estimated_bytes_tracks_pheromones(tmp_path):
+    rk = Reranker(Settings(storage_dir=str(tmp_path), storage_backend="json", narrative_dim=16))
+    before = rk.estimated_bytes()
+    rk.pher.reinforce(["a", "b", "c"], reward=1.0)
+    assert rk.estimated_bytes() > before
+    rk.close()
+
+
+def test_close_flushes_json_state_for_reload(tmp_path):
+    settings = Settings(storage_dir=str(tmp_path), storage_backend="json", narrative_dim=16)
+    rk = Reranker(settings.model_copy(deep=True))
+    rk.pher.data["doc"] = {"value": 2.0, "t": 1.0, "exposures": 0.0}  # not yet on disk
+    rk.close()
+    reloaded = Reranker(settings.model_copy(deep=True))
+    assert reloaded.pher.data["doc"]["value"] == 2.0
+    reloaded.close()
+
+
+def test_close_waits_for_outstanding_lease(tmp_path):
+    rk = Reranker(Settings(storage_dir=str(tmp_path), narrative_dim=16))
+    rk.acquire_lease()
+    rk.close()
+    assert not rk._closed
+    rk.pher.bulk_bonus(["still-usable"])  # SQLite connection is still open
+    rk.release_lease()
+    assert rk._closed
+
+
+def test_memory_budget_evicts_idle_namespaces(monkeypatch):
+    _tiny_budget(monkeypatch)
+    default_ns = server.settings.default_namespace
+    _ping("budget-a")
+    first = server._rerankers["budget-a"]
+    _ping("budget-b")
+    assert "budget-a" not in server._rerankers
+    assert first._closed
+    assert default_ns in server._rerankers and "budget-b" in server._rerankers
+
+    _ping("budget-a")  # lazily reloaded, evicting budget-b in turn
+    assert server._rerankers["budget-a"] is not first
+    assert "budget-b" not in server._rerankers
+
+
+def test_evicted_namespace_in_use_closes_after_request(monkeypatch):
+    _tiny_budget(monkeypatch)
+    leased = server.get_reranker_for_namespace("budget-leased", lease=True)
+    _ping("budget-other")
+    assert "budget-leased" not in server._rerankers
+    assert not leased._closed
+    leased.release_lease()
+    assert leased._closed
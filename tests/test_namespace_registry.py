@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import neuralcache.api.server as server
+
+
+def test_lease_is_refused_once_close_is_requested():
+    rk = server.get_reranker_for_namespace("registry-closing")
+    assert rk.acquire_lease()
+    rk.close()
+    assert not rk.acquire_lease()
+    assert not rk._closed
+    rk.release_lease()
+    assert rk._closed
+
+
+def test_validator_follows_pattern_changes(monkeypatch):
+    monkeypatch.setattr(server.settings, "namespace_pattern", r"^[a-z]+$")
+    assert server._validate_namespace("abc") == "abc"
+    with pytest.raises(HTTPException):
+        server._validate_namespace("abc-1")
+
+
+def test_leased_rerankers_stay_open_under_eviction_churn(monkeypatch):
+    monkeypatch.setattr(server.settings, "max_namespaces", 4)
+    names = [f"churn-{i}" for i in range(12)]
+    failures: list[str] = []
+
+    def worker(offset: int) -> None:
+        for i in range(60):
+            rk = server.get_reranker_for_namespace(names[(offset + i) % len(names)], lease=True)
+            try:
+                if rk._closed:
+                    failures.append("closed while leased")
+                rk.pher.bulk_bonus(["doc"])
+            finally:
+                rk.release_lease()
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not failures
+    assert len(server._rerankers) <= 4
+
+
+def test_hot_path_does_not_restamp_a_namespace_evicted_meanwhile(monkeypatch):
+    rk = server.get_reranker_for_namespace("registry-stale")
+    clock = server._access_clock
+
+    class _EvictingClock:
+        def __next__(self):
+            # Runs between the hot path's registry read and its recency stamp.
+            evicted: list = []
+            with server._namespace_lock:
+                server._evict_locked("registry-stale", "count", evicted)
+            server._close_evicted(evicted)
+            return next(clock)
+
+    monkeypatch.setattr(server, "_access_clock", _EvictingClock())
+    assert server.get_reranker_for_namespace("registry-stale") is rk
+    assert "registry-stale" not in server._rerankers
+    assert "registry-stale" not in server._last_used
+
+
+def test_evicted_namespace_names_are_capped(monkeypatch):
+    monkeypatch.setattr(server.settings, "max_namespaces", 2)
+    monkeypatch.setattr(server, "_EVICTED_NAMESPACES_MAX", 3)
+    for i in range(10):
+        server.get_reranker_for_namespace(f"registry-cap-{i}")
+    assert len(server._evicted_namespaces) <= 3
+    assert "registry-cap-7" in server._evicted_namespaces
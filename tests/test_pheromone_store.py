@@ -1,4 +1,6 @@
+import threading
 import time
+
 from neuralcache.pheromone import PheromoneStore
 
 
@@ -23,3 +25,15 @@ def test_pheromone_exposure_penalty():
     store.record_exposure(["b"])  # one exposure halves remaining multiplier (1 - 0.5*1)
     v1 = store.get_bonus("b")
     assert v1 <= v0
+
+
+def test_updates_serialize_on_the_store_lock():
+    store = PheromoneStore(backend="memory")
+    with store._lock:
+        worker = threading.Thread(target=store.record_exposure, args=(["a"],))
+        worker.start()
+        worker.join(timeout=0.1)
+        # The read-modify-write waits for whoever holds the lock.
+        assert worker.is_alive() and "a" not in store.data
+    worker.join()
+    assert store.data["a"]["exposures"] == 1.0
@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from neuralcache.api import ratelimit
+from neuralcache.api.ratelimit import (
+    MemoryTokenBuckets,
+    SQLiteTokenBuckets,
+    bucket_key,
+    check_rate_limit,
+)
+from neuralcache.api.server import app, settings
+from neuralcache.config import Settings
+
+client = TestClient(app)
+PAYLOAD = {"query": "q", "documents": [{"id": "a", "text": "A"}], "top_k": 1}
+
+
+@pytest.fixture
+def fresh_buckets(monkeypatch):
+    ratelimit.set_backend(MemoryTokenBuckets())
+    monkeypatch.setattr(settings, "rate_limit_per_minute", 2)
+    yield
+    ratelimit.set_backend(None)
+
+
+def test_headers_and_retry_after(fresh_buckets):
+    first = client.post("/rerank", json=PAYLOAD)
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Limit"] == "2"
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert client.post("/rerank", json=PAYLOAD).headers["X-RateLimit-Remaining"] == "0"
+
+    rejected = client.post("/rerank", json=PAYLOAD)
+    assert rejected.status_code == 429
+    assert rejected.json()["error"]["code"] == "RATE_LIMITED"
+    assert 1 <= int(rejected.headers["Retry-After"]) <= 30
+
+
+def test_namespace_scope_isolates_tenants(fresh_buckets, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_scope", "namespace")
+    noisy = {settings.namespace_header: "ratelimit-noisy"}
+    for _ in range(2):
+        assert client.post("/rerank", json=PAYLOAD, headers=noisy).status_code == 200
+    assert client.post("/rerank", json=PAYLOAD, headers=noisy).status_code == 429
+    quiet = {settings.namespace_header: "ratelimit-quiet"}
+    assert client.post("/rerank", json=PAYLOAD, headers=quiet).status_code == 200
+
+
+def test_bucket_refills_continuously():
+    cfg = Settings(rate_limit_per_minute=60, rate_limit_burst=2)
+    ratelimit.set_backend(MemoryTokenBuckets())
+    try:
+        assert check_rate_limit(cfg, "k", now=0.0).remaining == 1
+        assert check_rate_limit(cfg, "k", now=0.0).remaining == 0
+        denied = check_rate_limit(cfg, "k", now=0.5)
+        assert not denied.allowed and denied.retry_after_s == pytest.approx(0.5)
+        assert check_rate_limit(cfg, "k", now=1.5).allowed
+        assert check_rate_limit(cfg, "k", now=1000.0).remaining == 1  # capped at burst
+    finally:
+        ratelimit.set_backend(None)
+
+
+def test_sqlite_buckets_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "ratelimit.db")
+    worker_a, worker_b = SQLiteTokenBuckets(path), SQLiteTokenBuckets(path)
+    assert worker_a.take("k", 2.0, 0.0, now=0.0)[0]
+    assert worker_b.take("k", 2.0, 0.0, now=0.0)[0]
+    assert not worker_a.take("k", 2.0, 0.0, now=0.0)[0]
+    worker_a.close()
+    worker_b.close()
+
+
+def test_invalid_namespaces_share_the_default_bucket():
+    cfg = Settings(rate_limit_scope="namespace")
+    assert bucket_key(cfg, None, "tenant-a") == "ns:tenant-a"
+    assert bucket_key(cfg, None, "x" * 500) == "ns:" + cfg.default_namespace
+    assert bucket_key(cfg, None, "no/slashes") == "ns:" + cfg.default_namespace
+
+
+def test_sqlite_sweeps_refilled_buckets(tmp_path):
+    buckets = SQLiteTokenBuckets(str(tmp_path / "ratelimit.db"))
+    for i in range(50):
+        buckets.take(f"k{i}", 2.0, 1.0, now=0.0)
+    assert len(buckets) == 50
+    # Two seconds refill a 2-token bucket, so every idle key is dropped.
+    buckets.take("fresh", 2.0, 1.0, now=100.0)
+    assert len(buckets) == 1
+    assert buckets.take("k0", 2.0, 1.0, now=100.0) == (True, 1.0)
+    buckets.close()
@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from neuralcache.api.response_cache import ResponseCache, request_fingerprint
+from neuralcache.api.server import app, get_reranker_for_namespace, settings
+from neuralcache.types import RerankRequest
+
+client = TestClient(app)
+DOCS = [
+    {"id": "a", "text": "alpha", "embedding": [0.1, 0.2, 0.3]},
+    {"id": "b", "text": "beta", "embedding": [0.3, 0.2, 0.1]},
+]
+PAYLOAD = {"query": "q", "documents": DOCS, "top_k": 2}
+NS = {settings.namespace_header: "response-cache"}
+
+
+@pytest.fixture
+def cache_on(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_ttl_s", 30.0)
+
+
+def test_retry_is_served_from_cache_until_feedback(cache_on):
+    first = client.post("/rerank", json=PAYLOAD, headers=NS)
+    assert first.headers["X-NeuralCache-Cache"] == "miss"
+    retry = client.post("/rerank", json=PAYLOAD, headers=NS)
+    assert retry.headers["X-NeuralCache-Cache"] == "hit"
+    assert retry.content == first.content
+
+    other_ns = {settings.namespace_header: "response-cache-other"}
+    assert (
+        client.post("/rerank", json=PAYLOAD, headers=other_ns).headers["X-NeuralCache-Cache"]
+        == "miss"
+    )
+
+    fb = {"query": "q", "selected_ids": ["a"], "success": 1.0}
+    assert client.post("/feedback", json=fb, headers=NS).status_code == 200
+    assert client.post("/rerank", json=PAYLOAD, headers=NS).headers["X-NeuralCache-Cache"] == "miss"
+
+
+def test_hits_do_not_record_exposures(cache_on, monkeypatch):
+    ns = "response-cache-exposures"
+    rk = get_reranker_for_namespace(ns)
+    exposed = []
+    monkeypatch.setattr(rk.pher, "record_exposure", lambda ids: exposed.append(list(ids)))
+    headers = {settings.namespace_header: ns}
+    client.post("/rerank", json=PAYLOAD, headers=headers)
+    retry = client.post("/rerank", json=PAYLOAD, headers=headers)
+    assert retry.headers["X-NeuralCache-Cache"] == "hit"
+    assert len(exposed) == 1
+
+
+def test_cache_is_off_by_default():
+    assert "X-NeuralCache-Cache" not in client.post("/rerank", json=PAYLOAD).headers
+
+
+def test_fingerprint_covers_document_content():
+    base = RerankRequest(**PAYLOAD)
+    edited = RerankRequest(**{**PAYLOAD, "documents": [{**DOCS[0], "text": "ALPHA"}, DOCS[1]]})
+    key = request_fingerprint(base, namespace="n", epoch=(1, 0), use_cr=None)
+    assert key == request_fingerprint(
+        RerankRequest(**PAYLOAD), namespace="n", epoch=(1, 0), use_cr=None
+    )
+    assert key != request_fingerprint(edited, namespace="n", epoch=(1, 0), use_cr=None)
+    assert key != request_fingerprint(base, namespace="n", epoch=(2, 0), use_cr=None)
+    assert key != request_fingerprint(base, namespace="m", epoch=(1, 0), use_cr=None)
+    retry = RerankRequest(**PAYLOAD, deadline_ms=50.0)
+    assert key == request_fingerprint(retry, namespace="n", epoch=(1, 0), use_cr=None)
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache(ttl_s=30.0)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"body", True
+
+    outcomes = []
+    leader = threading.Thread(target=lambda: outcomes.append(cache.get_or_compute("k", compute)))
+    leader.start()
+    started.wait(5)
+    joiners = [
+        threading.Thread(target=lambda: outcomes.append(cache.get_or_compute("k", compute)))
+        for _ in range(3)
+    ]
+    for thread in joiners:
+        thread.start()
+    release.set()
+    for thread in [leader, *joiners]:
+        thread.join(5)
+    assert len(calls) == 1
+    assert all(body == b"body" for body, _ in outcomes)
+    assert sorted(outcome for _, outcome in outcomes).count("miss") == 1
+    assert cache.get_or_compute("k", compute) == (b"body", "hit")
+
+
+def test_entries_expire_and_errors_are_not_cached():
+    cache = ResponseCache(ttl_s=10.0, max_entries=1)
+    assert cache.get_or_compute("k", lambda: (b"1", True), now=0.0) == (b"1", "miss")
+    assert cache.get_or_compute("k", lambda: (b"2", True), now=5.0) == (b"1", "hit")
+    assert cache.get_or_compute("k", lambda: (b"3", True), now=11.0) == (b"3", "miss")
+
+    def boom():
+        raise ValueError("no")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("x", boom, now=11.0)
+    assert cache.get_or_compute("x", lambda: (b"ok", True), now=11.0) == (b"ok", "miss")
+    assert cache.get_or_compute("y", lambda: (b"degraded", False), now=11.0)[1] == "miss"
+    assert cache.get_or_compute("y", lambda: (b"full", True), now=11.0) == (b"full", "miss")
+    assert len(cache) == 1
@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import orjson
+from fastapi.testclient import TestClient
+
+from neuralcache.api.serialization import render_batch, render_documents, render_response
+from neuralcache.api.server import app
+from neuralcache.types import BatchRerankResponseItem, RerankDebug, RerankResponse, ScoredDocument
+
+
+def _docs() -> list[ScoredDocument]:
+    return [
+        ScoredDocument(
+            id="a",
+            text="alpha",
+            metadata={"source": "wiki", "tags": ["x"]},
+            embedding=[0.25, -1.5],
+            score=0.75,
+            components={"dense": 0.5, "narrative": 0.0, "pheromone": 0.1},
+        ),
+        ScoredDocument(id="b", text="beta", score=0.1, collapsed_ids=["c"]),
+    ]
+
+
+def test_matches_model_dump():
+    debug = RerankDebug(gating={"mode": "auto", "uncertainty": np.float32(0.5)}, deterministic=True)
+    expected = RerankResponse(results=_docs(), debug=debug).model_dump()
+    expected["debug"]["gating"]["uncertainty"] = 0.5
+    assert orjson.loads(render_response(_docs(), debug)) == expected
+    assert orjson.loads(render_response([], None)) == RerankResponse(results=[]).model_dump()
+    batch = orjson.loads(render_batch([(_docs(), None, None), ([], debug, None)]))
+    assert batch[0] == BatchRerankResponseItem(results=_docs()).model_dump()
+    assert orjson.loads(render_documents(_docs())) == [doc.model_dump() for doc in _docs()]
+
+
+def test_rerank_endpoint_serves_orjson_body():
+    client = TestClient(app)
+    docs = [{"id": "d1", "text": "alpha", "embedding": [0.1, 0.2, 0.3]}]
+    resp = client.post("/rerank", json={"query": "q", "documents": docs, "top_k": 1})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    body = json.loads(resp.content)
+    assert body["results"][0]["id"] == "d1" and body["meta"] == {}
+
+
+def test_projection_keeps_only_requested_fields():
+    ids_only = orjson.loads(render_documents(_docs(), []))
+    assert ids_only[0] == {"id": "a", "score": 0.75, "collapsed_ids": None}
+    with_text = orjson.loads(render_documents(_docs(), ["text", "components"]))
+    assert list(with_text[0]) == ["id", "text", "score", "components", "collapsed_ids"]
+
+
+def test_rerank_fields_projection_skips_echoed_attributes():
+    client = TestClient(app)
+    docs = [{"id": "d1", "text": "alpha", "metadata": {"k": 1}, "embedding": [0.1, 0.2, 0.3]}]
+    resp = client.post(
+        "/rerank", json={"query": "q", "documents": docs, "top_k": 1, "fields": ["metadata"]}
+    )
+    assert resp.status_code == 200
+    result = resp.json()["results"][0]
+    assert set(result) == {"id", "metadata", "score", "collapsed_ids"}
+    assert result["metadata"] == {"k": 1}
+    bad = client.post("/rerank", json={"query": "q", "documents": docs, "fields": ["bogus"]})
+    assert bad.status_code == 422
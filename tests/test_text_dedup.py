@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from neuralcache.config import Settings
+from neuralcache.rerank import Reranker
+from neuralcache.types import Document, RerankRequest
+
+
+class _CountingEncoder:
+    def __init__(self, inner):
+        self.inner = inner
+        self.batches: list[list[str]] = []
+
+    def encode(self, text):
+        return self.inner.encode(text)
+
+    def encode_batch(self, texts):
+        self.batches.append(list(texts))
+        return self.inner.encode_batch(texts)
+
+
+def _reranker() -> tuple[Reranker, _CountingEncoder]:
+    settings = Settings(narrative_dim=64, deterministic=True, storage_persistence_enabled=False)
+    rr = Reranker(settings=settings)
+    counting = _CountingEncoder(rr.encoder)
+    rr.encoder = counting
+    return rr, counting
+
+
+def test_duplicate_texts_encoded_once():
+    rr, counting = _reranker()
+    docs = [
+        Document(id="a", text="same chunk"),
+        Document(id="b", text="same chunk"),
+        Document(id="c", text="other chunk"),
+    ]
+    scored = rr.score(rr.encode_query("chunk"), docs, query_text="chunk")
+    assert counting.batches == [["same chunk", "other chunk"]]
+    assert {d.id for d in scored} == {"a", "b", "c"}
+
+
+def test_text_memo_shared_across_calls():
+    rr, counting = _reranker()
+    memo: dict[str, np.ndarray] = {}
+    docs = [Document(id="a", text="alpha"), Document(id="b", text="beta")]
+    q = rr.encode_query("alpha")
+    rr.score(q, docs, query_text="alpha", text_memo=memo)
+    rr.score(q, list(reversed(docs)), query_text="alpha", text_memo=memo)
+    assert counting.batches == [["alpha", "beta"]]
+
+
+def test_near_duplicates_collapsed_before_mmr():
+    rr, _ = _reranker()
+    docs = [
+        Document(id="a", text="alpha beta gamma"),
+        Document(id="a-copy", text="alpha beta gamma"),
+        Document(id="z", text="zeta eta theta"),
+    ]
+    debug: dict[str, object] = {}
+    scored = rr.score(
+        rr.encode_query("alpha"),
+        docs,
+        query_text="alpha",
+        overrides={"near_duplicate_threshold": 0.99},
+        debug=debug,
+    )
+    assert len(scored) == 2
+    rep = next(d for d in scored if d.id in {"a", "a-copy"})
+    assert rep.collapsed_ids == [{"a", "a-copy"}.difference({rep.id}).pop()]
+    assert debug["near_duplicates"]["collapsed_count"] == 1
+
+
+@pytest.mark.parametrize("threshold", [-0.1, 1.5])
+def test_near_duplicate_threshold_must_be_a_cosine(threshold):
+    with pytest.raises(ValidationError):
+        RerankRequest(query="q", near_duplicate_threshold=threshold)
+    with pytest.raises(ValidationError):
+        Settings(near_duplicate_threshold=threshold)